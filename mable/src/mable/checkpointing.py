@@ -0,0 +1,184 @@
+"""
+Checkpoints of running simulations.
+
+A checkpoint stores the state of a simulation that changes while the simulation runs, i.e. the world time,
+the state of the random and the random streams, the event queue, the vessels including their schedules,
+the shipping and its trades, the contracts of the market authority and the event observers. The state is pickled
+and gzip compressed.
+
+The parts of the simulation that do not change while the simulation runs, e.g. the network and its ports or the
+inputs of the shipping's trade generation (see :py:func:`Shipping.get_static_objects`), are not stored but referenced. A checkpoint is therefore restored into an engine that is created from the same
+specification as the engine of the checkpoint.
+"""
+
+import gzip
+import os
+import pickle
+
+from loguru import logger
+
+from mable.simulation_space.universe import Port
+
+
+CHECKPOINT_VERSION = 4
+
+
+def _get_persistent_objects(engine, pickle_companies):
+    """
+    The objects which are referenced by key instead of being stored.
+
+    :param engine: The simulation engine.
+    :type engine: SimulationEngine
+    :param pickle_companies: If False, the companies and vessels are referenced as well.
+    :type pickle_companies: bool
+    :return: The objects by key.
+    :rtype: Dict[Hashable, Any]
+    """
+    persistent_objects = {
+        "engine": engine,
+        "world": engine.world,
+        "network": engine.world.network,
+        "event_queue": engine.world.event_queue,
+        "random": engine.world.random,
+        "headquarters": engine.headquarters,
+        "market": engine.market,
+        "class_factory": engine.class_factory,
+        "logger": logger
+    }
+    for name, obj in engine.shipping.get_static_objects().items():
+        persistent_objects[("shipping", name)] = obj
+    if not pickle_companies:
+        for company_index, one_company in enumerate(engine.shipping_companies):
+            persistent_objects[("company", company_index)] = one_company
+            for vessel_index, one_vessel in enumerate(one_company.fleet):
+                persistent_objects[("vessel", company_index, vessel_index)] = one_vessel
+    return persistent_objects
+
+
+class _CheckpointPickler(pickle.Pickler):
+    """
+    A pickler that references the persistent objects and the network's ports instead of storing them.
+    """
+
+    def __init__(self, file, persistent_objects, network):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self._persistent_keys = {id(obj): key for key, obj in persistent_objects.items()}
+        self._network = network
+
+    def persistent_id(self, obj):
+        key = self._persistent_keys.get(id(obj))
+        if key is None and isinstance(obj, Port) and obj.port_id is not None:
+            get_port_by_id = getattr(self._network, "get_port_by_id", None)
+            if get_port_by_id is not None and get_port_by_id(obj.port_id) is obj:
+                key = ("port", obj.port_id)
+        return key
+
+
+class _CheckpointUnpickler(pickle.Unpickler):
+    """
+    An unpickler that resolves the references of :py:class:`_CheckpointPickler`.
+    """
+
+    def __init__(self, file, persistent_objects, network):
+        super().__init__(file)
+        self._persistent_objects = persistent_objects
+        self._network = network
+
+    def persistent_load(self, key):
+        if isinstance(key, tuple) and key[0] == "port":
+            obj = self._network.get_port_by_id(key[1])
+        elif key in self._persistent_objects:
+            obj = self._persistent_objects[key]
+        else:
+            raise ValueError(f"The checkpoint references {key} which does not exist in the engine.")
+        return obj
+
+
+def _get_fleet_sizes(engine):
+    return [len(one_company.fleet) for one_company in engine.shipping_companies]
+
+
+def write_checkpoint(engine, file_path, pickle_companies=True):
+    """
+    Write a checkpoint of the engine's simulation. The file is replaced atomically.
+
+    The event observers are prepared for the checkpoint (see :py:func:`EventObserver.prepare_checkpoint`)
+    before the state is pickled.
+
+    If the companies are not pickled only the state of their vessels is stored and the companies are the ones of
+    the engine the checkpoint is restored into, i.e. as re-instantiated from their specification.
+
+    :param engine: The simulation engine.
+    :type engine: SimulationEngine
+    :param file_path: The path of the checkpoint file.
+    :type file_path: str | pathlib.Path
+    :param pickle_companies: If True the companies including their internal state are pickled.
+    :type pickle_companies: bool
+    """
+    world = engine.world
+    for one_observer in engine.get_event_observers():
+        one_observer.prepare_checkpoint()
+    state = {
+        "version": CHECKPOINT_VERSION,
+        "pickle_companies": pickle_companies,
+        "fleet_sizes": _get_fleet_sizes(engine),
+        "current_time": world.current_time,
+        "random_state": world.random.get_state(),
+        "random_streams_state": world.random_streams.get_state(),
+        "event_queue": list(world.event_queue.queue),
+        "shipping_companies": None,
+        "vessel_states": None,
+        "shipping": engine.shipping,
+        "market_authority": engine.market_authority,
+        "new_schedules": engine._new_schedules,
+        "event_observers": engine.get_event_observers(),
+        "resource_monitor": engine.resource_monitor
+    }
+    if pickle_companies:
+        state["shipping_companies"] = engine.shipping_companies
+    else:
+        state["vessel_states"] = [[dict(vars(one_vessel)) for one_vessel in one_company.fleet]
+                                  for one_company in engine.shipping_companies]
+    temporary_path = f"{file_path}.tmp"
+    with gzip.open(temporary_path, "wb", compresslevel=1) as checkpoint_file:
+        pickler = _CheckpointPickler(
+            checkpoint_file, _get_persistent_objects(engine, pickle_companies), world.network)
+        pickler.dump(state)
+    os.replace(temporary_path, file_path)
+    logger.info(f"Wrote checkpoint at time {world.current_time} to {file_path}.")
+
+
+def read_checkpoint(engine, file_path):
+    """
+    Restore a checkpoint into an engine that was created from the same specification as the engine of the
+    checkpoint.
+
+    :param engine: The simulation engine.
+    :type engine: SimulationEngine
+    :param file_path: The path of the checkpoint file.
+    :type file_path: str | pathlib.Path
+    :return: The state of the checkpoint.
+    :rtype: Dict[str, Any]
+    :raises ValueError: If the checkpoint has a different version or does not match the engine's companies.
+    """
+    world = engine.world
+    with gzip.open(file_path, "rb") as checkpoint_file:
+        # Companies are only referenced if they were not pickled. Adding them in either case keeps the lookup simple.
+        unpickler = _CheckpointUnpickler(
+            checkpoint_file, _get_persistent_objects(engine, False), world.network)
+        state = unpickler.load()
+    if state.get("version") != CHECKPOINT_VERSION:
+        raise ValueError(f"Checkpoint version {state.get('version')} is not supported.")
+    if not state["pickle_companies"] and state["fleet_sizes"] != _get_fleet_sizes(engine):
+        raise ValueError(f"The fleets of the checkpoint {state['fleet_sizes']}"
+                         f" do not match the fleets of the engine {_get_fleet_sizes(engine)}.")
+    if state["vessel_states"] is not None:
+        for one_company, vessel_states in zip(engine.shipping_companies, state["vessel_states"]):
+            for one_vessel, one_vessel_state in zip(one_company.fleet, vessel_states):
+                vars(one_vessel).update(one_vessel_state)
+    world.set_current_time(state["current_time"])
+    world.random.set_state(state["random_state"])
+    world.random_streams.set_state(state["random_streams_state"])
+    world.event_queue.restore_event_items(state["event_queue"])
+    logger.info(f"Read checkpoint at time {state['current_time']} from {file_path}.")
+    return state
@@ -1,15 +1,17 @@
 #!/usr/bin/env python3
 # PYTHON_ARGCOMPLETE_OK
 
+import importlib.util
 import os
 import sys
-import json
 
 import argparse as ap
 import argcomplete
 from loguru import logger
 from prettytable import PrettyTable
 
+from mable.io.metrics_files import load_metrics, get_metrics_overview
+
 
 class ArgumentParserExtensions:
     """
@@ -68,32 +70,111 @@ def task_metrics_overview(parsed_args):
     """
     metrics_file_name = parsed_args["file"]
     print(f"Overview for {metrics_file_name}.")
-    with open(metrics_file_name, "r") as f:
-        metrics = json.load(f)
-    for one_company_key in metrics["company_metrics"]:
-        company_name = metrics["company_names"][one_company_key]
+    metrics = load_metrics(metrics_file_name)
+    for company_name, overview in get_metrics_overview(metrics).items():
         print(f"Company {company_name}")
-        cost = 0
-        if "fuel_cost" in metrics["company_metrics"][one_company_key]:
-            cost = metrics["company_metrics"][one_company_key]["fuel_cost"]
-        penalty = metrics["global_metrics"]["penalty"][one_company_key]
-        revenue = 0
-        all_outcomes = metrics["global_metrics"]["auction_outcomes"]
-        all_outcomes_company_per_round = [d[one_company_key] for d in all_outcomes if one_company_key in d]
-        all_outcomes_company = [x for sublist in all_outcomes_company_per_round for x in sublist]
-        all_payments = [d["payment"] for d in all_outcomes_company]
-        revenue += sum(all_payments)
-        income = revenue - cost - penalty
         table = PrettyTable()
         table.field_names = ["Name", "Value"]
         table.align["Value"] = "r"
-        table.add_row(["Cost", round(cost, 3)])
-        table.add_row(["Penalty", round(penalty, 3)])
-        table.add_row(["Revenue", round(revenue, 3)], divider=True)
-        table.add_row(["Income", round(income, 3)])
+        table.add_row(["Cost", round(overview["cost"], 3)])
+        table.add_row(["Penalty", round(overview["penalty"], 3)])
+        table.add_row(["Revenue", round(overview["revenue"], 3)], divider=True)
+        table.add_row(["Income", round(overview["income"], 3)])
         print(table)
 
 
+def _load_setting_module(setting_file_name):
+    """
+    Load a setting file as a module.
+
+    :param setting_file_name: The path of the setting file.
+    :type setting_file_name: str
+    :return: The module.
+    """
+    module_spec = importlib.util.spec_from_file_location("mable_setting", setting_file_name)
+    setting_module = importlib.util.module_from_spec(module_spec)
+    module_spec.loader.exec_module(setting_module)
+    return setting_module
+
+
+def task_batch(parsed_args):
+    """
+    Run a simulation setting with several seeds in parallel and show an overview of the companies' performance
+    across the runs.
+
+    The setting file has to define a function 'build_setting' without arguments which returns the specifications
+    builder of the setting, e.g. as created by :py:func:`mable.examples.environment.get_specification_builder`
+    with the companies added.
+
+    :param parsed_args: The parameter from the arg parser.
+    :type parsed_args: dict
+    """
+    from mable.examples.batch import run_batch
+    setting_module = _load_setting_module(parsed_args["setting"])
+    first_seed = parsed_args["first_seed"]
+    seeds = list(range(first_seed, first_seed + parsed_args["runs"]))
+    run_results, aggregate = run_batch(
+        setting_module.build_setting, seeds, output_directory=parsed_args["output_directory"],
+        number_of_processes=parsed_args["processes"])
+    number_of_failed_runs = sum(1 for r in run_results if r.error is not None)
+    print(f"Batch of {len(seeds)} runs ({number_of_failed_runs} failed) in {parsed_args['output_directory']}.")
+    for company_name, company_aggregate in aggregate.items():
+        print(f"Company {company_name}")
+        table = PrettyTable()
+        table.field_names = ["Name", "Mean", "Std", "Min", "Max"]
+        for one_column in ["Mean", "Std", "Min", "Max"]:
+            table.align[one_column] = "r"
+        for one_key in ["cost", "penalty", "revenue", "income"]:
+            key_aggregate = company_aggregate[one_key]
+            table.add_row([one_key.capitalize()]
+                          + [round(key_aggregate[s], 3) for s in ["mean", "std", "min", "max"]],
+                          divider=one_key == "revenue")
+        print(table)
+
+
+def task_benchmark(parsed_args):
+    """
+    Compare the simulation throughput in events per second of the default and the headless mode for a setting and,
+    if numbers of fast-forward processes are given, of the fast-forward with these numbers of processes.
+
+    The setting file has to define a function 'build_setting' as for the batch task (see :py:func:`task_batch`).
+
+    :param parsed_args: The parameter from the arg parser.
+    :type parsed_args: dict
+    """
+    from mable.examples.benchmark import run_benchmark, run_fast_forward_benchmark
+    setting_module = _load_setting_module(parsed_args["setting"])
+    results = run_benchmark(
+        setting_module.build_setting, repetitions=parsed_args["repetitions"], seed=parsed_args["seed"],
+        output_directory=parsed_args["output_directory"])
+    table = PrettyTable()
+    table.field_names = ["Mode", "Events", "Seconds", "Events per second"]
+    for one_column in ["Events", "Seconds", "Events per second"]:
+        table.align[one_column] = "r"
+    for one_result in results:
+        table.add_row([one_result.mode, one_result.number_of_events, f"{one_result.seconds:.3f}",
+                       f"{one_result.events_per_second:.1f}"])
+    print(table)
+    default_events_per_second = results[0].events_per_second
+    if 0 < default_events_per_second < float("inf"):
+        print(f"Speed-up of headless mode: {results[1].events_per_second / default_events_per_second:.2f}x")
+    else:
+        print("Speed-up of headless mode: not available since the default mode's throughput could not be measured.")
+    if parsed_args["fast_forward_processes"] is not None:
+        fast_forward_results = run_fast_forward_benchmark(
+            setting_module.build_setting, parsed_args["fast_forward_processes"],
+            repetitions=parsed_args["repetitions"], seed=parsed_args["seed"],
+            output_directory=parsed_args["output_directory"])
+        fast_forward_table = PrettyTable()
+        fast_forward_table.field_names = ["Processes", "Events", "Seconds", "Events per second"]
+        for one_column in fast_forward_table.field_names:
+            fast_forward_table.align[one_column] = "r"
+        for one_number_of_processes, one_result in zip(parsed_args["fast_forward_processes"], fast_forward_results):
+            fast_forward_table.add_row([one_number_of_processes, one_result.number_of_events,
+                                        f"{one_result.seconds:.3f}", f"{one_result.events_per_second:.1f}"])
+        print(fast_forward_table)
+
+
 def select_task(parsed_args):
     """
     Calls the respective function for the task as specified by the cmd args.
@@ -104,6 +185,10 @@ def select_task(parsed_args):
     task = parsed_args["task"]
     if task == "overview":
         task_metrics_overview(parsed_args)
+    elif task == "batch":
+        task_batch(parsed_args)
+    elif task == "benchmark":
+        task_benchmark(parsed_args)
     else:
         logger.error(f"Unknown task {task}")
 
@@ -137,6 +222,75 @@ def main():
         type=lambda x: ArgumentParserExtensions.is_valid_file(x, overview_parser),
         help="Filename for which to produce the overview."
     )
+    # Batch
+    batch_parser = task_parsers.add_parser(
+        'batch',
+        parents=[],
+        help='Run a simulation setting with several seeds in parallel.'
+    )
+    batch_parser.add_argument(
+        'setting',
+        type=lambda x: ArgumentParserExtensions.is_valid_file(x, batch_parser),
+        help="Python file that defines 'build_setting()' which returns the specifications builder of the setting."
+    )
+    batch_parser.add_argument(
+        '-n', '--runs',
+        type=lambda x: ArgumentParserExtensions.is_positive_integer(x, batch_parser),
+        default=10,
+        help="The number of runs."
+    )
+    batch_parser.add_argument(
+        '--first-seed',
+        type=int,
+        default=0,
+        help="The seed of the first run. The runs use consecutive seeds."
+    )
+    batch_parser.add_argument(
+        '-p', '--processes',
+        type=lambda x: ArgumentParserExtensions.is_positive_integer(x, batch_parser),
+        default=None,
+        help="The number of processes. Default is the number of CPUs."
+    )
+    batch_parser.add_argument(
+        '-o', '--output-directory',
+        default="batch_output",
+        help="The directory for the output of the runs."
+    )
+    # Benchmark
+    benchmark_parser = task_parsers.add_parser(
+        'benchmark',
+        parents=[],
+        help='Compare the events per second of a simulation setting with and without headless mode.'
+    )
+    benchmark_parser.add_argument(
+        'setting',
+        type=lambda x: ArgumentParserExtensions.is_valid_file(x, benchmark_parser),
+        help="Python file that defines 'build_setting()' which returns the specifications builder of the setting."
+    )
+    benchmark_parser.add_argument(
+        '-r', '--repetitions',
+        type=lambda x: ArgumentParserExtensions.is_positive_integer(x, benchmark_parser),
+        default=3,
+        help="The number of runs per mode of which the fastest is reported."
+    )
+    benchmark_parser.add_argument(
+        '--seed',
+        type=int,
+        default=0,
+        help="The seed of all runs."
+    )
+    benchmark_parser.add_argument(
+        '-o', '--output-directory',
+        default="benchmark_output",
+        help="The directory for the output of the runs."
+    )
+    benchmark_parser.add_argument(
+        '--fast-forward-processes',
+        type=lambda x: ArgumentParserExtensions.is_positive_integer(x, benchmark_parser),
+        nargs="+",
+        default=None,
+        help="Also compare the fast-forward with these numbers of processes, e.g. '1 2 4'."
+    )
     argcomplete.autocomplete(parser)
     args = parser.parse_args()
     args = vars(args)
@@ -8,6 +8,7 @@ import sys
 import loguru
 
 from mable.cargo_bidding import TradingCompany
+from mable.competition.resources import get_company_operation
 from mable.engine import SimulationEngine
 from mable.event_management import CargoAnnouncementEvent, CargoEvent, FirstCargoAnnouncementEvent
 from mable.extensions.cargo_distributions import DistributionShipping
@@ -57,6 +58,8 @@ class AuctionCargoEvent(CargoEvent):
     An event of appearance of cargoes in an auction setting.
     """
 
+    __slots__ = ("_allocation_result",)
+
     def __init__(self, time):
         super().__init__(time)
         self._allocation_result: AuctionLedger | None = None
@@ -84,27 +87,33 @@ class AuctionCargoEvent(CargoEvent):
         engine.headquarters.get_companies()  # Update vessel locations before informing companies
         all_trades = engine.shipping.get_trades(self.time)
         distribution_ledger = engine.market.distribute_trades(
-            self.time, all_trades, engine.shipping_companies, timeout=engine.global_agent_timeout)
+            self.time, all_trades, engine.shipping_companies, timeout=engine.global_agent_timeout,
+            resource_monitor=engine.resource_monitor)
         all_allocated_contracts_per_company = [distribution_ledger[k] for k in distribution_ledger.keys()]
         all_allocated_trades = [contract.trade
                                 for on_company_trades in all_allocated_contracts_per_company
                                 for contract in on_company_trades]
-        unallocated_trades = [trade for trade in all_trades if trade not in all_allocated_trades]
+        allocated_trade_keys = {trade.key for trade in all_allocated_trades}
+        unallocated_trades = [trade for trade in all_trades if trade.key not in allocated_trade_keys]
         self._allocation_result = AuctionAllocationResult(distribution_ledger, unallocated_trades)
         num_awarded_trades = len(all_allocated_trades)
         self.info = f"Awarded {num_awarded_trades}/{len(all_trades)} trades"
         for current_company in engine.shipping_companies:
             asyncio.run(self._company_receive_timeout(
-                current_company, distribution_ledger, timeout=engine.global_agent_timeout))
+                current_company, distribution_ledger, timeout=engine.global_agent_timeout,
+                resource_monitor=engine.resource_monitor))
         engine.apply_new_schedules(distribution_ledger)
         return distribution_ledger
 
     @staticmethod
-    async def _company_receive_timeout(company, distribution_ledger, timeout=60):
+    async def _company_receive_timeout(company, distribution_ledger, timeout=60, resource_monitor=None):
+        receive = get_company_operation(company, "receive", resource_monitor)
+        if receive is None:
+            return
         try:
             await asyncio.wait_for(
                 asyncio.to_thread(
-                    company.receive,
+                    receive,
                     distribution_ledger.get_trades_for_company_copy(company),
                     distribution_ledger.sanitised_ledger),
                 timeout=timeout
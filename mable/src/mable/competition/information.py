@@ -6,6 +6,7 @@ from typing import TYPE_CHECKING, Dict, List
 
 from loguru import logger
 
+from mable.competition.sandbox import run_continuations
 from mable.shipping_market import Contract
 
 if TYPE_CHECKING:
@@ -29,6 +30,7 @@ class CompanyHeadquarters:
         self._engine = simulation_engine
         self._sanitised_shipping_companies = None
         self._shipping_companies_update_time = None
+        self._is_sandbox = False
 
     @property
     def current_time(self):
@@ -80,6 +82,23 @@ class CompanyHeadquarters:
         """
         return self._engine.world.network.get_distance(location_one, location_two)
 
+    def get_network_distances(self, locations_one, locations_two):
+        """
+        Get the distances between two sequences of locations, i.e. the distance between the first location of
+        the first sequence and the first location of the second sequence and so on.
+
+        The locations can be the same as for :py:func:`get_network_distance`.
+
+        :param locations_one: The first locations.
+        :type locations_one: List[Port | Location | str]
+        :param locations_two: The second locations.
+        :type locations_two: List[Port | Location | str]
+        :return: The distances, with math.inf for locations without a route between them.
+        :rtype: np.ndarray
+        :raises ValueError: If the two sequences have different lengths.
+        """
+        return self._engine.world.network.get_distances(locations_one, locations_two)
+
     def get_journey_location(self, journey, vessel, time=None):
         """
         Get the current location of a vessel on a journey.
@@ -104,6 +123,18 @@ class CompanyHeadquarters:
         current_location = self._engine.world.network.get_journey_location(journey, vessel, time)
         return current_location
 
+    def get_open_contracts(self, company):
+        """
+        Get the contracts of a company that are not fulfilled yet, e.g. to check which trades a company still has to
+        transport. The contracts are copies.
+
+        :param company: The company, e.g. the company asking.
+        :type company: ShippingCompany
+        :return: The open contracts in the order they were awarded.
+        :rtype: List[Contract]
+        """
+        return [c.copy() for c in self._engine.market_authority.get_open_contracts(company)]
+
     def get_companies(self):
         """
         Get all companies.
@@ -134,11 +165,87 @@ class CompanyHeadquarters:
             self._shipping_companies_update_time = self.current_time
         return self._sanitised_shipping_companies
 
+    @property
+    def is_sandbox(self):
+        """
+        :return: True if this is the headquarters of a sandbox continuation (see :py:func:`simulate_futures`).
+        :rtype: bool
+        """
+        return self._is_sandbox
+
+    def set_sandbox(self):
+        """
+        **WARNING**: Part of internal simulation logic. Only allowed to be called by the simulation!
+
+        Mark the headquarters as the headquarters of a sandbox continuation.
+        """
+        self._is_sandbox = True
+
+    def simulate_futures(self, policies, number_of_continuations=1, end_time=None, summarise=None,
+                         default_policy=None, number_of_processes=None, seed=None):
+        """
+        Simulate continuations of the simulation from the current state in sandboxes, e.g. to estimate how winning
+        a trade affects future auctions. The continuations run in parallel processes and never affect the simulation.
+
+        In the continuations all companies are replaced by policies, e.g. a subclass of :py:class:`TradingCompany`
+        that bids like the company and its competitors might bid. The continuations start with the next event,
+        i.e. an auction in progress is not part of them, and the trades that have not been announced yet are
+        resampled. See :py:func:`mable.competition.sandbox.run_continuations` for details.
+
+        :param policies: The policies by company name. A policy is given the fleet and the name of the company.
+        :type policies: Dict[str, Callable[[List[Vessel], str], ShippingCompany]]
+        :param number_of_continuations: The number of (Monte Carlo) continuations.
+        :type number_of_continuations: int
+        :param end_time: The time after which the continuations stop. Default, i.e. None, is the end of the
+            simulation.
+        :type end_time: float | None
+        :param summarise: Creates the (picklable) summary of a continuation from its engine. Default, i.e. None,
+            summarises the contracts of all companies (see :py:class:`ContinuationSummary`).
+        :type summarise: Callable[[SimulationEngine], Any] | None
+        :param default_policy: The policy for companies without a policy. Default, i.e. None, is
+            :py:class:`TradingCompany`.
+        :type default_policy: Callable[[List[Vessel], str], ShippingCompany] | None
+        :param number_of_processes: The maximal number of simultaneously running processes.
+            Default, i.e. None, is the number of CPUs.
+        :type number_of_processes: int | None
+        :param seed: The seed of the continuations. Default, i.e. None, is a random seed.
+        :type seed: int | None
+        :return: The summaries of the continuations. Failed continuations have None as the summary.
+        :rtype: List[Any]
+        :raises ValueError: If called within a sandbox continuation or if the platform cannot fork processes.
+        """
+        if self._is_sandbox:
+            raise ValueError("Sandbox continuations cannot simulate futures.")
+        return run_continuations(
+            self._engine, policies, number_of_continuations=number_of_continuations, end_time=end_time,
+            summarise=summarise, default_policy=default_policy, number_of_processes=number_of_processes, seed=seed)
+
+    def invalidate_companies(self):
+        """
+        Discard the sanitised companies so that they are recreated on the next :py:func:`get_companies`,
+        e.g. after the engine's companies changed.
+        """
+        self._sanitised_shipping_companies = None
+        self._shipping_companies_update_time = None
+
 
 class MarketAuthority:
 
     def __init__(self):
         self._contracts_per_company: Dict[ShippingCompany, List[Contract]] = {}
+        self._contracts_by_trade_key_per_company: Dict[ShippingCompany, Dict[tuple, List[Contract]]] = {}
+        self._open_contracts_per_company: Dict[ShippingCompany, Dict[int, Contract]] = {}
+        self._number_of_fulfilled_contracts_per_company: Dict[ShippingCompany, int] = {}
+
+    def __getstate__(self):
+        # The indices are keyed by the contracts' ids, which change with unpickling.
+        return {"_contracts_per_company": self._contracts_per_company}
+
+    def __setstate__(self, state):
+        contracts_per_company = state["_contracts_per_company"]
+        self.__init__()
+        for one_company, contracts in contracts_per_company.items():
+            self._add_contracts(one_company, contracts)
 
     @property
     def contracts_per_company(self):
@@ -148,16 +255,104 @@ class MarketAuthority:
         """
         return self._contracts_per_company
 
+    def _add_contracts(self, company, contracts):
+        self._contracts_per_company.setdefault(company, []).extend(contracts)
+        contracts_by_trade_key = self._contracts_by_trade_key_per_company.setdefault(company, {})
+        open_contracts = self._open_contracts_per_company.setdefault(company, {})
+        number_of_fulfilled_contracts = self._number_of_fulfilled_contracts_per_company.get(company, 0)
+        for one_contract in contracts:
+            contracts_by_trade_key.setdefault(one_contract.trade.key, []).append(one_contract)
+            if one_contract.fulfilled:
+                number_of_fulfilled_contracts += 1
+            else:
+                open_contracts[id(one_contract)] = one_contract
+        self._number_of_fulfilled_contracts_per_company[company] = number_of_fulfilled_contracts
+
+    def get_awarded_trade_keys(self, company):
+        """
+        The keys of all trades the company has a contract for (see :py:attr:`Trade.key`).
+
+        :param company: The company.
+        :type company: ShippingCompany
+        :return: The keys.
+        :rtype: KeysView[tuple]
+        """
+        return self._contracts_by_trade_key_per_company.get(company, {}).keys()
+
+    def is_awarded(self, trade, company):
+        """
+        Check if the company has a contract for the trade or a copy of it.
+
+        :param trade: The trade.
+        :type trade: Trade
+        :param company: The company.
+        :type company: ShippingCompany
+        :return: True if the company has a contract for the trade, False otherwise.
+        :rtype: bool
+        """
+        return trade.key in self.get_awarded_trade_keys(company)
+
+    def get_open_contracts(self, company):
+        """
+        The contracts of the company that are not fulfilled in the order they were awarded.
+
+        :param company: The company.
+        :type company: ShippingCompany
+        :return: The contracts.
+        :rtype: List[Contract]
+        """
+        return list(self._open_contracts_per_company.get(company, {}).values())
+
+    def get_number_of_fulfilled_contracts(self, company):
+        """
+        :param company: The company.
+        :type company: ShippingCompany
+        :return: The number of the company's contracts that are fulfilled.
+        :rtype: int
+        """
+        return self._number_of_fulfilled_contracts_per_company.get(company, 0)
+
+    def get_number_of_unfulfilled_contracts(self, company):
+        """
+        :param company: The company.
+        :type company: ShippingCompany
+        :return: The number of the company's contracts that are not fulfilled.
+        :rtype: int
+        """
+        return len(self._open_contracts_per_company.get(company, {}))
+
+    def replace_companies(self, replacements):
+        """
+        Transfer the contracts of companies to their replacements.
+
+        :param replacements: The replacements by the company they replace.
+        :type replacements: Dict[ShippingCompany, ShippingCompany]
+        """
+        for per_company in [self._contracts_per_company, self._contracts_by_trade_key_per_company,
+                            self._open_contracts_per_company, self._number_of_fulfilled_contracts_per_company]:
+            for one_company in list(per_company.keys()):
+                per_company[replacements.get(one_company, one_company)] = per_company.pop(one_company)
+
     def trade_fulfilled(self, trade, company):
         """
+        Mark the company's contract for the trade or a copy of it as fulfilled.
+
         :param trade: The trade.
         :type trade: Trade
         :param company: The company fulfilling the trade.
         :type company: ShippingCompany
+        :raises ValueError: If the company has no contract for the trade.
         """
-        contract_for_trade = next(c for c in self._contracts_per_company[company] if c.trade == trade)
-        contract_for_trade.fulfilled = True
-        logger.debug(f"Fulfilled contract: {contract_for_trade}")
+        contracts_for_trade = self._contracts_by_trade_key_per_company.get(company, {}).get(trade.key)
+        if not contracts_for_trade:
+            raise ValueError(f"Company {company.name} has no contract for trade {trade}.")
+        # Of several contracts for the same trade the first open contract is fulfilled.
+        contract_for_trade = next((c for c in contracts_for_trade if not c.fulfilled), contracts_for_trade[0])
+        if not contract_for_trade.fulfilled:
+            contract_for_trade.fulfilled = True
+            del self._open_contracts_per_company[company][id(contract_for_trade)]
+            self._number_of_fulfilled_contracts_per_company[company] += 1
+        logger.debug("Fulfilled contract: {}", contract_for_trade)
 
     def add_allocation_results(self, allocation_results):
         """
@@ -165,6 +360,4 @@ class MarketAuthority:
         :type allocation_results: AuctionAllocationResult
         """
         for one_company in allocation_results.ledger.keys():
-            if not one_company in self._contracts_per_company:
-                self._contracts_per_company[one_company] = []
-            self._contracts_per_company[one_company].extend(allocation_results.ledger[one_company])
+            self._add_contracts(one_company, allocation_results.ledger[one_company])
@@ -0,0 +1,284 @@
+"""
+Accounting of the computational resources the companies use.
+"""
+
+import threading
+import time
+import tracemalloc
+from typing import List
+
+import attrs
+from loguru import logger
+
+from mable.util import JsonAble
+
+
+@attrs.define
+class AgentCallUsage(JsonAble):
+    """
+    The resources one call of a company's operation used.
+
+    :param operation: The name of the operation, e.g. 'inform'.
+    :type operation: str
+    :param cpu_time: The CPU time of the thread executing the operation in seconds.
+    :type cpu_time: float
+    :param peak_memory: The peak of memory allocated during the operation in bytes or None if not tracked,
+        e.g. because another operation ran at the same time (see :py:class:`AgentResourceMonitor`).
+    :type peak_memory: int | None
+    """
+    operation: str
+    cpu_time: float
+    peak_memory: int | None = None
+
+    def to_json(self):
+        # noinspection PyTypeChecker
+        # AgentCallUsage is an attrs instance.
+        return attrs.asdict(self)
+
+
+@attrs.define
+class AgentResourceUsage(JsonAble):
+    """
+    The cumulative resources a company used.
+
+    :param cpu_time: The total CPU time in seconds.
+    :type cpu_time: float
+    :param peak_memory: The highest peak of memory allocated during any operation in bytes.
+    :type peak_memory: int
+    :param calls: The usage of each call.
+    :type calls: List[AgentCallUsage]
+    :param exceeded_budget: Indicates if the company exceeded its budget.
+    :type exceeded_budget: bool
+    """
+    cpu_time: float = 0
+    peak_memory: int = 0
+    calls: List[AgentCallUsage] = attrs.field(factory=list)
+    exceeded_budget: bool = False
+
+    def to_json(self):
+        return {
+            "cpu_time": self.cpu_time,
+            "peak_memory": self.peak_memory,
+            "number_of_calls": len(self.calls),
+            "calls": [c.to_json() for c in self.calls],
+            "exceeded_budget": self.exceeded_budget
+        }
+
+
+class AgentResourceMonitor:
+    """
+    Meters the CPU time and optionally the peak memory allocation of the companies' operations.
+
+    The CPU time is the CPU clock of the thread that executes the operation (time.thread_time) and thereby
+    independent of the time spent waiting for other threads or processes. The memory is tracked with tracemalloc
+    while an operation runs and is the peak of the memory allocated by the process during the operation.
+    Since tracemalloc traces the whole process, the memory is only attributed to an operation if no other metered
+    operation ran at the same time. This is the case if an operation timed out and its thread is still running,
+    in which case the memory of neither operation is tracked.
+
+    If budgets are specified a company that exceeded its cumulative CPU time budget or whose operations peaked
+    above the memory budget is not asked to operate anymore.
+    """
+
+    def __init__(self, cpu_time_budget=None, memory_budget=None, track_memory=None):
+        """
+        :param cpu_time_budget: The total CPU time in seconds each company can use. None, the default, is no budget.
+        :type cpu_time_budget: float | None
+        :param memory_budget: The peak memory in bytes each company's operations can allocate.
+            None, the default, is no budget.
+        :type memory_budget: int | None
+        :param track_memory: Track the memory allocation. Default, i.e. None, tracks only if there is a memory budget.
+        :type track_memory: bool | None
+        """
+        super().__init__()
+        self._cpu_time_budget = cpu_time_budget
+        self._memory_budget = memory_budget
+        if track_memory is None:
+            track_memory = memory_budget is not None
+        self._track_memory = track_memory
+        self._usage = {}
+        self._lock = threading.Lock()
+        self._number_of_tracing_calls = 0
+        self._number_of_started_tracing_calls = 0
+        self._started_tracing = False
+
+    def __getstate__(self):
+        state = dict(vars(self))
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        vars(self).update(state)
+        self._lock = threading.Lock()
+
+    @property
+    def cpu_time_budget(self):
+        return self._cpu_time_budget
+
+    @property
+    def memory_budget(self):
+        return self._memory_budget
+
+    def get_usage(self, company):
+        """
+        The cumulative resources the company used.
+
+        :param company: The company.
+        :type company: ShippingCompany
+        :return: The usage.
+        :rtype: AgentResourceUsage
+        """
+        usage = self._usage.get(company)
+        if usage is None:
+            usage = AgentResourceUsage()
+            self._usage[company] = usage
+        return usage
+
+    def is_over_budget(self, company):
+        """
+        Indicates if the company has exceeded its budget.
+
+        :param company: The company.
+        :type company: ShippingCompany
+        :return: True if the company exceeded its budget and False otherwise.
+        :rtype: bool
+        """
+        return self.get_usage(company).exceeded_budget
+
+    def get_operation(self, company, operation):
+        """
+        The company's operation metered (see :py:func:`metered`) or None if the company exceeded its budget.
+
+        :param company: The company.
+        :type company: ShippingCompany
+        :param operation: The name of the operation, e.g. 'inform'.
+        :type operation: str
+        :return: The metered operation or None.
+        :rtype: Callable | None
+        """
+        metered_operation = None
+        if self.is_over_budget(company):
+            logger.warning(f"Company {company.name} was not asked to operate '{operation}'"
+                           f" since it exceeded its resource budget.")
+        else:
+            metered_operation = self.metered(company, operation)
+        return metered_operation
+
+    def metered(self, company, operation):
+        """
+        The company's operation wrapped to be metered. The wrapped operation has to run in the thread that
+        executes the operation.
+
+        :param company: The company.
+        :type company: ShippingCompany
+        :param operation: The name of the operation, e.g. 'inform'.
+        :type operation: str
+        :return: The wrapped operation.
+        :rtype: Callable
+        """
+        function = getattr(company, operation)
+
+        def metered_function(*args, **kwargs):
+            memory_tracking = self._start_memory_tracking()
+            start_cpu_time = time.thread_time()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                cpu_time = time.thread_time() - start_cpu_time
+                peak_memory = self._stop_memory_tracking(memory_tracking)
+                self._add_call(company, AgentCallUsage(operation, cpu_time, peak_memory))
+
+        return metered_function
+
+    def _add_call(self, company, call_usage):
+        with self._lock:
+            usage = self.get_usage(company)
+            usage.calls.append(call_usage)
+            usage.cpu_time += call_usage.cpu_time
+            if call_usage.peak_memory is not None:
+                usage.peak_memory = max(usage.peak_memory, call_usage.peak_memory)
+            if not usage.exceeded_budget and (
+                    (self._cpu_time_budget is not None and usage.cpu_time > self._cpu_time_budget)
+                    or (self._memory_budget is not None and usage.peak_memory > self._memory_budget)):
+                usage.exceeded_budget = True
+                logger.warning(f"Company {company.name} exceeded its resource budget"
+                               f" (CPU time: {usage.cpu_time:.3f} s, peak memory: {usage.peak_memory} B).")
+
+    def _start_memory_tracking(self):
+        """
+        Start tracking the memory of a call.
+
+        :return: None if the memory is not tracked. Otherwise, the traced memory at the start, the number of calls
+            started before the call and if no other call was running at the start.
+        :rtype: Tuple[int, int, bool] | None
+        """
+        memory_tracking = None
+        if self._track_memory:
+            with self._lock:
+                is_only_call = self._number_of_tracing_calls == 0
+                if is_only_call:
+                    if tracemalloc.is_tracing():
+                        self._started_tracing = False
+                    else:
+                        tracemalloc.start()
+                        self._started_tracing = True
+                self._number_of_tracing_calls += 1
+                tracemalloc.reset_peak()
+                memory_tracking = (
+                    tracemalloc.get_traced_memory()[0], self._number_of_started_tracing_calls, is_only_call)
+                self._number_of_started_tracing_calls += 1
+        return memory_tracking
+
+    def _stop_memory_tracking(self, memory_tracking):
+        """
+        Stop tracking the memory of a call.
+
+        :param memory_tracking: The return of :py:func:`_start_memory_tracking`.
+        :type memory_tracking: Tuple[int, int, bool] | None
+        :return: The peak memory of the call or None if the memory is not tracked or other calls ran at the same
+            time, e.g. a call that timed out.
+        :rtype: int | None
+        """
+        peak_memory = None
+        if self._track_memory:
+            with self._lock:
+                start_memory, number_of_previous_calls, is_only_call = memory_tracking
+                if is_only_call and self._number_of_started_tracing_calls == number_of_previous_calls + 1:
+                    peak_memory = max(tracemalloc.get_traced_memory()[1] - start_memory, 0)
+                self._number_of_tracing_calls -= 1
+                if self._number_of_tracing_calls == 0 and self._started_tracing:
+                    tracemalloc.stop()
+        return peak_memory
+
+    def to_json(self, get_company_key=None):
+        """
+        The usage of all companies.
+
+        :param get_company_key: A function to obtain the key for a company. Default, i.e. None, is the company's name.
+        :type get_company_key: Callable[[ShippingCompany], Hashable] | None
+        :return: The usages per company.
+        :rtype: Dict
+        """
+        if get_company_key is None:
+            get_company_key = lambda c: c.name
+        return {get_company_key(c): self._usage[c].to_json() for c in self._usage}
+
+
+def get_company_operation(company, operation, resource_monitor=None):
+    """
+    The operation of a company, metered if there is a resource monitor.
+
+    :param company: The company.
+    :type company: ShippingCompany
+    :param operation: The name of the operation, e.g. 'inform'.
+    :type operation: str
+    :param resource_monitor: The resource monitor or None.
+    :type resource_monitor: AgentResourceMonitor | None
+    :return: The operation or None if the company exceeded its budget.
+    :rtype: Callable | None
+    """
+    if resource_monitor is None:
+        company_operation = getattr(company, operation)
+    else:
+        company_operation = resource_monitor.get_operation(company, operation)
+    return company_operation
@@ -0,0 +1,202 @@
+"""
+Sandboxes to run continuations of a simulation without affecting it.
+
+Each continuation runs in a forked process which has a copy-on-write copy of the simulation. The process's
+changes are therefore never visible to the simulation. Only the summaries of the continuations are sent back.
+"""
+
+import multiprocessing
+import os
+import traceback
+from typing import Dict
+
+import attrs
+import numpy as np
+from loguru import logger
+
+from mable.util import JsonAble
+
+
+@attrs.define
+class CompanyContinuationOutcome(JsonAble):
+    """
+    The outcome of a continuation for one company.
+
+    :param number_of_contracts: The number of contracts the company has at the end of the continuation.
+    :type number_of_contracts: int
+    :param number_of_fulfilled_contracts: The number of those contracts that are fulfilled.
+    :type number_of_fulfilled_contracts: int
+    :param payment: The total payment of the contracts.
+    :type payment: float
+    """
+    number_of_contracts: int = 0
+    number_of_fulfilled_contracts: int = 0
+    payment: float = 0
+
+    def to_json(self):
+        # noinspection PyTypeChecker
+        # CompanyContinuationOutcome is an attrs instance.
+        return attrs.asdict(self)
+
+
+@attrs.define
+class ContinuationSummary(JsonAble):
+    """
+    The summary of a continuation.
+
+    :param end_time: The time of the last event of the continuation.
+    :type end_time: float
+    :param companies: The outcome per company name.
+    :type companies: Dict[str, CompanyContinuationOutcome]
+    """
+    end_time: float
+    companies: Dict[str, CompanyContinuationOutcome] = attrs.field(factory=dict)
+
+    def to_json(self):
+        return {
+            "end_time": self.end_time,
+            "companies": {name: outcome.to_json() for name, outcome in self.companies.items()}
+        }
+
+
+def summarise_continuation(engine):
+    """
+    Summarise the contracts of all companies at the end of a continuation.
+
+    :param engine: The simulation engine of the continuation.
+    :type engine: SimulationEngine
+    :return: The summary.
+    :rtype: ContinuationSummary
+    """
+    summary = ContinuationSummary(engine.world.current_time)
+    market_authority = engine.market_authority
+    for one_company in engine.shipping_companies:
+        contracts = market_authority.contracts_per_company.get(one_company, [])
+        summary.companies[one_company.name] = CompanyContinuationOutcome(
+            number_of_contracts=len(contracts),
+            number_of_fulfilled_contracts=market_authority.get_number_of_fulfilled_contracts(one_company),
+            payment=float(sum(c.payment for c in contracts)))
+    return summary
+
+
+def _get_replacements(engine, policies, default_policy):
+    replacements = {}
+    for one_company in engine.shipping_companies:
+        policy = policies.get(one_company.name, default_policy)
+        replacement = policy(one_company.fleet, one_company.name)
+        replacement.set_engine(engine)
+        if hasattr(replacement, "headquarters"):
+            replacement.headquarters = engine.headquarters
+        replacements[one_company] = replacement
+    return replacements
+
+
+def _prepare_continuation(engine, policies, default_policy, seed_sequence):
+    """
+    Turn the engine into a continuation of the simulation.
+    """
+    engine.disable_profiling()
+    engine.disable_resource_monitoring()
+    engine.headquarters.set_sandbox()
+    for one_observer in list(engine.get_event_observers()):
+        if not one_observer.SANDBOX_SAFE:
+            engine.unregister_event_observer(one_observer)
+    engine.replace_companies(_get_replacements(engine, policies, default_policy))
+    world_seed_sequence, trades_seed_sequence, streams_seed_sequence = seed_sequence.spawn(3)
+    engine.world.random.set_state(np.random.RandomState(world_seed_sequence.generate_state(4)).get_state())
+    engine.world.random_streams.reseed(streams_seed_sequence)
+    engine.shipping.resample_future_trades(int(trades_seed_sequence.generate_state(1)[0]))
+
+
+def _run_continuation(engine, policies, default_policy, end_time, summarise, seed_sequence, connection):
+    """
+    Run one continuation in a forked process and send its summary or the error through the connection.
+    """
+    # The continuation's logs would be mixed with the simulation's logs.
+    logger.remove()
+    try:
+        _prepare_continuation(engine, policies, default_policy, seed_sequence)
+        engine.run_events(end_time)
+        connection.send((True, summarise(engine)))
+    except Exception:
+        connection.send((False, traceback.format_exc()))
+    finally:
+        connection.close()
+
+
+def run_continuations(engine, policies, number_of_continuations=1, end_time=None, summarise=None,
+                      default_policy=None, number_of_processes=None, seed=None):
+    """
+    Run continuations of the simulation from the current state in forked processes.
+
+    The continuations proceed with the next event in the event queue, i.e. an event that is processed while
+    the continuations are started, e.g. an auction that asks the companies for bids, is not part of the
+    continuations. In each continuation all companies are replaced by policies, the random and the random streams
+    are reseeded, the trades that have not been announced are resampled
+    (see :py:func:`Shipping.resample_future_trades`) and the observers that are not sandbox safe
+    (see :py:const:`EventObserver.SANDBOX_SAFE`) are removed.
+
+    :param engine: The simulation engine.
+    :type engine: SimulationEngine
+    :param policies: The policies by company name. A policy is a callable that is given the fleet and the name of the
+        company, e.g. a subclass of :py:class:`TradingCompany`.
+    :type policies: Dict[str, Callable[[List[Vessel], str], ShippingCompany]]
+    :param number_of_continuations: The number of continuations.
+    :type number_of_continuations: int
+    :param end_time: The time after which the continuations stop. Default, i.e. None, is the end of the simulation.
+    :type end_time: float | None
+    :param summarise: Creates the summary of a continuation from its engine, which has to be picklable.
+        Default, i.e. None, is :py:func:`summarise_continuation`.
+    :type summarise: Callable[[SimulationEngine], Any] | None
+    :param default_policy: The policy for companies without a policy. Default, i.e. None, is
+        :py:class:`TradingCompany`.
+    :type default_policy: Callable[[List[Vessel], str], ShippingCompany] | None
+    :param number_of_processes: The maximal number of simultaneously running processes.
+        Default, i.e. None, is the number of CPUs.
+    :type number_of_processes: int | None
+    :param seed: The seed from which the continuations' seeds are derived.
+        Default, i.e. None, is a seed from the operating system's entropy.
+    :type seed: int | None
+    :return: The summaries in the order of the continuations. Continuations that failed have None as the summary.
+    :rtype: List[Any]
+    :raises ValueError: If the platform does not support forking processes.
+    """
+    if "fork" not in multiprocessing.get_all_start_methods():
+        raise ValueError("Sandbox continuations require processes to be started by forking.")
+    if summarise is None:
+        summarise = summarise_continuation
+    if default_policy is None:
+        from mable.cargo_bidding import TradingCompany
+        default_policy = TradingCompany
+    if number_of_processes is None:
+        number_of_processes = os.cpu_count() or 1
+    context = multiprocessing.get_context("fork")
+    seed_sequences = np.random.SeedSequence(seed).spawn(number_of_continuations)
+    summaries = [None] * number_of_continuations
+    pending = list(enumerate(seed_sequences))
+    running = []
+    while len(pending) > 0 or len(running) > 0:
+        while len(pending) > 0 and len(running) < number_of_processes:
+            continuation_index, seed_sequence = pending.pop(0)
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(
+                target=_run_continuation,
+                args=(engine, policies, default_policy, end_time, summarise, seed_sequence, sender),
+                daemon=True)
+            process.start()
+            sender.close()
+            running.append((continuation_index, process, receiver))
+        continuation_index, process, receiver = running.pop(0)
+        try:
+            is_successful, result = receiver.recv()
+        except EOFError:
+            is_successful, result = False, None
+        process.join()
+        receiver.close()
+        if result is None and not is_successful:
+            result = f"The process exited with code {process.exitcode}."
+        if is_successful:
+            summaries[continuation_index] = result
+        else:
+            logger.warning(f"Sandbox continuation {continuation_index} failed: {result}")
+    return summaries
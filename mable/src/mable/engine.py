@@ -5,12 +5,23 @@ Module of the main engine that runs the simulation (loop).
 from __future__ import annotations
 
 from abc import abstractmethod
+import math
+import multiprocessing
+import time
 from typing import TYPE_CHECKING, Dict
 
 from loguru import logger
 
-from mable.event_management import EventExecutionData
+from mable import random_streams
+from mable.checkpointing import write_checkpoint, read_checkpoint
+from mable.event_management import EventExecutionData, VesselEvent
 from mable.competition.information import CompanyHeadquarters, MarketAuthority
+from mable.competition.resources import AgentResourceMonitor
+from mable.parallel import VesselWorkerPool
+from mable.transportation_scheduling import ScheduleVerificationCache
+from mable.instrumentation import (
+    Profiler, EVENT_CATEGORY, OBSERVER_CATEGORY, COMPANY_CATEGORY, ENGINE_CATEGORY, NETWORK_CATEGORY,
+    PHASE_CATEGORY)
 
 if TYPE_CHECKING:
     from mable.event_management import EventObserver, EventQueue
@@ -31,10 +42,11 @@ def pre_run_inform_vessel_locations(simulation_engine):
 
 def pre_run_place_vessels(simulation_engine):
     ports = simulation_engine.world.network.ports
+    placement_random = simulation_engine.world.random_streams.get_generator(random_streams.VESSEL_PLACEMENT)
     for one_company in simulation_engine.shipping_companies:
         for one_vessel in one_company.fleet:
             if one_vessel.location is None:
-                random_port_index = simulation_engine.world.random.randint(len(ports))
+                random_port_index = placement_random.integers(len(ports))
                 random_port = ports[random_port_index]
                 one_vessel.location = random_port
 
@@ -111,6 +123,13 @@ class SimulationEngine:
         self._global_agent_timeout = global_agent_timeout
         self._market_authority = MarketAuthority()
         self._new_schedules = {}
+        self._profiler = None
+        self._resource_monitor = None
+        self._schedule_verification_cache = ScheduleVerificationCache()
+        self._is_restored = False
+        self._is_fast_forwarding = False
+        self._fast_forward_processes = 1
+        self._vessel_worker_pool = None
 
     @property
     def headquarters(self):
@@ -128,13 +147,224 @@ class SimulationEngine:
     def info(self):
         return self._info
 
+    @property
+    def schedule_verification_cache(self):
+        """
+        :return: The cache of the verification results and completion times of all schedules of the simulation.
+        :rtype: ScheduleVerificationCache
+        """
+        return self._schedule_verification_cache
+
+    @property
+    def profiler(self):
+        """
+        :return: The profiler if profiling is enabled and None otherwise.
+        :rtype: Profiler | None
+        """
+        return self._profiler
+
+    def enable_profiling(self, profiler=None):
+        """
+        Time the processing of each event per event type, each observer notification, each call to the companies'
+        'pre_inform', 'inform' and 'receive', the application of new schedules and the network distance calls.
+        The pre run, run and post run phases are timed as well.
+
+        Without profiling the engine runs without any timing.
+
+        :param profiler: The profiler to collect the timings. Default, i.e. None, creates a new profiler.
+        :type profiler: Profiler | None
+        :return: The profiler.
+        :rtype: Profiler
+        """
+        self.disable_profiling()
+        if profiler is None:
+            profiler = Profiler()
+        self._profiler = profiler
+        profiler.instrument(self, "apply_new_schedules", ENGINE_CATEGORY)
+        for one_method_name in ["get_distance", "get_distances"]:
+            profiler.instrument(self._world.network, one_method_name, NETWORK_CATEGORY)
+        for one_company in self._shipping_companies:
+            for one_method_name in ["pre_inform", "inform", "receive"]:
+                if callable(getattr(one_company, one_method_name, None)):
+                    profiler.instrument(
+                        one_company, one_method_name, COMPANY_CATEGORY, f"{one_company.name}.{one_method_name}")
+        return profiler
+
+    def disable_profiling(self):
+        """
+        Stop profiling and remove all timing.
+        """
+        if self._profiler is not None:
+            self._profiler.restore()
+            self._profiler = None
+
+    @property
+    def resource_monitor(self):
+        """
+        :return: The monitor of the companies' resource usage if resource monitoring is enabled and None otherwise.
+        :rtype: AgentResourceMonitor | None
+        """
+        return self._resource_monitor
+
+    def enable_resource_monitoring(self, resource_monitor=None):
+        """
+        Meter the CPU time (and optionally the memory allocation) of the companies' operations and
+        enforce the monitor's budgets.
+
+        :param resource_monitor: The monitor. Default, i.e. None, creates a monitor without budgets.
+        :type resource_monitor: AgentResourceMonitor | None
+        :return: The monitor.
+        :rtype: AgentResourceMonitor
+        """
+        if resource_monitor is None:
+            resource_monitor = AgentResourceMonitor()
+        self._resource_monitor = resource_monitor
+        return resource_monitor
+
+    def disable_resource_monitoring(self):
+        """
+        Stop metering the companies' operations.
+        """
+        self._resource_monitor = None
+
+    @property
+    def is_fast_forwarding(self):
+        """
+        :return: True if the vessel events between other events are fast-forwarded (see :py:func:`enable_fast_forward`).
+        :rtype: bool
+        """
+        return self._is_fast_forwarding
+
+    def enable_fast_forward(self, number_of_processes=1):
+        """
+        Fast-forward the vessels between the other events, e.g. the auctions.
+
+        Nothing but the other events can change the schedules of the vessels. Whenever the next event is a vessel
+        event, each vessel's events up to the next other event are therefore processed in one pass without the
+        event queue and the observers are notified about all these events at once in the order of the events' times
+        (see :py:func:`EventObserver.notify_batch`). When the observers are notified the vessels are already in the
+        state after their last processed event, i.e. observers have to take the state from the events.
+        Profiled runs do not fast-forward.
+
+        With several processes the vessels are partitioned across worker processes which are forked once and
+        process the vessels' events in parallel (see :py:mod:`mable.parallel`). This only pays off if processing
+        the vessels' events between the other events takes considerably longer than exchanging the events and the
+        vessels' states with the workers and if the machine has a CPU core for each process
+        (see :py:mod:`mable.examples.benchmark`). Daemonic processes, e.g. sandbox continuations, cannot start the
+        workers and process the vessels' events in one process.
+
+        :param number_of_processes: The maximal number of processes to process the vessels' events.
+        :type number_of_processes: int
+        :raises ValueError: If several processes are requested and the platform does not support forking processes.
+        """
+        if number_of_processes > 1 and "fork" not in multiprocessing.get_all_start_methods():
+            raise ValueError("Parallel fast-forward requires processes to be started by forking.")
+        if number_of_processes != self._fast_forward_processes:
+            self._close_vessel_worker_pool()
+        self._is_fast_forwarding = True
+        self._fast_forward_processes = number_of_processes
+
+    def disable_fast_forward(self):
+        """
+        Process all events one by one (see :py:func:`enable_fast_forward`).
+        """
+        self._is_fast_forwarding = False
+        self._close_vessel_worker_pool()
+
+    def _get_vessel_worker_pool(self):
+        """
+        The pool of workers of the parallel fast-forward, which is started on the first use.
+
+        :return: The pool or None if this process cannot start worker processes.
+        :rtype: VesselWorkerPool | None
+        """
+        if self._vessel_worker_pool is not None and not self._vessel_worker_pool.is_usable(self):
+            # E.g. the pool of the process this process was forked from, which must not be stopped from here.
+            self._vessel_worker_pool = None
+        if self._vessel_worker_pool is None and not multiprocessing.current_process().daemon:
+            self._vessel_worker_pool = VesselWorkerPool(self, self._fast_forward_processes)
+        return self._vessel_worker_pool
+
+    def _close_vessel_worker_pool(self):
+        """
+        Stop the workers of the parallel fast-forward if they were started by this process.
+        """
+        if self._vessel_worker_pool is not None:
+            self._vessel_worker_pool.close()
+            self._vessel_worker_pool = None
+
+    def replace_companies(self, replacements):
+        """
+        Replace companies, e.g. by policies in sandbox continuations. The contracts and the pending schedules of
+        the replaced companies are transferred to their replacements.
+
+        :param replacements: The replacements by the company they replace.
+        :type replacements: Dict[ShippingCompany, ShippingCompany]
+        """
+        self._close_vessel_worker_pool()
+        self._shipping_companies[:] = [replacements.get(c, c) for c in self._shipping_companies]
+        self._market_authority.replace_companies(replacements)
+        for schedules_per_company in self._new_schedules.values():
+            for one_company in list(schedules_per_company.keys()):
+                schedules_per_company[replacements.get(one_company, one_company)] = \
+                    schedules_per_company.pop(one_company)
+        self._headquarters.invalidate_companies()
+
+    def checkpoint(self, file_path, pickle_companies=True):
+        """
+        Write a checkpoint of the simulation, i.e. the world time, the state of the random and the random streams,
+        the event queue, the vessels and their schedules, the shipping's trades, the market authority's contracts and
+        the event observers. See :py:mod:`mable.checkpointing`.
+
+        :param file_path: The path of the checkpoint file.
+        :type file_path: str | pathlib.Path
+        :param pickle_companies: If True, the companies including their internal state are stored. Otherwise,
+            only the state of their vessels is stored and restoring uses the companies of the engine the checkpoint
+            is restored into, i.e. as re-instantiated from their specification.
+        :type pickle_companies: bool
+        """
+        profiler = self._profiler
+        if profiler is not None:
+            # The timed methods replaced on the companies cannot be pickled.
+            profiler.restore()
+        try:
+            write_checkpoint(self, file_path, pickle_companies)
+        finally:
+            if profiler is not None:
+                self.enable_profiling(profiler)
+
+    def restore(self, file_path):
+        """
+        Restore a checkpoint (see :py:func:`checkpoint`) into this engine, which has to be created from the same
+        specification as the engine of the checkpoint. A subsequent :py:func:`run` continues the simulation
+        from the checkpoint without the pre run commands.
+
+        :param file_path: The path of the checkpoint file.
+        :type file_path: str | pathlib.Path
+        :raises ValueError: If the checkpoint does not match the engine.
+        """
+        self._close_vessel_worker_pool()
+        state = read_checkpoint(self, file_path)
+        if state["shipping_companies"] is not None:
+            self._shipping_companies = state["shipping_companies"]
+        self._shipping = state["shipping"]
+        self._market_authority = state["market_authority"]
+        self._new_schedules = state["new_schedules"]
+        self._event_observer = state["event_observers"]
+        self._resource_monitor = state["resource_monitor"]
+        self._headquarters.invalidate_companies()
+        self._is_restored = True
+        if self._profiler is not None:
+            self.enable_profiling(self._profiler)
+
     def _pre_run(self):
-        self._set_up_trades()
-        for f in self._pre_run_cmds:
-            if isinstance(f, EnginePrePostRunner):
-                f.run(self)
-            else:
-                f(self)
+        if not self._is_restored:
+            self._set_up_trades()
+            for f in self._pre_run_cmds:
+                if isinstance(f, EnginePrePostRunner):
+                    f.run(self)
+                else:
+                    f(self)
 
     def _post_run(self):
         for f in self._post_run_cmds:
@@ -168,11 +398,78 @@ class SimulationEngine:
 
         Start with adding all cargo events into the event queue.
         """
-        self._pre_run()
-        while self._world.do_events_exists():
-            next_event, data = self._process_next_event()
-            self.notify_event_observer(next_event, data)
-        self._post_run()
+        if self._profiler is None:
+            self._pre_run()
+            try:
+                self.run_events()
+            finally:
+                self._close_vessel_worker_pool()
+            self._post_run()
+        else:
+            self._run_profiled()
+
+    def run_events(self, end_time=None):
+        """
+        Process the events and notify the observers without the pre and post run commands.
+
+        :param end_time: Stop before the first event after this time. Default, i.e. None, processes all events.
+        :type end_time: float | None
+        """
+        event_queue = self._world.event_queue
+        while self._world.do_events_exists() and (end_time is None or event_queue.next_event_time() <= end_time):
+            is_fast_forwarded = self._is_fast_forwarding and self._fast_forward_vessels(end_time)
+            if not is_fast_forwarded:
+                next_event, data = self._process_next_event()
+                self.notify_event_observer(next_event, data)
+
+    def _fast_forward_vessels(self, end_time=None):
+        """
+        Process the vessel events before the next other event if the next event is a vessel event.
+        See :py:func:`enable_fast_forward`.
+
+        :param end_time: Do not process events after this time. None is no limit.
+        :type end_time: float | None
+        :return: True if any events were processed and False otherwise.
+        :rtype: bool
+        """
+        event_queue = self._world.event_queue
+        processed_events = []
+        if isinstance(event_queue.queue[0].event, VesselEvent):
+            barrier_time = event_queue.next_non_vessel_event_time()
+            if end_time is not None:
+                barrier_time = min(barrier_time, math.nextafter(end_time, math.inf))
+            vessel_events = event_queue.take_vessel_events(barrier_time)
+            vessel_worker_pool = None
+            if self._fast_forward_processes > 1:
+                vessel_worker_pool = self._get_vessel_worker_pool()
+            if vessel_worker_pool is not None:
+                # The workers own the vessels' states, i.e. even the events of a single vessel are processed by them.
+                processed_events = vessel_worker_pool.process_vessel_events(vessel_events, barrier_time)
+            else:
+                event_queue.hold(barrier_time)
+                try:
+                    processed_events = self.process_vessel_events(vessel_events)
+                finally:
+                    event_queue.release_held_events()
+        if len(processed_events) > 0:
+            processed_events.sort(key=lambda event_and_data: event_and_data[0].time)
+            self._world.set_current_time(processed_events[-1][0].time)
+            self.notify_event_observer_batch(processed_events)
+        return len(processed_events) > 0
+
+    def _run_profiled(self):
+        profiler = self._profiler
+        with profiler.span("pre_run", PHASE_CATEGORY):
+            self._pre_run()
+        with profiler.span("run", PHASE_CATEGORY):
+            while self._world.do_events_exists():
+                start_ns = time.perf_counter_ns()
+                next_event, data = self._process_next_event()
+                profiler.add_span(type(next_event).__name__, EVENT_CATEGORY, start_ns,
+                                  time.perf_counter_ns() - start_ns, {"time": next_event.time})
+                self.notify_event_observer(next_event, data)
+        with profiler.span("post_run", PHASE_CATEGORY):
+            self._post_run()
 
     def add_new_schedules(self, company, schedules, time):
         """
@@ -203,19 +500,18 @@ class SimulationEngine:
         while len(current_new_schedules) > 0:
             one_company = next(iter(current_new_schedules.keys()))
             schedules_for_company = current_new_schedules[one_company]
-            trades_in_all_schedule = [s.get_scheduled_trades() for s in schedules_for_company.values()]
-            trades_in_all_schedule = [t for trades_in_one_schedule in trades_in_all_schedule for t in trades_in_one_schedule]
-            if len(set(trades_in_all_schedule)) == len(trades_in_all_schedule):
+            trades_per_schedule = {v: s.get_scheduled_trades() for v, s in schedules_for_company.items()}
+            trades_in_all_schedule = [t for trades_in_one_schedule in trades_per_schedule.values() for t in trades_in_one_schedule]
+            if len(set(t.key for t in trades_in_all_schedule)) == len(trades_in_all_schedule):
+                trade_keys_previously_awarded = self.market_authority.get_awarded_trade_keys(one_company)
+                trade_keys_currently_awarded = {
+                    c.trade.key for c in distribution_ledger.ledger.get(one_company, [])}
                 for one_vessel in schedules_for_company.keys():
                     schedule_for_vessel = schedules_for_company[one_vessel]
                     if schedule_for_vessel.verify_schedule():
-                        trades_previously_awarded_to_company = [c.trade for c in self.market_authority.contracts_per_company.get(one_company, [])]
-                        trades_currently_awarded_to_company = [c.trade for c in distribution_ledger.ledger.get(one_company, [])]
-                        trades_awarded_to_company = trades_previously_awarded_to_company + trades_currently_awarded_to_company
-                        trades_in_schedule = [t for t in schedule_for_vessel.get_scheduled_trades()]
-                        all_scheduled_trades_awarded_individually = [
-                            t in trades_awarded_to_company for t in trades_in_schedule]
-                        all_scheduled_trades_awarded = all(all_scheduled_trades_awarded_individually)
+                        all_scheduled_trades_awarded = all(
+                            t.key in trade_keys_previously_awarded or t.key in trade_keys_currently_awarded
+                            for t in trades_per_schedule[one_vessel])
                         if all_scheduled_trades_awarded:
                             one_vessel.schedule = schedule_for_vessel
                         else:
@@ -327,6 +623,42 @@ class SimulationEngine:
         """
         self._event_observer.remove(observer)
 
+    def process_vessel_events(self, vessel_events):
+        """
+        **WARNING**: Part of internal simulation logic. Only allowed to be called by the simulation!
+
+        Process the vessels' events and each vessel's following events that the event queue holds
+        (see :py:func:`EventQueue.hold`) one vessel after the other. The observers are not notified.
+
+        :param vessel_events: The current events of the vessels, which are not in the event queue.
+        :type vessel_events: List[VesselEvent]
+        :return: The processed events and their associated data.
+        :rtype: List[Tuple[VesselEvent, EventExecutionData]]
+        """
+        event_queue = self._world.event_queue
+        processed_events = []
+        for one_vessel_event in vessel_events:
+            # The events of one vessel follow each other via the held events.
+            next_event = one_vessel_event
+            while next_event is not None:
+                self._world.set_current_time(next_event.time)
+                data = EventExecutionData()
+                data.action_data = next_event.event_action(self)
+                processed_events.append((next_event, data))
+                next_event = event_queue.pop_held_event()
+        return processed_events
+
+    def notify_event_observer_batch(self, events):
+        """
+        Notify the observers about several events at once (see :py:func:`EventObserver.notify_batch`).
+
+        :param events: The events in the order of their occurrence and their associated data.
+        :type events: List[Tuple[Event, EventExecutionData]]
+        """
+        logger.debug("Notify {} event observers about {} events.", len(self._event_observer), len(events))
+        for one_observer in self._event_observer:
+            one_observer.notify_batch(self, events)
+
     def notify_event_observer(self, event, data):
         """
         Notify observer about an event that has occurred.
@@ -335,7 +667,14 @@ class SimulationEngine:
         :param data: EventExecutionData
             Additional data in conjunction with the event. E.g. data that was produced or changes that were made.
         """
-        logger.debug(f"Notify {len(self._event_observer)} event observers about event: {event}")
-        for one_observer in self._event_observer:
-            logger.debug(f"Notify event observer {type(one_observer).__name__}: {event}")
-            one_observer.notify(self, event, data)
+        logger.debug("Notify {} event observers about event: {}", len(self._event_observer), event)
+        if self._profiler is None:
+            for one_observer in self._event_observer:
+                logger.debug("Notify event observer {}: {}", type(one_observer).__name__, event)
+                one_observer.notify(self, event, data)
+        else:
+            event_type_name = type(event).__name__
+            for one_observer in self._event_observer:
+                logger.debug("Notify event observer {}: {}", type(one_observer).__name__, event)
+                with self._profiler.span(type(one_observer).__name__, OBSERVER_CATEGORY, {"event": event_type_name}):
+                    one_observer.notify(self, event, data)
@@ -4,6 +4,7 @@ Event management module.
 
 from abc import abstractmethod
 from dataclasses import dataclass, field
+import heapq
 import math
 from queue import PriorityQueue
 from typing import Any, TYPE_CHECKING, List
@@ -23,18 +24,49 @@ if TYPE_CHECKING:
 class Event:
     """
     One event.
+
+    Events only keep their raw fields. The info is built on its first access (see :py:func:`_build_info`)
+    unless it was set.
     """
 
+    __slots__ = ("_time", "_info")
+
     def __init__(self, time, info=None):
         """
         :param time: The occurrence time of the event.
         :type time: float
-        :param info: Some info on the event for logging etc.
+        :param info: Some info on the event for logging etc. Default, i.e. None, is to build the info from
+            the event's fields when it is requested.
         :type info: str
         """
         super().__init__()
         self._time = time
-        self.info = info
+        self._info = info
+
+    @property
+    def info(self):
+        """
+        Some info on the event for logging etc.
+
+        :return: The info.
+        :rtype: str | None
+        """
+        if self._info is None:
+            self._info = self._build_info()
+        return self._info
+
+    @info.setter
+    def info(self, info):
+        self._info = info
+
+    def _build_info(self):
+        """
+        Build the info from the event's fields. There is no info on default.
+
+        :return: The info.
+        :rtype: str | None
+        """
+        return None
 
     @property
     def time(self):
@@ -88,6 +120,8 @@ class FirstCargoAnnouncementEvent(Event):
     Announces future cargoes at the start of the simulation before a cargo auction at time 0.
     """
 
+    __slots__ = ("_cargo_available_time_second_cargo",)
+
     def __init__(self, time, cargo_available_time_second_cargo):
         super().__init__(time)
         self._cargo_available_time_second_cargo = cargo_available_time_second_cargo
@@ -102,7 +136,8 @@ class FirstCargoAnnouncementEvent(Event):
         """
         all_trades_later = engine.shipping.get_trades(self._cargo_available_time_second_cargo)
         engine.market.inform_future_trades(
-            all_trades_later, self._cargo_available_time_second_cargo, engine.shipping_companies)
+            all_trades_later, self._cargo_available_time_second_cargo, engine.shipping_companies,
+            resource_monitor=engine.resource_monitor)
         self.info = (f"#Trades: {len(all_trades_later)}."
                      f" For time {format_time(self._cargo_available_time_second_cargo)}")
         engine.world.event_queue.put(engine.class_factory.generate_event_cargo(0))
@@ -114,6 +149,8 @@ class CargoAnnouncementEvent(Event):
     Announces future cargoes
     """
 
+    __slots__ = ("_cargo_available_time",)
+
     def __init__(self, time, cargo_available_time):
         super().__init__(time)
         self._cargo_available_time = cargo_available_time
@@ -126,7 +163,9 @@ class CargoAnnouncementEvent(Event):
         :type engine: SimulationEngine
         """
         all_trades = engine.shipping.get_trades(self._cargo_available_time)
-        engine.market.inform_future_trades(all_trades, self._cargo_available_time, engine.shipping_companies)
+        engine.market.inform_future_trades(
+            all_trades, self._cargo_available_time, engine.shipping_companies,
+            resource_monitor=engine.resource_monitor)
         self.info = f"#Trades: {len(all_trades)}. For time {format_time(self._cargo_available_time)}"
         engine.world.event_queue.put(engine.class_factory.generate_event_cargo(self._cargo_available_time))
 
@@ -136,6 +175,8 @@ class CargoEvent(Event):
     An event of appearance of cargoes.
     """
 
+    __slots__ = ()
+
     def __init__(self, time):
         super().__init__(time)
 
@@ -159,6 +200,8 @@ class DurationEvent(Event):
     An event that has a duration.
     """
 
+    __slots__ = ("_time_started",)
+
     def __init__(self, time):
         """
         An unstarted event has a start time of -1.
@@ -218,6 +261,8 @@ class VesselEvent(DurationEvent):
     An event that involves a vessel.
     """
 
+    __slots__ = ("_vessel",)
+
     def __init__(self, time, vessel):
         """
         Constructor.
@@ -276,9 +321,10 @@ class VesselEvent(DurationEvent):
         :rtype: bool
         """
         are_same = False
+        # The info is compared last since it may have to be built.
         if (isinstance(other, VesselEvent)
-                and super().__eq__(other)
-                and self._vessel == other.vessel):
+                and self._vessel == other.vessel
+                and super().__eq__(other)):
             are_same = True
         return are_same
 
@@ -288,6 +334,8 @@ class VesselLocationInformationEvent(VesselEvent):
     An event that informs about the location of a vessel.
     """
 
+    __slots__ = ("_location",)
+
     def __init__(self, time, vessel, location):
         """
         Constructor.
@@ -300,7 +348,9 @@ class VesselLocationInformationEvent(VesselEvent):
         """
         super().__init__(time, vessel)
         self._location = location
-        self.info = f"{self._vessel._engine.find_company_for_vessel(self._vessel).name}'s {self._vessel.name} in {self._location.name}"
+
+    def _build_info(self):
+        return f"{self._vessel._engine.find_company_for_vessel(self._vessel).name}'s {self._vessel.name} in {self._location.name}"
 
     @property
     def location(self):
@@ -325,6 +375,8 @@ class VesselLocationInformationEvent(VesselEvent):
 
 class TravelEvent(VesselEvent):
 
+    __slots__ = ("_origin", "_destination", "_is_laden")
+
     def __init__(self, time, vessel, origin, destination):
         """
         Constructor for a vessel that performs a journey.
@@ -341,8 +393,10 @@ class TravelEvent(VesselEvent):
         self._origin = origin
         self._destination = destination
         self._is_laden = False
-        self.info = (f"{destination} travel (Vessel [name: {vessel.name}]: "
-                     f"{origin}->{destination})")
+
+    def _build_info(self):
+        return (f"{self._destination} travel (Vessel [name: {self._vessel.name}]: "
+                f"{self._origin}->{self._destination})")
 
     @property
     def location(self):
@@ -399,6 +453,8 @@ class IdleEvent(VesselEvent):
     An event where the vessel is doing nothing.
     """
 
+    __slots__ = ("_location",)
+
     def __init__(self, time, vessel, location):
         """
         Constructor.
@@ -411,7 +467,9 @@ class IdleEvent(VesselEvent):
         """
         super().__init__(time, vessel)
         self._location = location
-        self.info = f"{location} idling (Vessel [name: {vessel.name}])"
+
+    def _build_info(self):
+        return f"{self._location} idling (Vessel [name: {self._vessel.name}])"
 
     @property
     def location(self):
@@ -437,8 +495,8 @@ class IdleEvent(VesselEvent):
         """
         are_same = False
         if (isinstance(other, IdleEvent)
-                and super().__eq__(other)
-                and self._location == other.location):
+                and self._location == other.location
+                and super().__eq__(other)):
             are_same = True
         return are_same
 
@@ -448,6 +506,8 @@ class VesselCargoEvent(VesselEvent):
     An event that involves a vessel and a trade.
     """
 
+    __slots__ = ("_trade", "_is_pickup")
+
     def __init__(self, time, vessel, trade, is_pickup):
         """
         Constructor.
@@ -464,13 +524,17 @@ class VesselCargoEvent(VesselEvent):
         super().__init__(time, vessel)
         self._trade = trade
         self._is_pickup = is_pickup
-        if is_pickup:
-            self.info = (f"{trade.origin_port} pick up (Vessel [name: {vessel.name}], Trade [{trade.cargo_type}, "
-                         f"{trade.amount}]: {trade.origin_port}->{trade.destination_port})")
+
+    def _build_info(self):
+        trade = self._trade
+        if self._is_pickup:
+            info = (f"{trade.origin_port} pick up (Vessel [name: {self._vessel.name}], Trade [{trade.cargo_type}, "
+                    f"{trade.amount}]: {trade.origin_port}->{trade.destination_port})")
         else:
-            self.info = (f"{trade.destination_port} drop off (Vessel [name: {vessel.name}],"
-                         f" Trade [{trade.cargo_type}, {trade.amount}]: "
-                         f"{trade.origin_port}->{trade.destination_port})")
+            info = (f"{trade.destination_port} drop off (Vessel [name: {self._vessel.name}],"
+                    f" Trade [{trade.cargo_type}, {trade.amount}]: "
+                    f"{trade.origin_port}->{trade.destination_port})")
+        return info
 
     @property
     def is_pickup(self):
@@ -546,8 +610,28 @@ class ArrivalEvent(VesselCargoEvent):
     An event where a vessel arrives for loading or unloading.
     """
 
+    __slots__ = ("_is_laden",)
+
+    def __init__(self, time, vessel, trade, is_pickup):
+        """
+        Constructor. See :py:class:`VesselCargoEvent`.
+        """
+        super().__init__(time, vessel, trade, is_pickup)
+        self._is_laden = False
+
+    @property
+    def is_laden(self):
+        """
+        Indicates if the vessel is laden on the voyage to the port.
+
+        Only determined once the event has occurred. False beforehand.
+        :return: True if laden and False if under ballast.
+        """
+        return self._is_laden
+
     def event_action(self, engine):
         super().event_action(engine)
+        self._is_laden = self._vessel.has_any_load()
         if self.is_pickup:
             if self.trade.time_window[0] is not None and self.time < self.trade.time_window[0]:
                 logger.error(f"Company {engine.find_company_for_vessel(self.vessel).name}"
@@ -591,6 +675,8 @@ class CargoTransferEvent(VesselCargoEvent):
     A loading or unloading event.
     """
 
+    __slots__ = ()
+
     def event_action(self, engine):
         super().event_action(engine)
         if self.is_pickup:
@@ -626,6 +712,11 @@ class EventQueue(SimulationEngineAware, PriorityQueue[EventItem]):
 
     def __init__(self):
         super().__init__()
+        self._hold_end_time = None
+        self._held_events = []
+        self._number_of_held_events = 0
+        self._non_vessel_event_times = []
+        self._removed_non_vessel_event_times = {}
 
     def put(self, event: Event, block=True, timeout=None):
         """
@@ -645,8 +736,14 @@ class EventQueue(SimulationEngineAware, PriorityQueue[EventItem]):
         #     raise ValueError(f"Event {event} in the past. Current time: {self._engine.world.current_time}")
         event.added_to_queue(self._engine)
         event_item = EventItem(event.time, event)
-        logger.debug(f"Added event to queue: {event_item}.")
-        super().put(event_item, block, timeout)
+        if self._hold_end_time is not None and event.time < self._hold_end_time:
+            logger.debug("Held event: {}.", event_item)
+            # The number of held events breaks ties of the time in the order the events were put.
+            heapq.heappush(self._held_events, (event.time, self._number_of_held_events, event))
+            self._number_of_held_events += 1
+        else:
+            logger.debug("Added event to queue: {}.", event_item)
+            super().put(event_item, block, timeout)
 
     def get(self, block=True, timeout=None):
         """
@@ -661,6 +758,41 @@ class EventQueue(SimulationEngineAware, PriorityQueue[EventItem]):
         event = event_item.event
         return event
 
+    def _put(self, item):
+        """
+        Adds an event item to the heap and keeps track of the times of the events that are not vessel events.
+
+        :param item: The event item.
+        :type item: EventItem
+        """
+        super()._put(item)
+        if not isinstance(item.event, VesselEvent):
+            heapq.heappush(self._non_vessel_event_times, item.time)
+
+    def _get(self):
+        """
+        Removes the next event item from the heap and keeps track of the times of the events that are not vessel
+        events.
+
+        :return: The event item.
+        :rtype: EventItem
+        """
+        item = super()._get()
+        self._discard_non_vessel_event_time(item)
+        return item
+
+    def _discard_non_vessel_event_time(self, item):
+        """
+        Marks the time of a removed event item as removed if the event is not a vessel event.
+        The time is only dropped from the heap of times once it is the earliest (see
+        :py:func:`next_non_vessel_event_time`).
+
+        :param item: The removed event item.
+        :type item: EventItem
+        """
+        if not isinstance(item.event, VesselEvent):
+            self._removed_non_vessel_event_times[item.time] = self._removed_non_vessel_event_times.get(item.time, 0) + 1
+
     def remove(self, event_s):
         """
         Removes one or more events from the queue.
@@ -672,12 +804,145 @@ class EventQueue(SimulationEngineAware, PriorityQueue[EventItem]):
             event_s = [event_s]
         for one_event in event_s:
             event_to_remove = EventItem(one_event.time, one_event)
-            try:
-                self.queue.remove(event_to_remove)
-                logger.debug(f"Removed event from queue: {event_to_remove}.")
-            except ValueError:
+            # Event items compare by time only, i.e. the item of the event itself has to be found.
+            index = self._find_event_index(one_event)
+            if index is None:
                 logger.warning(f"Tried to remove event which is not in the queue: {event_to_remove}.")
+            else:
+                removed_item = self.queue.pop(index)
+                heapq.heapify(self.queue)
+                self._discard_non_vessel_event_time(removed_item)
+                logger.debug("Removed event from queue: {}.", event_to_remove)
+
+    def _find_event_index(self, event):
+        """
+        The index of the event's item in the queue, preferring the event itself over an equal event.
+
+        :param event: The event.
+        :type event: Event
+        :return: The index or None if neither the event nor an equal event is in the queue.
+        :rtype: int | None
+        """
+        equal_index = None
+        index = None
+        i = 0
+        while i < len(self.queue) and index is None:
+            current_event = self.queue[i].event
+            if current_event is event:
+                index = i
+            elif equal_index is None and current_event.time == event.time and current_event == event:
+                equal_index = i
+            i += 1
+        if index is None:
+            index = equal_index
+        return index
+
+    def hold(self, end_time):
+        """
+        Hold back the events that are put with a time before the end time instead of adding them to the queue
+        until :py:func:`release_held_events` is called. The held events are obtained via :py:func:`pop_held_event`.
+
+        :param end_time: The time before which events are held.
+        :type end_time: float
+        """
+        self._hold_end_time = end_time
+
+    def restore_event(self, event):
+        """
+        Adds an event that has already been started, e.g. in another process, to the queue without starting it again.
+
+        :param event: The event.
+        :type event: Event
+        """
+        super().put(EventItem(event.time, event))
+
+    def pop_held_event(self):
+        """
+        Removes and returns the earliest held event.
+
+        :return: The event or None if no event is held.
+        :rtype: Event | None
+        """
+        next_event = None
+        if len(self._held_events) > 0:
+            _, _, next_event = heapq.heappop(self._held_events)
+        return next_event
+
+    def release_held_events(self):
+        """
+        Stop holding back events and add the events that are still held to the queue.
+        """
+        self._hold_end_time = None
+        held_events = self._held_events
+        self._held_events = []
+        for _, _, one_event in held_events:
+            self.restore_event(one_event)
+
+    def take_vessel_events(self, end_time):
+        """
+        Removes and returns all vessel events before the end time.
+
+        :param end_time: The time before which the events are taken.
+        :type end_time: float
+        :return: The events ordered by time.
+        :rtype: List[VesselEvent]
+        """
+        vessel_event_items = []
+        remaining_event_items = []
+        for one_event_item in self.queue:
+            if isinstance(one_event_item.event, VesselEvent) and one_event_item.time < end_time:
+                vessel_event_items.append(one_event_item)
+            else:
+                remaining_event_items.append(one_event_item)
+        if len(vessel_event_items) > 0:
+            self.queue[:] = remaining_event_items
+            heapq.heapify(self.queue)
+        return [one_event_item.event for one_event_item in sorted(vessel_event_items)]
+
+    def restore_event_items(self, event_items):
+        """
+        Replaces the content of the queue, e.g. with the event items of a checkpoint.
+
+        :param event_items: The event items.
+        :type event_items: List[EventItem]
+        """
+        self.queue[:] = event_items
+        heapq.heapify(self.queue)
+        self._non_vessel_event_times = [one_event_item.time for one_event_item in self.queue
+                                        if not isinstance(one_event_item.event, VesselEvent)]
+        heapq.heapify(self._non_vessel_event_times)
+        self._removed_non_vessel_event_times = {}
+
+    def next_non_vessel_event_time(self):
+        """
+        The time of the next event that is not a vessel event.
+
+        :return: The time of the next such event or math.inf if the queue has no such event.
+        :rtype: float
+        """
+        non_vessel_event_times = self._non_vessel_event_times
+        removed_event_times = self._removed_non_vessel_event_times
+        while len(non_vessel_event_times) > 0 and non_vessel_event_times[0] in removed_event_times:
+            removed_time = heapq.heappop(non_vessel_event_times)
+            removed_event_times[removed_time] -= 1
+            if removed_event_times[removed_time] == 0:
+                del removed_event_times[removed_time]
+        next_time = math.inf
+        if len(non_vessel_event_times) > 0:
+            next_time = non_vessel_event_times[0]
+        return next_time
 
+    def next_event_time(self):
+        """
+        The time of the next event.
+
+        :return: The time of the next event or math.inf if the queue is empty.
+        :rtype: float
+        """
+        next_time = math.inf
+        if len(self.queue) > 0:
+            next_time = self.queue[0].time
+        return next_time
 
     def purge(self, vessel):
         """
@@ -703,15 +968,7 @@ class EventQueue(SimulationEngineAware, PriorityQueue[EventItem]):
         :return: True if such an event is in the queue and False otherwise.
         :rtype: bool
         """
-        i = 0
-        found_event = False
-        event_item = EventItem(event.time, event)
-        while i < len(self.queue) and not found_event:
-            current_event_item = self.queue[i]
-            if event_item == current_event_item:
-                found_event = True
-            i += 1
-        return found_event
+        return self._find_event_index(event) is not None
 
     def __getitem__(self, event):
         """
@@ -723,17 +980,10 @@ class EventQueue(SimulationEngineAware, PriorityQueue[EventItem]):
         :rtype: bool
         :raises ValueError: If no such event is in the queue.
         """
-        i = 0
-        found_event = None
-        event_item = EventItem(event.time, event)
-        while i < len(self.queue) and not found_event:
-            current_event_item = self.queue[i]
-            if event_item == current_event_item:
-                found_event = current_event_item.event
-            i += 1
-        if found_event is None:
+        index = self._find_event_index(event)
+        if index is None:
             raise ValueError(event)
-        return found_event
+        return self.queue[index].event
 
     def __iter__(self):
         """
@@ -747,6 +997,13 @@ class EventObserver:
     An observer of event occurrences.
     """
 
+    SANDBOX_SAFE = True
+    """
+    Indicates if the observer is kept in sandbox continuations of the simulation
+    (see :py:func:`CompanyHeadquarters.simulate_futures`). Observers with effects outside the simulation,
+    e.g. writing files, are not.
+    """
+
     @abstractmethod
     def notify(self, engine, event, data):
         """
@@ -761,6 +1018,26 @@ class EventObserver:
         """
         pass
 
+    def notify_batch(self, engine, events):
+        """
+        Notify this observer of several events at once, e.g. the events of a fast-forward
+        (see :py:func:`SimulationEngine.enable_fast_forward`). Notifies about each event in turn on default.
+
+        :param engine: Simulation engine.
+        :type engine: SimulationEngine
+        :param events: The events in the order of their occurrence and their associated data.
+        :type events: List[Tuple[Event, EventExecutionData]]
+        """
+        for one_event, one_data in events:
+            self.notify(engine, one_event, one_data)
+
+    def prepare_checkpoint(self):
+        """
+        Called before a checkpoint of the simulation is written (see :py:func:`SimulationEngine.checkpoint`),
+        e.g. to write buffered data. Does nothing on default.
+        """
+        pass
+
 
 @dataclass
 class EventExecutionData:
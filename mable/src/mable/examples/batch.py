@@ -0,0 +1,170 @@
+"""
+Parallel runs of one simulation setting across many seeds.
+"""
+
+import glob
+import json
+import multiprocessing
+import os
+import pathlib
+import traceback
+
+import attrs
+import numpy as np
+from loguru import logger
+
+from mable.competition.generation import CompetitionBuilder, AuctionClassFactory
+from mable.examples import environment
+from mable.io.metrics_files import load_metrics, get_metrics_overview
+from mable.util import JsonAble, JsonAbleEncoder
+
+
+OVERVIEW_KEYS = ["income", "cost", "penalty", "revenue"]
+
+
+@attrs.define
+class BatchRunResult(JsonAble):
+    """
+    The result of one run of a batch.
+
+    :param seed: The seed of the run.
+    :type seed: int
+    :param output_directory: The directory of the run's output files.
+    :type output_directory: str
+    :param overview: The cost, penalty, revenue and income per company name (see :py:func:`get_metrics_overview`)
+        or None if the run failed.
+    :type overview: Dict[str, Dict[str, float]] | None
+    :param error: The error if the run failed.
+    :type error: str | None
+    """
+    seed: int
+    output_directory: str
+    overview: dict | None = None
+    error: str | None = None
+
+    def to_json(self):
+        # noinspection PyTypeChecker
+        # BatchRunResult is an attrs instance.
+        return attrs.asdict(self)
+
+
+def aggregate_runs(run_results):
+    """
+    Aggregate the income, cost, penalty and revenue of each company across all successful runs.
+
+    :param run_results: The results of the runs.
+    :type run_results: List[BatchRunResult]
+    :return: Per company name and key the mean, standard deviation, minimum and maximum.
+    :rtype: Dict[str, Dict[str, Dict[str, float]]]
+    """
+    values = {}
+    for one_result in run_results:
+        if one_result.overview is not None:
+            for company_name, company_overview in one_result.overview.items():
+                company_values = values.setdefault(company_name, {key: [] for key in OVERVIEW_KEYS})
+                for key in OVERVIEW_KEYS:
+                    company_values[key].append(company_overview[key])
+    aggregate = {}
+    for company_name, company_values in values.items():
+        aggregate[company_name] = {}
+        for key, key_values in company_values.items():
+            key_values = np.array(key_values, dtype=float)
+            aggregate[company_name][key] = {
+                "mean": float(np.mean(key_values)),
+                "std": float(np.std(key_values)),
+                "min": float(np.min(key_values)),
+                "max": float(np.max(key_values))
+            }
+    return aggregate
+
+
+# The setting of the batch which the forked processes inherit.
+_batch_setting = None
+
+
+def _run_one(seed):
+    """
+    Run the simulation of the batch setting with one seed.
+
+    :param seed: The seed.
+    :type seed: int
+    :return: The result.
+    :rtype: BatchRunResult
+    """
+    build_setting, output_directory, network, log_level, simulation_kwargs = _batch_setting
+    run_output_directory = pathlib.Path(output_directory) / f"run_{seed}"
+    run_output_directory.mkdir(parents=True, exist_ok=True)
+    result = BatchRunResult(seed, str(run_output_directory))
+    logger.remove()
+    log_handler_id = logger.add(run_output_directory / "simulation.log", level=log_level)
+    try:
+        specifications_builder = build_setting()
+        specifications_builder.add_random_specifications(seed=seed)
+        simulation = environment.generate_simulation(
+            specifications_builder, output_directory=str(run_output_directory), network=network,
+            **simulation_kwargs)
+        simulation.run()
+        metrics_file_names = sorted(glob.glob(str(run_output_directory / "metrics_competition_*.json*")),
+                                    key=os.path.getmtime)
+        result.overview = get_metrics_overview(load_metrics(metrics_file_names[-1]))
+    except Exception:
+        result.error = traceback.format_exc()
+    finally:
+        logger.remove(log_handler_id)
+    return result
+
+
+def run_batch(build_setting, seeds, output_directory=".", number_of_processes=None,
+              log_level="WARNING", **simulation_kwargs):
+    """
+    Run the same simulation setting with several seeds in parallel processes and aggregate the companies'
+    income, cost, penalty and revenue across the runs.
+
+    The world resources are loaded once before the runs: the network including the routes is shared by all runs
+    and the cargo distributions and precomputed routes are cached (see
+    :py:func:`DistributionShipping.load_precomputed_routes`). The processes are forked and thereby inherit these
+    resources without copying them.
+
+    Each run writes its output files and log to the directory 'run_<seed>' in the output directory. The results
+    of all runs and the aggregate are written to 'batch_summary.json'.
+
+    :param build_setting: Creates the specifications builder of the setting, i.e. the environment and
+        the companies (see :py:func:`get_specification_builder`). The seed of each run is added as the random
+        specification.
+    :type build_setting: Callable[[], FuelSpecsBuilder]
+    :param seeds: The seeds of the runs.
+    :type seeds: List[int]
+    :param output_directory: The directory for the output of the runs.
+    :type output_directory: str
+    :param number_of_processes: The number of processes. Default, i.e. None, is the number of CPUs.
+    :type number_of_processes: int | None
+    :param log_level: The level of the runs' logs.
+    :type log_level: str
+    :param simulation_kwargs: Further keyword arguments for :py:func:`generate_simulation`.
+    :return: The results of the runs in the order of the seeds and the aggregate (see :py:func:`aggregate_runs`).
+    :rtype: Tuple[List[BatchRunResult], Dict[str, Dict[str, Dict[str, float]]]]
+    :raises ValueError: If the platform does not support forking processes.
+    """
+    global _batch_setting
+    if "fork" not in multiprocessing.get_all_start_methods():
+        raise ValueError("Batch runs require processes to be started by forking.")
+    if number_of_processes is None:
+        number_of_processes = os.cpu_count() or 1
+    pathlib.Path(output_directory).mkdir(parents=True, exist_ok=True)
+    # Building one engine loads the network and fills the caches of the distributions and routes.
+    prototype_builder = CompetitionBuilder(AuctionClassFactory(), build_setting().build())
+    prototype_builder.generate_engine()
+    network = prototype_builder.network
+    _batch_setting = (build_setting, output_directory, network, log_level, simulation_kwargs)
+    try:
+        with multiprocessing.get_context("fork").Pool(number_of_processes) as pool:
+            run_results = pool.map(_run_one, seeds, chunksize=1)
+    finally:
+        _batch_setting = None
+    for one_result in run_results:
+        if one_result.error is not None:
+            logger.warning(f"Run with seed {one_result.seed} failed: {one_result.error}")
+    aggregate = aggregate_runs(run_results)
+    with open(pathlib.Path(output_directory) / "batch_summary.json", "w") as summary_file:
+        json.dump({"runs": run_results, "aggregate": aggregate}, summary_file, indent=4, cls=JsonAbleEncoder)
+    return run_results, aggregate
@@ -0,0 +1,238 @@
+"""
+Benchmark of the simulation throughput in events per second with and without headless mode and of the parallel
+fast-forward with different numbers of processes.
+"""
+
+import pathlib
+import sys
+import time
+
+import attrs
+from loguru import logger
+
+from mable.event_management import EventObserver
+from mable.examples import environment
+from mable.util import JsonAble
+
+
+DEFAULT_MODE = "default"
+HEADLESS_MODE = "headless"
+FAST_FORWARD_MODE = "fast-forward"
+
+
+@attrs.define
+class BenchmarkResult(JsonAble):
+    """
+    The result of the fastest run of a mode.
+
+    :param mode: The mode, i.e. :py:const:`DEFAULT_MODE`, :py:const:`HEADLESS_MODE` or
+        :py:const:`FAST_FORWARD_MODE` with the number of processes, e.g. 'fast-forward-2'.
+    :type mode: str
+    :param number_of_events: The number of events the run processed.
+    :type number_of_events: int
+    :param seconds: The wall time of the run in seconds.
+    :type seconds: float
+    """
+    mode: str
+    number_of_events: int
+    seconds: float
+
+    @property
+    def events_per_second(self):
+        """
+        :return: The number of events per second.
+        :rtype: float
+        """
+        return self.number_of_events / self.seconds if self.seconds > 0 else float("inf")
+
+    def to_json(self):
+        # noinspection PyTypeChecker
+        # BenchmarkResult is an attrs instance.
+        result = attrs.asdict(self)
+        result["events_per_second"] = self.events_per_second
+        return result
+
+
+class EventCountObserver(EventObserver):
+    """
+    Counts the events of a simulation.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.number_of_events = 0
+
+    def notify(self, engine, event, data):
+        self.number_of_events += 1
+
+    def notify_batch(self, engine, events):
+        self.number_of_events += len(events)
+
+
+def measure_events_per_second(simulation):
+    """
+    Run a simulation and count its events.
+
+    :param simulation: The simulation.
+    :type simulation: SimulationEngine
+    :return: The number of events and the wall time of the run in seconds.
+    :rtype: Tuple[int, float]
+    """
+    count_observer = EventCountObserver()
+    simulation.register_event_observer(count_observer)
+    start_time = time.perf_counter()
+    simulation.run()
+    seconds = time.perf_counter() - start_time
+    simulation.unregister_event_observer(count_observer)
+    return count_observer.number_of_events, seconds
+
+
+def compare_modes(build_simulation, repetitions=3, log_file_path=None):
+    """
+    Compare the throughput of the default mode, i.e. all events are logged at DEBUG level, with the headless mode,
+    i.e. no observers that log the events and only warnings are logged (see
+    :py:func:`mable.examples.environment.generate_simulation`).
+
+    The logger's handlers are replaced during the runs and a handler for stderr is added afterwards.
+
+    :param build_simulation: Creates the simulation for a mode given if the mode is headless.
+    :type build_simulation: Callable[[bool], SimulationEngine]
+    :param repetitions: The number of runs per mode of which the fastest is reported.
+    :type repetitions: int
+    :param log_file_path: The file the runs log to. Default, i.e. None, discards the log messages.
+    :type log_file_path: str | pathlib.Path | None
+    :return: The results of the default mode and of the headless mode.
+    :rtype: Tuple[BenchmarkResult, BenchmarkResult]
+    """
+    sink = (lambda _: None) if log_file_path is None else log_file_path
+    results = []
+    try:
+        for mode, log_level in [(DEFAULT_MODE, "DEBUG"), (HEADLESS_MODE, "WARNING")]:
+            results.append(_get_fastest_result(
+                mode, lambda: build_simulation(mode == HEADLESS_MODE), repetitions, sink, log_level))
+    finally:
+        logger.remove()
+        logger.add(sys.stderr)
+    return results[0], results[1]
+
+
+def compare_fast_forward_processes(build_simulation, numbers_of_processes, repetitions=3, log_file_path=None):
+    """
+    Compare the throughput of the fast-forward with different numbers of processes
+    (see :py:func:`SimulationEngine.enable_fast_forward`). Only warnings are logged.
+
+    Several processes only pay off if processing the vessels' events between the auctions takes considerably longer
+    than exchanging the events and the vessels' states with the worker processes and if the machine has a CPU core
+    for each process. Enable the parallel fast-forward for a setting if it is faster than one process here.
+
+    The logger's handlers are replaced during the runs and a handler for stderr is added afterwards.
+
+    :param build_simulation: Creates the simulation with the fast-forward enabled given the number of processes.
+    :type build_simulation: Callable[[int], SimulationEngine]
+    :param numbers_of_processes: The numbers of processes to compare.
+    :type numbers_of_processes: List[int]
+    :param repetitions: The number of runs per number of processes of which the fastest is reported.
+    :type repetitions: int
+    :param log_file_path: The file the runs log to. Default, i.e. None, discards the log messages.
+    :type log_file_path: str | pathlib.Path | None
+    :return: The results in the order of the numbers of processes.
+    :rtype: List[BenchmarkResult]
+    """
+    sink = (lambda _: None) if log_file_path is None else log_file_path
+    results = []
+    try:
+        for one_number_of_processes in numbers_of_processes:
+            results.append(_get_fastest_result(
+                f"{FAST_FORWARD_MODE}-{one_number_of_processes}",
+                lambda: build_simulation(one_number_of_processes), repetitions, sink, "WARNING"))
+    finally:
+        logger.remove()
+        logger.add(sys.stderr)
+    return results
+
+
+def _get_fastest_result(mode, build_simulation, repetitions, sink, log_level):
+    """
+    :param mode: The mode.
+    :type mode: str
+    :param build_simulation: Creates the simulation of the mode.
+    :type build_simulation: Callable[[], SimulationEngine]
+    :param repetitions: The number of runs.
+    :type repetitions: int
+    :param sink: The sink the runs log to.
+    :param log_level: The level the runs log at.
+    :type log_level: str
+    :return: The result of the fastest run.
+    :rtype: BenchmarkResult
+    """
+    fastest_result = None
+    for _ in range(repetitions):
+        logger.remove()
+        logger.add(sink, level=log_level)
+        number_of_events, seconds = measure_events_per_second(build_simulation())
+        if fastest_result is None or seconds < fastest_result.seconds:
+            fastest_result = BenchmarkResult(mode, number_of_events, seconds)
+    return fastest_result
+
+
+def run_benchmark(build_setting, repetitions=3, seed=0, output_directory=".", **simulation_kwargs):
+    """
+    Compare the throughput of the default and the headless mode for one simulation setting
+    (see :py:func:`compare_modes`). The runs log to 'benchmark.log' in the output directory.
+
+    :param build_setting: Creates the specifications builder of the setting (see :py:func:`run_batch`).
+    :type build_setting: Callable[[], FuelSpecsBuilder]
+    :param repetitions: The number of runs per mode of which the fastest is reported.
+    :type repetitions: int
+    :param seed: The seed of all runs.
+    :type seed: int
+    :param output_directory: The directory for the output of the runs.
+    :type output_directory: str
+    :param simulation_kwargs: Further keyword arguments for :py:func:`generate_simulation`.
+    :return: The results of the default mode and of the headless mode.
+    :rtype: Tuple[BenchmarkResult, BenchmarkResult]
+    """
+    pathlib.Path(output_directory).mkdir(parents=True, exist_ok=True)
+
+    def build_simulation(headless):
+        specifications_builder = build_setting()
+        specifications_builder.add_random_specifications(seed=seed)
+        return environment.generate_simulation(
+            specifications_builder, output_directory=output_directory, headless=headless, **simulation_kwargs)
+
+    return compare_modes(build_simulation, repetitions=repetitions,
+                         log_file_path=pathlib.Path(output_directory) / "benchmark.log")
+
+
+def run_fast_forward_benchmark(build_setting, numbers_of_processes, repetitions=3, seed=0, output_directory=".",
+                               **simulation_kwargs):
+    """
+    Compare the throughput of the headless mode with the fast-forward with different numbers of processes for one
+    simulation setting (see :py:func:`compare_fast_forward_processes`). The runs log to 'benchmark.log' in the
+    output directory.
+
+    :param build_setting: Creates the specifications builder of the setting (see :py:func:`run_batch`).
+    :type build_setting: Callable[[], FuelSpecsBuilder]
+    :param numbers_of_processes: The numbers of processes to compare.
+    :type numbers_of_processes: List[int]
+    :param repetitions: The number of runs per number of processes of which the fastest is reported.
+    :type repetitions: int
+    :param seed: The seed of all runs.
+    :type seed: int
+    :param output_directory: The directory for the output of the runs.
+    :type output_directory: str
+    :param simulation_kwargs: Further keyword arguments for :py:func:`generate_simulation`.
+    :return: The results in the order of the numbers of processes.
+    :rtype: List[BenchmarkResult]
+    """
+    pathlib.Path(output_directory).mkdir(parents=True, exist_ok=True)
+
+    def build_simulation(number_of_processes):
+        specifications_builder = build_setting()
+        specifications_builder.add_random_specifications(seed=seed)
+        return environment.generate_simulation(
+            specifications_builder, output_directory=output_directory, headless=True, fast_forward=True,
+            fast_forward_processes=number_of_processes, **simulation_kwargs)
+
+    return compare_fast_forward_processes(build_simulation, numbers_of_processes, repetitions=repetitions,
+                                          log_file_path=pathlib.Path(output_directory) / "benchmark.log")
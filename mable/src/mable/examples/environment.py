@@ -7,17 +7,17 @@ from typing import List, TYPE_CHECKING, Dict
 from datetime import datetime
 
 from loguru import logger
+import numpy as np
 
 import mable.extensions.world_ports as world_ports
 from mable.competition.generation import CompetitionBuilder, AuctionClassFactory
+from mable.competition.resources import AgentResourceMonitor
 from mable.engine import SimulationEngine
-from mable.event_management import IdleEvent
 from mable.examples import fleets
 from mable.extensions.fuel_emissions import FuelSpecsBuilder, VesselWithEngine
 from mable.observers import (
     LogRunner, AuctionMetricsObserver, EventFuelPrintObserver, MetricsObserver, AuctionOutcomePrintObserver,
-    TradeDeliveryObserver, AuctionOutcomeObserver)
-from mable.simulation_space.universe import Location
+    TradeDeliveryObserver, AuctionOutcomeObserver, JsonLinesExportObserver, CheckpointObserver)
 from mable.util import JsonAbleEncoder
 
 if TYPE_CHECKING:
@@ -30,7 +30,8 @@ def get_specification_builder(
         trades_per_occurrence=1,
         num_auctions=2,
         fixed_trades=None,
-        use_only_precomputed_routes=True
+        use_only_precomputed_routes=True,
+        lazy_trade_generation=False
     ):
     """
     Generate a specifications builder to specify a simulation settings.
@@ -51,6 +52,9 @@ def get_specification_builder(
     :param use_only_precomputed_routes: Only generate cargoes between ports that have a precomputed route.
         Default is True.
     :type use_only_precomputed_routes: bool
+    :param lazy_trade_generation: Only generate the trades of an auction when they are requested.
+        Default is False.
+    :type lazy_trade_generation: bool
     :return: The specification builder.
     :rtype: FuelSpecsBuilder
     :raises FileNotFoundError: If the resource file does not exist.
@@ -64,7 +68,8 @@ def get_specification_builder(
         trades_per_occurrence=trades_per_occurrence,
         simulation_length=simulation_length,
         fixed_trades=fixed_trades,
-        use_only_precomputed_routes=use_only_precomputed_routes)
+        use_only_precomputed_routes=use_only_precomputed_routes,
+        lazy_trade_generation=lazy_trade_generation)
     return specifications_builder
 
 
@@ -76,7 +81,7 @@ def _get_specification_builder():
 
 def _generate_environment(specifications_builder, trade_occurrence_frequency,
                           trades_per_occurrence, simulation_length, environment_files_path=".",
-                          fixed_trades=None, use_only_precomputed_routes=False):
+                          fixed_trades=None, use_only_precomputed_routes=False, lazy_trade_generation=False):
     """
     Initialises the environment of the simulation.
 
@@ -86,7 +91,9 @@ def _generate_environment(specifications_builder, trade_occurrence_frequency,
     :type environment_files_path: str
     :param use_only_precomputed_routes: Only generate cargoes between ports that have a precomputed route.
     :type use_only_precomputed_routes: bool
-    :raises FileNotFoundError: If the resource file does not exist.
+    :param lazy_trade_generation: Only generate the trades of an auction when they are requested.
+    :type lazy_trade_generation: bool
+    :raises FileNotFoundError: If a resource file has not been extracted yet and the resource archive does not exist.
     """
     try:
         resource_files = {
@@ -98,10 +105,12 @@ def _generate_environment(specifications_builder, trade_occurrence_frequency,
             "ports": "ports.csv"
         }
         resources_archive_path = os.path.join(environment_files_path, "mable_resources.zip")
-        resources_archive = ZipFile(resources_archive_path)
-        for one_resource_file_key in resource_files:
-            if not os.path.isfile(resource_files[one_resource_file_key]):
-                resources_archive.extract(resource_files[one_resource_file_key])
+        missing_resource_files = [f for f in resource_files.values() if not os.path.isfile(f)]
+        # The archive is only opened if files have to be extracted, e.g. on the first run.
+        if len(missing_resource_files) > 0:
+            with ZipFile(resources_archive_path) as resources_archive:
+                for one_resource_file in missing_resource_files:
+                    resources_archive.extract(one_resource_file)
         real_ports = world_ports.get_ports(resource_files["ports"])
         specifications_builder.add_shipping_network(
             ports=real_ports,
@@ -121,7 +130,8 @@ def _generate_environment(specifications_builder, trade_occurrence_frequency,
                 trade_occurrence_frequency=trade_occurrence_frequency,
                 trades_per_occurrence=trades_per_occurrence,
                 simulation_length=simulation_length,
-                precomputed_routes_file=precomputed_routes_file)
+                precomputed_routes_file=precomputed_routes_file,
+                lazy_trade_generation=lazy_trade_generation)
         else:
             specifications_builder.add_cargo_generation(static=True, fixed_trades=fixed_trades)
     except FileNotFoundError as e:
@@ -130,7 +140,10 @@ def _generate_environment(specifications_builder, trade_occurrence_frequency,
 
 
 def generate_simulation(specifications_builder, show_detailed_auction_outcome=False, output_directory=".",
-                        global_agent_timeout=60, info=None):
+                        global_agent_timeout=60, info=None, stream_metrics=False, profile=False,
+                        meter_agent_resources=False, agent_cpu_time_budget=None, agent_memory_budget=None,
+                        checkpoint_interval=None, network=None, fast_forward=False,
+                        fast_forward_processes=1, headless=False):
     """
     Generate a simulation from a specifications.
 
@@ -146,6 +159,37 @@ def generate_simulation(specifications_builder, show_detailed_auction_outcome=Fa
     :return: The simulation instance.
     :param info: Any information on the simulation.
     :type info: str | dict
+    :param stream_metrics: Stream the events and auction outcomes to a JSON Lines file while the simulation runs
+        (see :py:class:`JsonLinesExportObserver`) and write the metrics as the file's last record
+        instead of exporting one json file at the end.
+    :type stream_metrics: bool
+    :param profile: Time the simulation (see :py:func:`SimulationEngine.enable_profiling`), log a summary of the
+        timings and export them as a Chrome trace json file after the simulation.
+    :type profile: bool
+    :param meter_agent_resources: Meter the CPU time and peak memory allocation of the companies' operations and
+        add them to the metrics (see :py:class:`AgentResourceMonitor`). Budgets imply metering.
+    :type meter_agent_resources: bool
+    :param agent_cpu_time_budget: The total CPU time in seconds each company can use before it is not asked
+        to operate anymore. Default is no budget.
+    :type agent_cpu_time_budget: float | None
+    :param agent_memory_budget: The peak memory in bytes each company's operations can allocate before the company
+        is not asked to operate anymore. Default is no budget.
+    :type agent_memory_budget: int | None
+    :param checkpoint_interval: Write a checkpoint to the output directory every interval of simulation time
+        (see :py:class:`CheckpointObserver`). A checkpoint can be restored into a simulation generated with the
+        same arguments via :py:func:`SimulationEngine.restore`. Default is no checkpoints.
+    :type checkpoint_interval: float | None
+    :param network: A network to use instead of generating it from the specifications, e.g. one network shared
+        by several simulations (see :py:func:`SimulationBuilder.set_network`). Default is to generate the network.
+    :type network: ShippingNetwork | None
+    :param fast_forward: Fast-forward the vessels between the auctions (see
+        :py:func:`SimulationEngine.enable_fast_forward`).
+    :type fast_forward: bool
+    :param fast_forward_processes: The number of processes that fast-forward the vessels in parallel.
+    :type fast_forward_processes: int
+    :param headless: Do not register the observers that log every event and the detailed auction outcomes.
+        Together with a logger level above DEBUG the events are not formatted at all.
+    :type headless: bool
     :rtype: SimulationEngine
     :raises ValueError: If the output directory does not exist.
     """
@@ -153,30 +197,58 @@ def generate_simulation(specifications_builder, show_detailed_auction_outcome=Fa
         raise ValueError(f"Output directory '{output_directory}' not found.")
     specifications = specifications_builder.build()
     sim_factory = CompetitionBuilder(AuctionClassFactory(), specifications)
+    if network is not None:
+        sim_factory.set_network(network)
     pre_run = ([LogRunner(logger, "---Pre Run Start---")]
                + SimulationEngine.PRE_RUN_CMDS
                + [LogRunner(logger, "--Run Start (Pre Run Finished)---")])
     post_run = [LogRunner(logger, "--Run Finished---"), _export_stats]
+    if profile:
+        post_run.append(_export_profile)
     sim = sim_factory.generate_engine(pre_run_cmds=pre_run, post_run_cmds=post_run, output_directory=output_directory,
                                       global_agent_timeout=global_agent_timeout, info=info)
-    _activate_stats_collection(sim, show_detailed_auction_outcome)
+    _activate_stats_collection(sim, show_detailed_auction_outcome, stream_metrics, headless)
     _activate_contract_fulfillment_check(sim)
+    if profile:
+        sim.enable_profiling()
+    if meter_agent_resources or agent_cpu_time_budget is not None or agent_memory_budget is not None:
+        track_memory = True if meter_agent_resources else None
+        sim.enable_resource_monitoring(AgentResourceMonitor(
+            cpu_time_budget=agent_cpu_time_budget, memory_budget=agent_memory_budget, track_memory=track_memory))
+    if fast_forward:
+        sim.enable_fast_forward(number_of_processes=fast_forward_processes)
+    if checkpoint_interval is not None:
+        sim.register_event_observer(CheckpointObserver(output_directory, checkpoint_interval))
     return sim
 
 
-def _activate_stats_collection(simulation, show_detailed_auction_outcome=False):
+def _activate_stats_collection(simulation, show_detailed_auction_outcome=False, stream_metrics=False,
+                               headless=False):
     """
     Add the observers for stats collection.
 
     :param simulation: The simulation to observe.
     :type simulation: SimulationEngine
+    :param stream_metrics: Stream events and auction outcomes to a JSON Lines file.
+        The auction outcomes are then not collected by the metrics observer.
+    :type stream_metrics: bool
+    :param headless: Do not add the observers that log the events and auction outcomes.
+    :type headless: bool
     """
-    metric_observer = AuctionMetricsObserver()
+    if stream_metrics:
+        metric_observer = MetricsObserver()
+        timestamp = datetime.today().strftime("%Y-%m-%d-%H-%M-%S")
+        file_name = f"metrics_competition_{id(metric_observer)}_{timestamp}.jsonl"
+        simulation.register_event_observer(
+            JsonLinesExportObserver(pathlib.Path(simulation.output_directory) / file_name))
+    else:
+        metric_observer = AuctionMetricsObserver()
     metric_observer.metrics.set_engine(simulation)
     simulation.register_event_observer(metric_observer)
-    simulation.register_event_observer(EventFuelPrintObserver(logger))
-    if show_detailed_auction_outcome:
-        simulation.register_event_observer(AuctionOutcomePrintObserver(logger))
+    if not headless:
+        simulation.register_event_observer(EventFuelPrintObserver(logger))
+        if show_detailed_auction_outcome:
+            simulation.register_event_observer(AuctionOutcomePrintObserver(logger))
 
 def _activate_contract_fulfillment_check(simulation):
     """
@@ -199,18 +271,60 @@ def _export_stats(simulation):
     :type simulation: SimulationEngine
     """
 
+    streaming_observers = [o for o in simulation.get_event_observers() if isinstance(o, JsonLinesExportObserver)]
     for one_event_observer in simulation.get_event_observers():
         timestamp = datetime.today().strftime("%Y-%m-%d-%H-%M-%S")
         if isinstance(one_event_observer, MetricsObserver):
-            _calculate_idle_times(simulation, one_event_observer)
+            one_event_observer.add_final_idle_times(simulation)
             metrics = one_event_observer.metrics.to_json()
             metrics["global_metrics"]["penalty"] = _calculate_penalty(simulation, one_event_observer)
+            if simulation.resource_monitor is not None:
+                metrics["global_metrics"]["agent_resources"] = simulation.resource_monitor.to_json(
+                    lambda c: one_event_observer.metrics.get_company_id(c, create_id_if_not_exists=False))
             metrics["info"] = simulation.info
-            file_name = f"metrics_competition_{id(one_event_observer)}_{timestamp}.json"
-            file_path = pathlib.Path(simulation.output_directory) / file_name
-            with open(file_path, "w") as metrics_file:
-                json.dump(metrics, metrics_file, indent=4, cls=JsonAbleEncoder)
-            logger.info(f"Metrics exported to {file_path}")
+            if len(streaming_observers) > 0:
+                for one_streaming_observer in streaming_observers:
+                    one_streaming_observer.write_summary(metrics)
+                    logger.info(f"Metrics exported to {one_streaming_observer.file_path}")
+            else:
+                file_name = f"metrics_competition_{id(one_event_observer)}_{timestamp}.json"
+                file_path = pathlib.Path(simulation.output_directory) / file_name
+                with open(file_path, "w") as metrics_file:
+                    json.dump(metrics, metrics_file, indent=4, cls=JsonAbleEncoder)
+                logger.info(f"Metrics exported to {file_path}")
+
+
+def _export_profile(simulation):
+    """
+    Log a summary of the timings and counters, e.g. the cache hit rates, of the simulation and export the timings
+    as a Chrome trace json file.
+
+    :param simulation: The simulation of which the timings will be exported.
+    :type simulation: SimulationEngine
+    """
+    profiler = simulation.profiler
+    if profiler is not None:
+        summary = profiler.summary()
+        info_block = "\n=== Profile ==="
+        for one_category in summary:
+            for one_name, one_stats in sorted(
+                    summary[one_category].items(), key=lambda x: x[1]["total"], reverse=True):
+                info_block += (f"\n{one_category} {one_name}: {one_stats['count']} calls,"
+                               f" total {one_stats['total']:.3f} s, mean {one_stats['mean'] * 1000:.3f} ms,"
+                               f" p95 {one_stats['p95'] * 1000:.3f} ms")
+        counts_summary = profiler.counts_summary()
+        for one_category in counts_summary:
+            for one_name, one_counts in sorted(counts_summary[one_category].items()):
+                info_block += f"\n{one_category} {one_name}: " + ", ".join(
+                    f"{one_count} {one_counter}" for one_counter, one_count in one_counts.items()
+                    if one_counter != "hit_rate")
+                if one_counts.get("hit_rate") is not None:
+                    info_block += f", hit rate {one_counts['hit_rate'] * 100:.1f} %"
+        logger.info(info_block)
+        timestamp = datetime.today().strftime("%Y-%m-%d-%H-%M-%S")
+        file_path = pathlib.Path(simulation.output_directory) / f"trace_{id(simulation)}_{timestamp}.json"
+        profiler.export_chrome_trace(file_path)
+        logger.info(f"Trace exported to {file_path}")
 
 
 def _check_threads(_):
@@ -223,47 +337,13 @@ def _check_threads(_):
     logger.info(info_block)
 
 
-class _DummyIdling(IdleEvent):
-    """
-    An artificial idling event.
-    """
-
-    def __init__(self, time, vessel, time_started):
-        super().__init__(time, vessel, Location(0, 0))
-        self._time_started = time_started
-
-
-def _calculate_idle_times(simulation, metrics_observer):
-    """
-    Calculate the idle time of all vessels.
-
-    :param simulation: The simulation.
-    :type simulation: SimulationEngine
-    :return:
-    """
-    for one_company in simulation.shipping_companies:
-        for one_vessel in one_company.fleet:
-            idle_time = 0
-            vessels_journey_log = one_vessel.journey_log
-            last_time = 0
-            sorted_events = sorted(vessels_journey_log, key=lambda x: x.time)
-            for one_event in sorted_events:
-                this_event_start = one_event.time_started
-                time_gap = this_event_start - last_time
-                if time_gap > 0:
-                    idle_event = _DummyIdling(this_event_start, one_vessel, last_time)
-                    metrics_observer.notify(simulation, idle_event, None)
-                last_time = one_event.time
-            time_gap = simulation.world.current_time - last_time
-            if time_gap > 0:
-                idle_event = _DummyIdling(simulation.world.current_time, one_vessel, last_time)
-                metrics_observer.notify(simulation, idle_event, None)
-
-
 def _calculate_penalty(simulation, metrics_observer):
     """
     Calculate breach of contract penalties.
 
+    The penalty of a company is the fuel cost of its biggest vessel transporting the cargoes of all unfulfilled
+    contracts from its current location. The distances for all contracts of a company are determined in one batch.
+
     :param simulation: The simulation to check for unfulfilled contracts.
     :type simulation: SimulationEngine
     :param metrics_observer:
@@ -273,30 +353,39 @@ def _calculate_penalty(simulation, metrics_observer):
     """
     penalties = {}
     for one_company in simulation.shipping_companies:
-        if one_company in simulation.market_authority.contracts_per_company:
-            all_contracts_of_company = simulation.market_authority.contracts_per_company[one_company]
-            unfulfilled_contracts = [c for c in all_contracts_of_company if not c.fulfilled]
-            penalty = 0
-            biggest_vessel: VesselWithEngine = sorted(
-                one_company.fleet[:], key=lambda x: x.capacity("Oil"), reverse=True)[0]
-            for one_unfulfilled_contract in unfulfilled_contracts:
-                trade_for_contract = one_unfulfilled_contract.trade
-                loading_time = biggest_vessel.get_loading_time(trade_for_contract.cargo_type, trade_for_contract.amount)
-                loading_consumption = biggest_vessel.get_loading_consumption(loading_time)
-                distance_location_to_origin = simulation.headquarters.get_network_distance(
-                    biggest_vessel.location, trade_for_contract.origin_port)
-                travel_origin_time = biggest_vessel.get_travel_time(distance_location_to_origin)
-                travel_origin_consumption = biggest_vessel.get_ballast_consumption(
-                    travel_origin_time, biggest_vessel.speed)
-                distance_origin_to_destination = simulation.headquarters.get_network_distance(
-                    trade_for_contract.origin_port, trade_for_contract.destination_port)
-                travel_destination_time = biggest_vessel.get_travel_time(distance_origin_to_destination)
-                travel_destination_consumption = biggest_vessel.get_laden_consumption(
-                    travel_destination_time, biggest_vessel.speed)
-                total_consumption = loading_consumption * 2 + travel_origin_consumption + travel_destination_consumption
-                total_fuel_cost = biggest_vessel.propelling_engine.fuel.get_cost(total_consumption)
-                penalty += total_fuel_cost
-        else:
-            penalty = 0
+        penalty = 0
+        unfulfilled_trades = [c.trade for c in simulation.market_authority.get_open_contracts(one_company)]
+        if len(unfulfilled_trades) > 0:
+            biggest_vessel: VesselWithEngine = max(one_company.fleet, key=lambda x: x.capacity("Oil"))
+            penalty = _calculate_unfulfilled_trades_cost(simulation, biggest_vessel, unfulfilled_trades)
         penalties[metrics_observer.metrics.get_company_id(one_company, create_id_if_not_exists=False)] = penalty
     return penalties
+
+
+def _calculate_unfulfilled_trades_cost(simulation, vessel, trades):
+    """
+    Calculate the fuel cost of a vessel transporting the cargoes of the trades, each from the vessel's location.
+
+    :param simulation: The simulation.
+    :type simulation: SimulationEngine
+    :param vessel: The vessel.
+    :type vessel: VesselWithEngine
+    :param trades: The trades.
+    :type trades: List[Trade]
+    :return: The fuel cost.
+    :rtype: float
+    """
+    number_of_trades = len(trades)
+    origin_ports = [t.origin_port for t in trades]
+    destination_ports = [t.destination_port for t in trades]
+    distances = np.asarray(simulation.headquarters.get_network_distances(
+        [vessel.location] * number_of_trades + origin_ports, origin_ports + destination_ports))
+    loading_times = np.array([vessel.get_loading_time(t.cargo_type, t.amount) for t in trades])
+    loading_consumption = vessel.get_loading_consumption(loading_times)
+    travel_origin_consumption = vessel.get_ballast_consumption(
+        vessel.get_travel_time(distances[:number_of_trades]), vessel.speed)
+    travel_destination_consumption = vessel.get_laden_consumption(
+        vessel.get_travel_time(distances[number_of_trades:]), vessel.speed)
+    total_consumption = np.sum(loading_consumption * 2 + travel_origin_consumption + travel_destination_consumption)
+    total_fuel_cost = vessel.propelling_engine.fuel.get_cost(total_consumption)
+    return total_fuel_cost
@@ -1,6 +1,4 @@
-from typing import Tuple, List, Sequence, Union
-
-import numpy as np
+from typing import Tuple, List
 
 from mable.extensions.fuel_emissions import Fuel, ConsumptionRate, VesselWithEngine, VesselEngine
 from mable.transport_operation import CargoCapacity
@@ -309,22 +307,3 @@ def specified_laden_balast_consumption(laden_base, laden_speed_power, ballast_ba
         speed_power=ballast_speed_power,
         factor=1 / 24)
     return laden_consumption_rate, ballast_consumption_rate
-
-
-def _get_random_capacity(base_capacity, random_capacity_range=None):
-    capacity_factor = 0
-    if random_capacity_range is not None:
-        low = 0
-        if isinstance(random_capacity_range, Sequence):
-            if len(random_capacity_range) > 1:
-                low = random_capacity_range[0]
-                high = random_capacity_range[1]
-            else:
-                high = random_capacity_range[0]
-        elif isinstance(random_capacity_range, Union[float, int]):
-            high = random_capacity_range
-        else:
-            raise ValueError(f"random_capacity_range should be one or two numbers. Is {type(random_capacity_range)}")
-        capacity_factor = np.random.uniform(low, high)
-    capacity = base_capacity + capacity_factor
-    return capacity
@@ -2,19 +2,24 @@
 Extension to generate and transport cargoes based on cargo frequency and amount distributions
 and associated changes to shipping.
 """
+import functools
+import hashlib
+import io
+import os
 import pickle
-from typing import Tuple
+from typing import Tuple, Dict
 
 import numpy as np
 import pandas as pd
 import loguru
 
-from mable.shipping_market import TimeWindowTrade
+from mable.shipping_market import TimeWindowTrade, TradeTable, TradeStatus
 from mable.extensions.world_ports import LatLongFactory
 from mable.event_management import ArrivalEvent
 from mable.simulation_generation import SimulationBuilder
 from mable.shipping_market import Shipping
 from mable import instructions
+from mable.random_streams import TRADE_GENERATION, draw_integers
 from mable.util import format_time
 
 
@@ -42,6 +47,8 @@ class TimeWindowArrivalEvent(ArrivalEvent):
     An event where a vessel arrives for loading or unloading.
     """
 
+    __slots__ = ()
+
     def __eq__(self, other):
         return (
                 super().__eq__(other)
@@ -67,6 +74,341 @@ class DistributionClassFactory(LatLongFactory):
         return TimeWindowArrivalEvent(*args, **kwargs)
 
 
+class AliasTable:
+    """
+    Walker's alias table to sample from a discrete distribution in constant time.
+    """
+
+    def __init__(self, weights):
+        """
+        :param weights: The (not necessarily normalised) weights of the outcomes 0 to n-1.
+        :type weights: np.ndarray | List[float]
+        :raises ValueError: If there are no weights or the weights do not sum to a positive value.
+        """
+        weights = np.asarray(weights, dtype=float)
+        total_weight = np.sum(weights)
+        if len(weights) == 0 or not total_weight > 0:
+            raise ValueError("An alias table requires at least one positive weight.")
+        num_outcomes = len(weights)
+        scaled_probabilities = weights * num_outcomes / total_weight
+        self._probabilities = np.ones(num_outcomes)
+        self._aliases = np.arange(num_outcomes)
+        small = [i for i in range(num_outcomes) if scaled_probabilities[i] < 1]
+        large = [i for i in range(num_outcomes) if scaled_probabilities[i] >= 1]
+        while len(small) > 0 and len(large) > 0:
+            one_small = small.pop()
+            one_large = large.pop()
+            self._probabilities[one_small] = scaled_probabilities[one_small]
+            self._aliases[one_small] = one_large
+            scaled_probabilities[one_large] = scaled_probabilities[one_large] + scaled_probabilities[one_small] - 1
+            if scaled_probabilities[one_large] < 1:
+                small.append(one_large)
+            else:
+                large.append(one_large)
+
+    def __len__(self):
+        return len(self._probabilities)
+
+    @property
+    def probabilities(self):
+        """
+        :return: The probability per column to return the column's outcome rather than the column's alias.
+        :rtype: np.ndarray
+        """
+        return self._probabilities
+
+    @property
+    def aliases(self):
+        """
+        :return: The alias outcome per column.
+        :rtype: np.ndarray
+        """
+        return self._aliases
+
+    def sample(self, random, size=None):
+        """
+        Sample outcomes.
+
+        :param random: The random number generator.
+        :type random: np.random.Generator | np.random.RandomState
+        :param size: The number of samples or None for a single sample.
+        :type size: int | None
+        :return: The sampled outcome(s).
+        :rtype: int | np.ndarray
+        """
+        column = draw_integers(random, len(self._probabilities), size=size)
+        use_column = random.random(size) < self._probabilities[column]
+        outcome = np.where(use_column, column, self._aliases[column])
+        if size is None:
+            outcome = int(outcome)
+        return outcome
+
+
+def _get_columns(distribution):
+    """
+    The columns of a distribution as numpy arrays.
+
+    :param distribution: The distribution.
+    :type distribution: pd.DataFrame | Dict[str, np.ndarray]
+    :return: The columns by name.
+    :rtype: Dict[str, np.ndarray]
+    """
+    return {column: np.asarray(distribution[column]) for column in distribution.keys()}
+
+
+def _select_rows(columns, mask):
+    return {column: values[mask] for column, values in columns.items()}
+
+
+def _get_finite_values(values):
+    """
+    The values that are neither infinite nor nan as floats, i.e. the values pandas' mean and std use after
+    excluding infinity.
+    """
+    values = values.astype(float)
+    return values[(values != float('inf')) & ~np.isnan(values)]
+
+
+def _get_inlier_mask(columns, stds_around_mean=5):
+    """
+    The rows of a distribution whose mean and finite standard deviation are within a number of standard deviations
+    around the mean of the respective column (see :py:func:`DistributionShipping.filter_out_outliers`).
+
+    :param columns: The columns with 'Mean' and 'Std. Dev'.
+    :type columns: Dict[str, np.ndarray]
+    :param stds_around_mean: The number of standard deviations.
+    :type stds_around_mean: float
+    :return: The mask of the rows to keep.
+    :rtype: np.ndarray
+    """
+    mask = np.ones(len(columns["Mean"]), dtype=bool)
+    for column in ["Mean", "Std. Dev"]:
+        values = columns[column].astype(float)
+        finite_values = _get_finite_values(values)
+        column_mean = finite_values.mean() if len(finite_values) > 0 else np.nan
+        column_std = finite_values.std(ddof=1) if len(finite_values) > 1 else np.nan
+        column_mask = ((column_mean - column_std * stds_around_mean <= values)
+                       & (values <= column_mean + column_std * stds_around_mean))
+        if column == "Std. Dev":
+            column_mask |= values == float('inf')
+        mask &= column_mask
+    return mask
+
+
+def _get_mean_finite_std(columns):
+    finite_stds = _get_finite_values(columns['Std. Dev'])
+    return finite_stds.mean() if len(finite_stds) > 0 else np.nan
+
+
+class CargoDistributionTables:
+    """
+    The cargo distributions compiled into arrays for fast sampling.
+
+    Ports are referred to by their ids in the network (see :py:func:`NetworkWithPortDict.get_port_id`).
+    The origins are sampled from an alias table over all supply ports that have at least one valid destination.
+    For each origin there is an alias table over the valid destinations, i.e. demand ports that have a transition
+    record with the origin, are not the origin, are in the network and, if precomputed routes are given, have a route
+    to the origin. Each origin's weight is its supply frequency scaled by the share of the demand frequencies of its
+    valid destinations in the demand frequencies of all demand ports with a transition record with the origin. This
+    is equivalent to sampling an origin and one of its linked destinations and rejecting invalid combinations.
+    """
+
+    def __init__(self, ports, origin_ids, origin_table, destination_ids, destination_tables,
+                 transition_means, transition_stds, supply_shapes, supply_scales, demand_shapes, demand_scales):
+        self.ports = ports
+        self.origin_ids = origin_ids
+        self.origin_table = origin_table
+        self.destination_ids = destination_ids
+        self.destination_tables = destination_tables
+        self.transition_means = transition_means
+        self.transition_stds = transition_stds
+        self.supply_shapes = supply_shapes
+        self.supply_scales = supply_scales
+        self.demand_shapes = demand_shapes
+        self.demand_scales = demand_scales
+        # All destination tables in one flat array per attribute for sampling destinations of many origins at once.
+        self.destination_counts = np.array([len(t) for t in destination_tables])
+        self.destination_offsets = np.concatenate(([0], np.cumsum(self.destination_counts)[:-1])).astype(int)
+        self.flat_destination_ids = np.concatenate(destination_ids)
+        self.flat_destination_probabilities = np.concatenate([t.probabilities for t in destination_tables])
+        self.flat_destination_aliases = np.concatenate([t.aliases for t in destination_tables])
+        self.flat_transition_means = np.concatenate(transition_means)
+        self.flat_transition_stds = np.concatenate(transition_stds)
+
+    @staticmethod
+    def _get_gamma_parameters(network, cargo_weight_distribution, supply_demand, mean_cargo_weight_std):
+        num_ports = len(network.ports)
+        shapes = np.full(num_ports, np.nan)
+        scales = np.full(num_ports, np.nan)
+        records = _select_rows(cargo_weight_distribution, cargo_weight_distribution['SupplyDemand'] == supply_demand)
+        for port_name, cargo_weight_mean, cargo_weight_std in zip(
+                records['Port'], records['Mean'], records['Std. Dev']):
+            port_id = network.get_port_id(port_name)
+            if port_id is None or not np.isnan(shapes[port_id]):
+                continue
+            if cargo_weight_std == float('inf'):
+                cargo_weight_std = mean_cargo_weight_std
+            scale = cargo_weight_std ** 2 / cargo_weight_mean
+            shapes[port_id] = cargo_weight_mean / scale
+            scales[port_id] = scale
+        return shapes, scales
+
+    @staticmethod
+    def _get_frequencies(network, frequency_distribution, supply_demand):
+        frequencies = {}
+        records = _select_rows(frequency_distribution, frequency_distribution['SupplyDemand'] == supply_demand)
+        for port_name, num_samples in zip(records['Port'], records['Num Samples']):
+            port_id = network.get_port_id(port_name)
+            if port_id is not None:
+                frequencies[port_id] = frequencies.get(port_id, 0) + num_samples
+        return frequencies
+
+    @classmethod
+    def compile(cls, network, cargo_weight_distribution, frequency_distribution, time_transit_distribution,
+                precomputed_routes=None):
+        """
+        Compile the cargo distributions. The distributions are either DataFrames or their columns as numpy arrays,
+        e.g. as read by :py:func:`DistributionShipping.read_distribution_columns`.
+
+        :param network: The network. The ports of the distributions that are not in the network are ignored.
+        :type network: NetworkWithPortDict
+        :param cargo_weight_distribution: The cargo weight distribution.
+            See :py:func:`DistributionShipping.sample_cargoes_from_port_distributions`.
+        :type cargo_weight_distribution: pd.DataFrame | Dict[str, np.ndarray]
+        :param frequency_distribution: The trade frequency distribution.
+            See :py:func:`DistributionShipping.sample_cargoes_from_port_distributions`.
+        :type frequency_distribution: pd.DataFrame | Dict[str, np.ndarray]
+        :param time_transit_distribution: The transit time distribution.
+            See :py:func:`DistributionShipping.sample_cargoes_from_port_distributions`.
+        :type time_transit_distribution: pd.DataFrame | Dict[str, np.ndarray]
+        :param precomputed_routes: The precomputed routes. If not None only origin destination combinations
+            with a precomputed route are considered.
+        :type precomputed_routes: dict | None
+        :return: The compiled distributions.
+        :rtype: CargoDistributionTables
+        :raises ValueError: If no trade can be sampled from the distributions.
+        """
+        time_transit_distribution = _get_columns(time_transit_distribution)
+        time_transit_distribution = _select_rows(
+            time_transit_distribution, _get_inlier_mask(time_transit_distribution))
+        cargo_weight_distribution = _get_columns(cargo_weight_distribution)
+        cargo_weight_distribution = _select_rows(
+            cargo_weight_distribution, _get_inlier_mask(cargo_weight_distribution))
+        frequency_distribution = _get_columns(frequency_distribution)
+        mean_transition_std = _get_mean_finite_std(time_transit_distribution)
+        mean_cargo_weight_std = _get_mean_finite_std(cargo_weight_distribution)
+        supply_shapes, supply_scales = cls._get_gamma_parameters(
+            network, cargo_weight_distribution, 'Supply', mean_cargo_weight_std)
+        demand_shapes, demand_scales = cls._get_gamma_parameters(
+            network, cargo_weight_distribution, 'Demand', mean_cargo_weight_std)
+        # The first record in either direction determines the transition between two ports.
+        transitions = {}
+        for from_port, to_port, transition_mean, transition_std in zip(
+                time_transit_distribution['From'], time_transit_distribution['To'],
+                time_transit_distribution['Mean'], time_transit_distribution['Std. Dev']):
+            from_id = network.get_port_id(from_port)
+            to_id = network.get_port_id(to_port)
+            if from_id is None or to_id is None:
+                continue
+            if transition_std == float('inf'):
+                transition_std = mean_transition_std
+            transitions.setdefault((from_id, to_id), (transition_mean, transition_std))
+            transitions.setdefault((to_id, from_id), (transition_mean, transition_std))
+        supply_frequencies = cls._get_frequencies(network, frequency_distribution, 'Supply')
+        demand_frequencies = cls._get_frequencies(network, frequency_distribution, 'Demand')
+        # The demand of all ports linked by a transition record, including those that are not in the network.
+        linked_port_names = {}
+        for from_port, to_port in zip(time_transit_distribution['From'], time_transit_distribution['To']):
+            linked_port_names.setdefault(from_port, set()).add(to_port)
+            linked_port_names.setdefault(to_port, set()).add(from_port)
+        demand_records = _select_rows(frequency_distribution, frequency_distribution['SupplyDemand'] == 'Demand')
+        demand_frequencies_by_name = {}
+        for port_name, num_samples in zip(demand_records['Port'], demand_records['Num Samples']):
+            demand_frequencies_by_name[port_name] = demand_frequencies_by_name.get(port_name, 0) + num_samples
+        all_ports = network.ports
+        origin_ids = []
+        origin_weights = []
+        destination_ids = []
+        destination_tables = []
+        transition_means = []
+        transition_stds = []
+        for origin_id, origin_frequency in supply_frequencies.items():
+            if np.isnan(supply_shapes[origin_id]) or not origin_frequency > 0:
+                continue
+            origin_name = all_ports[origin_id].name
+            valid_destination_ids = []
+            for destination_id, destination_frequency in demand_frequencies.items():
+                if (destination_id == origin_id
+                        or not destination_frequency > 0
+                        or (origin_id, destination_id) not in transitions
+                        or np.isnan(demand_shapes[destination_id])):
+                    continue
+                if precomputed_routes is not None:
+                    destination_name = all_ports[destination_id].name
+                    if not (f"{origin_name}{destination_name}" in precomputed_routes
+                            or f"{destination_name}{origin_name}" in precomputed_routes):
+                        continue
+                valid_destination_ids.append(destination_id)
+            if len(valid_destination_ids) == 0:
+                continue
+            valid_demand = sum(demand_frequencies[d] for d in valid_destination_ids)
+            linked_demand = sum(demand_frequencies_by_name.get(n, 0) for n in linked_port_names[origin_name])
+            origin_ids.append(origin_id)
+            origin_weights.append(origin_frequency * valid_demand / linked_demand)
+            destination_ids.append(np.array(valid_destination_ids))
+            destination_tables.append(AliasTable([demand_frequencies[d] for d in valid_destination_ids]))
+            transition_means.append(np.array([transitions[(origin_id, d)][0] for d in valid_destination_ids]))
+            transition_stds.append(np.array([transitions[(origin_id, d)][1] for d in valid_destination_ids]))
+        if len(origin_ids) == 0:
+            raise ValueError("The cargo distributions do not allow to sample any trade.")
+        logger.debug(f"Compiled cargo distributions with {len(origin_ids)} origin ports.")
+        return cls(all_ports, np.array(origin_ids), AliasTable(origin_weights), destination_ids, destination_tables,
+                   transition_means, transition_stds, supply_shapes, supply_scales, demand_shapes, demand_scales)
+
+    def sample_routes(self, random, size):
+        """
+        Sample origin destination combinations.
+
+        :param random: The random number generator.
+        :type random: np.random.Generator | np.random.RandomState
+        :param size: The number of combinations.
+        :type size: int
+        :return: The origin port ids, the destination port ids and the indices of the combinations
+            in the flat destination arrays, e.g. :py:attr:`flat_transition_means`.
+        :rtype: Tuple[np.ndarray, np.ndarray, np.ndarray]
+        """
+        origin_indices = self.origin_table.sample(random, size)
+        offsets = self.destination_offsets[origin_indices]
+        columns = (random.random(size) * self.destination_counts[origin_indices]).astype(int)
+        use_column = random.random(size) < self.flat_destination_probabilities[offsets + columns]
+        flat_indices = offsets + np.where(use_column, columns, self.flat_destination_aliases[offsets + columns])
+        return self.origin_ids[origin_indices], self.flat_destination_ids[flat_indices], flat_indices
+
+
+class _WorldWithRandom:
+    """
+    A view of a world with a different random.
+    """
+
+    def __init__(self, world, random):
+        self._world = world
+        self._random = random
+
+    @property
+    def network(self):
+        return self._world.network
+
+    @property
+    def random(self):
+        return self._random
+
+
+@functools.lru_cache(maxsize=4)
+def _load_precomputed_routes(precomputed_routes_path, modification_time):
+    with open(precomputed_routes_path, "rb") as precomputed_routes_file:
+        return pickle.load(precomputed_routes_file)
+
+
 class DistributionShipping(Shipping):
     """
     Generate cargoes based on cargo distributions.
@@ -76,15 +418,48 @@ class DistributionShipping(Shipping):
         self._time_transition_dist = None
         self._cargo_weight_dist = None
         self._frequency_dist = None
+        self._distribution_tables = None
+        self._distribution_tables_sources = None
+        self._batch_sampling = kwargs.get('batch_sampling', True)
+        self._trading_times = []
+        self._ungenerated_trading_times = set()
+        self._trade_generation_arguments = None
+        self._trade_generation_seed_sequence = None
+        self._trade_table = None
+        self._trade_table_indices = {}
         self._trade_occurrence_frequency = kwargs['trade_occurrence_frequency'] * 24
         self._trades_per_occurrence = kwargs['trades_per_occurrence']
         self._simulation_length = kwargs['simulation_length']
         super().__init__(*args, **kwargs)
 
+    def __getstate__(self):
+        state = dict(vars(self))
+        # The compiled distributions are derived from the static objects and compiled again when they are needed.
+        state["_distribution_tables"] = None
+        state["_distribution_tables_sources"] = None
+        return state
+
     @property
     def trade_occurrence_frequency(self):
         return self._trade_occurrence_frequency
 
+    def get_static_objects(self):
+        """
+        The cargo distributions and the precomputed routes.
+
+        :return: The objects by name.
+        :rtype: Dict[str, Any]
+        """
+        static_objects = {
+            "time_transition_distribution": self._time_transition_dist,
+            "cargo_weight_distribution": self._cargo_weight_dist,
+            "frequency_distribution": self._frequency_dist,
+            "precomputed_routes": None
+        }
+        if self._trade_generation_arguments is not None:
+            static_objects["precomputed_routes"] = self._trade_generation_arguments[4]
+        return {name: obj for name, obj in static_objects.items() if obj is not None}
+
     def initialise_trades(self, *args, **kwargs):
         """
         Generate all trades that occur over the run of the simulation.
@@ -97,6 +472,11 @@ class DistributionShipping(Shipping):
                 * port_transition_duration_distributions_path
                 * port_cargo_weight_distribution_path
                 * port_trade_frequency_distribution_path
+
+            Optionally, batch_sampling (default True) to sample all trades of one period at once and
+            lazy_trade_generation (default False) to only generate the trades of a period when they are
+            requested via :py:func:`get_trades`, and trade_table (default False) to store the trades in a
+            :py:class:`TradeTable` and only create the trade objects of a period when they are requested.
         """
         world = kwargs["world"]
         del kwargs["world"]
@@ -110,33 +490,156 @@ class DistributionShipping(Shipping):
         del kwargs["simulation_length"]
         precomputed_routes_file = kwargs["precomputed_routes_file"]
         del kwargs["precomputed_routes_file"]
+        kwargs.pop("batch_sampling", None)
+        lazy_trade_generation = kwargs.pop("lazy_trade_generation", False)
+        if kwargs.pop("trade_table", False):
+            self._trade_table = TradeTable(world.network.ports)
         self.load_distributions(**kwargs)
+        trading_times = list(range(0, simulation_length + 1, trade_occurrence_frequency))
         logger.debug(f"Generating trades from 0"
                      f" to {simulation_length} [at {format_time(simulation_length)}]"
                      f" every {trade_occurrence_frequency} [at {format_time(trade_occurrence_frequency)}]."
-                     f" Resulting in {len(range(0, simulation_length + 1, trade_occurrence_frequency))}"
+                     f" Resulting in {len(trading_times)}"
                      f" cargo events.")
         precomputed_routes = None
         if not precomputed_routes_file is None:
-            with open(precomputed_routes_file, "rb") as f:
-                precomputed_routes = pickle.load(f)
-        for i in range(0, simulation_length + 1, trade_occurrence_frequency):
-            pickup_period_days = (i/24, (i + trade_occurrence_frequency - 1)/24)
-            cargoes_generated = self.sample_cargoes_from_port_distributions(
-                world,
-                class_factory,
-                trades_per_occurrence,
-                self._cargo_weight_dist,
-                self._frequency_dist,
-                self._time_transition_dist,
-                pickup_period_days,
-                time=i,
-                precomputed_routes=precomputed_routes)
-            logger.debug(f"Generated {len(cargoes_generated)} cargoes for time {i} [At {format_time(i)}].")
+            precomputed_routes = self.load_precomputed_routes(precomputed_routes_file)
+        self._trading_times = trading_times
+        self._trade_generation_arguments = (
+            world, class_factory, trades_per_occurrence, trade_occurrence_frequency, precomputed_routes)
+        # Each period's trades are generated with an own random derived from the trade generation stream so that
+        # the trades do not depend on the order in which the periods are generated.
+        self._trade_generation_seed_sequence = world.random_streams.get_seed_sequence(TRADE_GENERATION)
+        self._ungenerated_trading_times = set(trading_times)
+        if not lazy_trade_generation:
+            for one_time in trading_times:
+                self._generate_trades(one_time)
+
+    @staticmethod
+    def load_precomputed_routes(precomputed_routes_file):
+        """
+        Load the precomputed routes. The routes are only read once per process as long as the file does not change
+        and are shared by all shippings, e.g. between the simulations of a batch.
+
+        :param precomputed_routes_file: The path of the pickled routes.
+        :type precomputed_routes_file: str
+        :return: The routes.
+        :rtype: Dict
+        """
+        return _load_precomputed_routes(
+            os.path.abspath(precomputed_routes_file), os.path.getmtime(precomputed_routes_file))
+
+    def _generate_trades(self, time):
+        """
+        Generate the trades of the period starting at the specified time.
+
+        :param time: The start time of the period.
+        :type time: int
+        """
+        world, class_factory, trades_per_occurrence, trade_occurrence_frequency, precomputed_routes = \
+            self._trade_generation_arguments
+        self._ungenerated_trading_times.discard(time)
+        period_index = time // trade_occurrence_frequency
+        period_seed_sequence = np.random.SeedSequence(
+            self._trade_generation_seed_sequence.entropy,
+            spawn_key=tuple(self._trade_generation_seed_sequence.spawn_key) + (period_index,))
+        period_random = np.random.Generator(np.random.PCG64(period_seed_sequence))
+        pickup_period_days = (time/24, (time + trade_occurrence_frequency - 1)/24)
+        period_world = _WorldWithRandom(world, period_random)
+        if self._trade_table is not None and self._batch_sampling:
+            tables = self._get_distribution_tables(
+                world, self._cargo_weight_dist, self._frequency_dist, self._time_transition_dist, precomputed_routes)
+            origin_ids, destination_ids, quantities, time_windows = self._sample_cargo_columns(
+                period_world, trades_per_occurrence, tables, pickup_period_days)
+            self._trade_table_indices[time] = self._trade_table.add_columns(
+                origin_ids, destination_ids, quantities, time, time_windows, cargo_type="Oil")
+            logger.opt(lazy=True).debug(
+                "Generated {} cargoes for time {} [At {}].", lambda: len(quantities), lambda: time,
+                lambda: format_time(time))
+            return
+        cargoes_generated = self.sample_cargoes_from_port_distributions(
+            period_world,
+            class_factory,
+            trades_per_occurrence,
+            self._cargo_weight_dist,
+            self._frequency_dist,
+            self._time_transition_dist,
+            pickup_period_days,
+            time=time,
+            precomputed_routes=precomputed_routes)
+        logger.opt(lazy=True).debug(
+            "Generated {} cargoes for time {} [At {}].", lambda: len(cargoes_generated), lambda: time,
+            lambda: format_time(time))
+        if self._trade_table is not None:
+            self._trade_table_indices[time] = self._trade_table.add_trades(cargoes_generated)
+        else:
             self.add_to_all_trades(cargoes_generated)
 
+    @property
+    def trade_table(self):
+        """
+        :return: The columnar store of all generated trades or None if the trades are not stored in a table.
+        :rtype: TradeTable | None
+        """
+        return self._trade_table
+
+    def get_trading_times(self):
+        """
+        All times at which new cargoes will become available, including the times whose trades have not been
+        generated yet.
+
+        :return: The list of times.
+        :rtype: List[int]
+        """
+        return list(self._trading_times)
+
+    def get_trades(self, time):
+        """
+        Get trades for a specific time. The trades are generated if this has not happened yet.
+
+        :param time: The time.
+        :type time: float
+        :return: The list of trades.
+        :rtype: List[Trade]
+        """
+        if time in self._ungenerated_trading_times:
+            self._generate_trades(time)
+        if time in self._trade_table_indices and time not in self._occurred_trades:
+            self._realise_table_trades(time)
+        return super().get_trades(time)
+
+    def _realise_table_trades(self, time):
+        """
+        Realise the trades of a time from the trade table. Only the occurring trades are created as objects.
+
+        :param time: The time.
+        :type time: int
+        """
+        indices = self._trade_table_indices[time]
+        is_occurring = self._draw_realisation(time, self._trade_table.probabilities[indices])
+        self._trade_table.set_status(indices[~is_occurring], TradeStatus.NOT_REALISED)
+        self._occurred_trades[time] = self._trade_table.get_trades(indices[is_occurring])
+
+    def resample_future_trades(self, seed):
+        """
+        Replace the trades of all periods that have not been announced yet, i.e. that start more than one period
+        after the current time, by trades generated from the seed. The trades are generated when requested.
+
+        :param seed: The seed for the new trades.
+        :type seed: int
+        """
+        # Trades are announced marginally more than one period ahead and the trading times are whole hours.
+        announcement_horizon = self._engine.world.current_time + self._trade_occurrence_frequency + 1
+        self._trade_generation_seed_sequence = np.random.SeedSequence(seed)
+        for one_time in self._trading_times:
+            if one_time > announcement_horizon:
+                self._all_trades.pop(one_time, None)
+                self._occurred_trades.pop(one_time, None)
+                self._trade_table_indices.pop(one_time, None)
+                self._ungenerated_trading_times.add(one_time)
+
     def load_distributions(self, port_transition_duration_distributions_path, port_cargo_weight_distribution_path,
-                           port_trade_frequency_distribution_path):
+                           port_trade_frequency_distribution_path, distribution_cache_directory=".mable_cache"):
         """
         Load the distributions for the cargo generation.
 
@@ -146,11 +649,97 @@ class DistributionShipping(Shipping):
             The path to the csv with information on the average weight of cargo at the ports.
         :param port_trade_frequency_distribution_path:
             The path to the csv with information on the average visit frequency at the ports.
+        :param distribution_cache_directory:
+            The directory for the binary cache of the csv files (see :py:func:`read_distribution_columns`).
+            None disables the cache.
         """
+        self._time_transition_dist = self.read_distribution_columns(
+            port_transition_duration_distributions_path, distribution_cache_directory)
+        self._cargo_weight_dist = self.read_distribution_columns(
+            port_cargo_weight_distribution_path, distribution_cache_directory)
+        self._frequency_dist = self.read_distribution_columns(
+            port_trade_frequency_distribution_path, distribution_cache_directory)
 
-        self._time_transition_dist = pd.read_csv(port_transition_duration_distributions_path)
-        self._cargo_weight_dist = pd.read_csv(port_cargo_weight_distribution_path)
-        self._frequency_dist = pd.read_csv(port_trade_frequency_distribution_path)
+    @staticmethod
+    def read_distribution(path, cache_directory=None):
+        """
+        Read a distribution csv file as a DataFrame. See :py:func:`read_distribution_columns` for the cache.
+
+        :param path: The path to the csv file.
+        :type path: str
+        :param cache_directory: The directory of the cache or None to not use the cache.
+        :type cache_directory: str | None
+        :return: The distribution.
+        :rtype: pd.DataFrame
+        """
+        return pd.DataFrame(DistributionShipping.read_distribution_columns(path, cache_directory))
+
+    @staticmethod
+    def read_distribution_columns(path, cache_directory=None):
+        """
+        Read a distribution csv file as numpy arrays per column.
+
+        If a cache directory is specified the parsed csv is stored as a npz file named after the hash of the
+        csv's content. Any further read of a csv with the same content loads the arrays from the npz file without
+        parsing the csv or using pandas. Columns of strings, e.g. port names, are stored as integer codes.
+
+        :param path: The path to the csv file.
+        :type path: str
+        :param cache_directory: The directory of the cache or None to not use the cache.
+        :type cache_directory: str | None
+        :return: The columns by name.
+        :rtype: Dict[str, np.ndarray]
+        """
+        with open(path, "rb") as csv_file:
+            content = csv_file.read()
+        if cache_directory is None:
+            return _get_columns(pd.read_csv(io.BytesIO(content)))
+        content_hash = hashlib.sha256(content).hexdigest()[:16]
+        file_name = os.path.splitext(os.path.basename(path))[0]
+        cache_path = os.path.join(cache_directory, f"{file_name}-{content_hash}.npz")
+        if os.path.isfile(cache_path):
+            try:
+                return DistributionShipping._load_distribution_cache(cache_path)
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Ignoring unreadable distribution cache {cache_path}: {e}")
+        distribution = pd.read_csv(io.BytesIO(content))
+        try:
+            DistributionShipping._write_distribution_cache(distribution, cache_path)
+        except OSError as e:
+            logger.warning(f"Unable to write distribution cache {cache_path}: {e}")
+        return _get_columns(distribution)
+
+    @staticmethod
+    def _write_distribution_cache(distribution, cache_path):
+        arrays = {"columns": np.array(distribution.columns, dtype=str)}
+        for idx, column in enumerate(distribution.columns):
+            values = distribution[column]
+            if not pd.api.types.is_numeric_dtype(values):
+                codes, names = pd.factorize(values)
+                arrays[f"codes_{idx}"] = codes
+                arrays[f"names_{idx}"] = np.array(names, dtype=str)
+            else:
+                arrays[f"values_{idx}"] = values.to_numpy()
+        os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+        # Write to a temporary file first to not expose partially written caches to concurrent simulations.
+        temporary_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(temporary_path, "wb") as cache_file:
+            np.savez(cache_file, **arrays)
+        os.replace(temporary_path, cache_path)
+
+    @staticmethod
+    def _load_distribution_cache(cache_path):
+        columns = {}
+        with np.load(cache_path, allow_pickle=False) as arrays:
+            for idx, column in enumerate(arrays["columns"].tolist()):
+                if f"codes_{idx}" in arrays:
+                    codes = arrays[f"codes_{idx}"]
+                    values = arrays[f"names_{idx}"].astype(object)[codes]
+                    values[codes < 0] = np.nan
+                else:
+                    values = arrays[f"values_{idx}"]
+                columns[column] = values
+        return columns
 
     @staticmethod
     def sample_cargo_weight(world, cargo_weight_dict, cargo_weight_distribution,
@@ -261,9 +850,6 @@ class DistributionShipping(Shipping):
         delivery_time_window : tuple
             Pickup time window consisting representing the time interval the delivery should be started and finished
         """
-        pickup_period_start_t = pickup_period[0]
-        pickup_period_end_t = pickup_period[1]
-
         transition_record = time_transition_dict.get((start_port, end_port))
         if transition_record is None:
             transition_record = time_transit_distribution[((time_transit_distribution.From == start_port) &
@@ -281,6 +867,31 @@ class DistributionShipping(Shipping):
         if transition_std == float('inf'):
             transition_std = mean_transition_std
 
+        return DistributionShipping.sample_time_windows_from_transition(
+            world, transition_mean, transition_std, cargo_weight, pickup_period, time_windows_allowance)
+
+    @staticmethod
+    def sample_time_windows_from_transition(world, transition_mean, transition_std, cargo_weight, pickup_period,
+                                            time_windows_allowance=5):
+        """
+        Sample time windows based on the normal time transition distribution between the start and end port.
+
+        :param world: The world whose random is used.
+        :param transition_mean: The mean of the sailing time (in minutes) between the start and end port.
+        :type transition_mean: float
+        :param transition_std: The standard deviation of the sailing time (in minutes) between the start and end port.
+        :type transition_std: float
+        :param cargo_weight: The cargo weight to be transported. It is used to calculate loading and unloading times.
+        :type cargo_weight: float
+        :param pickup_period: The timestep interval in which trades needs to be picked up in days.
+        :type pickup_period: Tuple[float, float]
+        :param time_windows_allowance: The number of days (per directions) to extend each time window.
+        :type time_windows_allowance: int
+        :return: The pick-up time window and the delivery time window.
+        :rtype: Tuple[Tuple[float, float], Tuple[float, float]]
+        """
+        pickup_period_start_t = pickup_period[0]
+        pickup_period_end_t = pickup_period[1]
         time_window_in_hours = world.random.normal(transition_mean, transition_std)
 
         # Convert from minutes to days
@@ -294,7 +905,7 @@ class DistributionShipping(Shipping):
 
         # Create pickup and delivery time windows to execute the sampled trade within the pickup time interval specified
         pickup_period_absolute_end_t = pickup_period_end_t - time_windows_allowance - loading_time
-        pickup_time = world.random.randint(pickup_period_start_t, pickup_period_absolute_end_t)
+        pickup_time = draw_integers(world.random, pickup_period_start_t, pickup_period_absolute_end_t)
 
         window_origin_earliest = max(0, pickup_time - time_windows_allowance)
         window_origin_latest = min(window_origin_earliest + 2 * time_windows_allowance, pickup_period_end_t)
@@ -311,35 +922,58 @@ class DistributionShipping(Shipping):
         return pickup_time_window, delivery_time_window
 
     @staticmethod
-    def filter_out_outliers(df, stds_around_mean=5):
-        mean_of_mean_column = df[df['Mean'] != float('inf')]['Mean'].mean(axis=0)
-        std_of_mean_column = df[df['Mean'] != float('inf')]['Mean'].std(axis=0)
-
-        mean_of_std_column = df[df['Std. Dev'] != float('inf')]['Std. Dev'].mean(axis=0)
-        std_of_std_column = df[df['Std. Dev'] != float('inf')]['Std. Dev'].std(axis=0)
-
-        # only return data that is within +/- std from the mean
-        return df[
-            (
-                (
-                    (mean_of_mean_column - std_of_mean_column * stds_around_mean <= df['Mean']) &
-                    (df['Mean'] <= mean_of_mean_column + std_of_mean_column * stds_around_mean)
-                )
-                &
-                (
-                    (df['Std. Dev'] == float('inf'))
-                    |
-                    (
-                        (df['Std. Dev'] != float('inf')) &
-                        (
-                            (mean_of_std_column - std_of_std_column * stds_around_mean <= df['Std. Dev']) &
-                            (df['Std. Dev'] <= mean_of_std_column + std_of_std_column * stds_around_mean)
-                        )
-                    )
+    def sample_time_windows_from_transitions(world, transition_means, transition_stds, cargo_weights, pickup_period,
+                                             time_windows_allowance=5):
+        """
+        Sample time windows for several trades at once.
+        See :py:func:`sample_time_windows_from_transition` for the time window calculation.
+
+        :param world: The world whose random is used.
+        :param transition_means: The means of the sailing time (in minutes) for each trade.
+        :type transition_means: np.ndarray
+        :param transition_stds: The standard deviations of the sailing time (in minutes) for each trade.
+        :type transition_stds: np.ndarray
+        :param cargo_weights: The cargo weights of the trades.
+        :type cargo_weights: np.ndarray
+        :param pickup_period: The timestep interval in which trades needs to be picked up in days.
+        :type pickup_period: Tuple[float, float]
+        :param time_windows_allowance: The number of days (per directions) to extend each time window.
+        :type time_windows_allowance: int
+        :return: The time windows in hours with one row per trade and the columns earliest pick-up, latest pick-up,
+            earliest drop-off and latest drop-off.
+        :rtype: np.ndarray
+        """
+        pickup_period_start_t = pickup_period[0]
+        pickup_period_end_t = pickup_period[1]
+        time_window = world.random.normal(transition_means, transition_stds) / (24 * 60)
+        port_loading_rate = 50000
+        port_unloading_rate = 70000
+        loading_time = (cargo_weights / port_loading_rate).astype(int)
+        pickup_period_absolute_end_t = pickup_period_end_t - time_windows_allowance - loading_time
+        pickup_time = draw_integers(world.random, pickup_period_start_t, pickup_period_absolute_end_t)
+        window_origin_earliest = np.maximum(0, pickup_time - time_windows_allowance)
+        window_origin_latest = np.minimum(window_origin_earliest + 2 * time_windows_allowance, pickup_period_end_t)
+        unloading_time = (cargo_weights / port_unloading_rate).astype(int)
+        window_destination_earliest = window_origin_earliest + np.trunc(time_window).astype(int) + unloading_time
+        window_destination_latest = window_destination_earliest + 2 * time_windows_allowance
+        time_windows = np.column_stack((
+            window_origin_earliest, window_origin_latest, window_destination_earliest, window_destination_latest))
+        return time_windows * 24
 
-                )
-            )
-        ]
+    @staticmethod
+    def filter_out_outliers(df, stds_around_mean=5):
+        """
+        Only keep the records whose mean and finite standard deviation are within a number of standard deviations
+        around the mean of the respective column.
+
+        :param df: The distribution.
+        :type df: pd.DataFrame
+        :param stds_around_mean: The number of standard deviations.
+        :type stds_around_mean: float
+        :return: The records within the range.
+        :rtype: pd.DataFrame
+        """
+        return df[_get_inlier_mask(_get_columns(df), stds_around_mean)]
 
     def sample_cargoes_from_port_distributions(
             self,
@@ -355,6 +989,9 @@ class DistributionShipping(Shipping):
             precomputed_routes=None):
         """Samples a given number of trades based on distributions.
 
+        The distributions are compiled into a :py:class:`CargoDistributionTables` on the first call and the
+        compiled tables are reused as long as the same distributions are passed.
+
         Parameters
         ----------
         number_of_cargoes : int
@@ -406,140 +1043,31 @@ class DistributionShipping(Shipping):
 
         new_cargoes = []
         cargo_weight_threshold = 1
-
-        # Filter out outliers
-        time_transit_distribution = self.filter_out_outliers(time_transit_distribution)
-        cargo_weight_distribution = self.filter_out_outliers(cargo_weight_distribution)
-
-        # Get average standard deviations to use when missing
-        mean_transition_std = time_transit_distribution[time_transit_distribution['Std. Dev'] != float('inf')][
-            'Std. Dev'].mean(axis=0)
-        mean_cargo_weight_std = cargo_weight_distribution[cargo_weight_distribution['Std. Dev'] != float('inf')][
-            'Std. Dev'].mean(axis=0)
-
-        # Dictionaries to improve speed
-        all_transition_ports = set(list(time_transit_distribution.From.values)
-                                   + list(time_transit_distribution.To.values))
-        cargo_weight_dict = {}
-        time_transition_dict = {}
-        demand_transition_dict = {}
-        port_objects_dict = {}
-
-        # To sample start ports, we only consider ports previously supplying cargo
-        supply_data = frequency_distribution[frequency_distribution['SupplyDemand'] == 'Supply']
-
-        total_supply_trades = np.sum(supply_data['Num Samples'].values)
-        supply_probs = (supply_data['Num Samples'] / total_supply_trades).values
-
-        # TODO: May result in an infinite loop if bad data is given
+        tables = self._get_distribution_tables(
+            world, cargo_weight_distribution, frequency_distribution, time_transit_distribution, precomputed_routes)
+        if self._batch_sampling:
+            return self._sample_cargoes_batch(world, class_factory, number_of_cargoes, tables, pickup_period, time)
         while len(new_cargoes) < number_of_cargoes:
-            # Sample a starting port based on historical frequency of trades starting from ports
-            sampled_start_port_name = world.random.choice(supply_data['Port'].values, 1, replace=True, p=supply_probs)[0]
-
-            # skip if no transition links exist
-            if sampled_start_port_name not in all_transition_ports:
-                continue
-
-            sampled_start_port = port_objects_dict.get(sampled_start_port_name)
-            if sampled_start_port is None:
-                # skip if no location exist
-                try:
-                    sampled_start_port = world.network.get_port(sampled_start_port_name)
-                    # start_port_long = start_port.longitude
-                    # start_port_lat = start_port.latitude
-                    # sampled_start_port_object = class_factory.generate_port(sampled_start_port,
-                    #                                                         start_port_long,
-                    #                                                         start_port_lat)
-
-                    port_objects_dict[sampled_start_port] = sampled_start_port
-                except KeyError:
-                    logger.warning(f"Sampled port {sampled_start_port_name} not in network. Trying to sample again.")
-                    continue
-
-            # Sample supply cargo quantity
-            supply_quantity = self.sample_cargo_weight(world, cargo_weight_dict, cargo_weight_distribution,
-                                                       mean_cargo_weight_std, sampled_start_port_name,
-                                                       supply_demand='Supply')
-
-            # Sample end port from historical trades including the sampled start port
-            demand_data_from_port = demand_transition_dict.get(sampled_start_port_name)
-            if demand_data_from_port is None:
-                time_transit_distribution_from = time_transit_distribution[time_transit_distribution.From
-                                                                           == sampled_start_port_name]['To'].unique()
-                time_transit_distribution_to = time_transit_distribution[time_transit_distribution.To
-                                                                         == sampled_start_port_name]['From'].unique()
-                existent_to_transitions = list(time_transit_distribution_from) + list(time_transit_distribution_to)
-
-                demand_data_from_port = frequency_distribution[(frequency_distribution['SupplyDemand'] == 'Demand') &
-                                                               (frequency_distribution['Port']
-                                                                .isin(existent_to_transitions))]
-
-                demand_transition_dict[sampled_start_port_name] = demand_data_from_port
-
-            if len(demand_data_from_port['Num Samples'].values) == 0:
-                # skip if no historical links from start port
-                continue
-            else:
-                total_demand_trades = np.sum(demand_data_from_port['Num Samples'].values)
-                demand_probs_from_port = (demand_data_from_port['Num Samples'] / total_demand_trades).values
-
-            sampled_end_port_name = world.random.choice(demand_data_from_port['Port'].values, 1,
-                                                        replace=True, p=demand_probs_from_port)[0]
-
-            # skip if the ports selected coincide
-            if sampled_start_port_name == sampled_end_port_name:
-                continue
-
-            sampled_end_port = port_objects_dict.get(sampled_end_port_name)
-            if sampled_end_port is None:
-                # skip if no location exist
-                try:
-                    sampled_end_port = world.network.get_port(sampled_end_port_name)
-                    # end_port_long, end_port_lat = world.network.get_port(sampled_end_port_name)
-                    # sampled_end_port_object = class_factory.generate_port(sampled_end_port_name,
-                    #                                                       end_port_long,
-                    #                                                       end_port_lat)
-
-                    port_objects_dict[sampled_end_port_name] = sampled_end_port
-                except KeyError:
-                    logger.warning(f"Sampled port {sampled_start_port_name} not in network. Trying to sample again.")
-                    continue
-
-            # Do not proceed if precomputed routes are provided and route is  not in precomputed
-            if not precomputed_routes is None:
-                key_forward = f"{sampled_start_port_name}{sampled_end_port_name}"
-                key_backwards = f"{sampled_end_port_name}{sampled_start_port_name}"
-                if not (key_forward in precomputed_routes or key_backwards in precomputed_routes):
-                    logger.warning(f"No precomputed route between sampled ports "
-                                   f"{sampled_start_port_name} and {sampled_end_port_name}."
-                                   f" Trying to sample again.")
-                    continue
-
-            # Sample demand cargo quantity
-            demand_quantity = self.sample_cargo_weight(world, cargo_weight_dict, cargo_weight_distribution,
-                                                       mean_cargo_weight_std, sampled_end_port_name,
-                                                       supply_demand='Demand')
-
-            # Finally, we take the smaller number out of the sampled demand
-            # and supply quantity as a final cargo weight for the trade
+            origin_idx = tables.origin_table.sample(world.random)
+            destination_idx = tables.destination_tables[origin_idx].sample(world.random)
+            origin_id = tables.origin_ids[origin_idx]
+            destination_id = tables.destination_ids[origin_idx][destination_idx]
+            supply_quantity = world.random.gamma(tables.supply_shapes[origin_id], tables.supply_scales[origin_id])
+            demand_quantity = world.random.gamma(
+                tables.demand_shapes[destination_id], tables.demand_scales[destination_id])
+            # The smaller number out of the sampled demand and supply quantity is the trade's cargo weight
             quantity = min(supply_quantity, demand_quantity)
-
             if quantity <= cargo_weight_threshold:
                 continue
-
-            # Get time windows
-            pickup_time_window, delivery_time_window = self.sample_time_windows(world, time_transition_dict,
-                                                                                time_transit_distribution,
-                                                                                mean_transition_std,
-                                                                                sampled_start_port_name,
-                                                                                sampled_end_port_name,
-                                                                                quantity, pickup_period)
-
-            # create the sampled trade
-            # TODO set an appropriate time
+            pickup_time_window, delivery_time_window = self.sample_time_windows_from_transition(
+                world,
+                tables.transition_means[origin_idx][destination_idx],
+                tables.transition_stds[origin_idx][destination_idx],
+                quantity,
+                pickup_period)
             sampled_trade = class_factory.generate_trade(
-                    origin_port=sampled_start_port,
-                    destination_port=sampled_end_port,
+                    origin_port=tables.ports[origin_id],
+                    destination_port=tables.ports[destination_id],
                     amount=quantity,
                     cargo_type="Oil",
                     time=time,
@@ -551,3 +1079,72 @@ class DistributionShipping(Shipping):
                 )
             new_cargoes.append(sampled_trade)
         return new_cargoes
+
+    @staticmethod
+    def _sample_cargo_columns(world, number_of_cargoes, tables, pickup_period):
+        """
+        Samples all trades with single draws per distribution.
+        Trades whose cargo weight is below the threshold are resampled.
+
+        :return: The origin port ids, the destination port ids, the cargo weights and the time windows.
+        :rtype: Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+        """
+        cargo_weight_threshold = 1
+        origin_ids = []
+        destination_ids = []
+        flat_indices = []
+        quantities = []
+        num_missing = number_of_cargoes
+        while num_missing > 0:
+            one_origin_ids, one_destination_ids, one_flat_indices = tables.sample_routes(world.random, num_missing)
+            supply_quantities = world.random.gamma(
+                tables.supply_shapes[one_origin_ids], tables.supply_scales[one_origin_ids])
+            demand_quantities = world.random.gamma(
+                tables.demand_shapes[one_destination_ids], tables.demand_scales[one_destination_ids])
+            one_quantities = np.minimum(supply_quantities, demand_quantities)
+            is_valid = one_quantities > cargo_weight_threshold
+            origin_ids.append(one_origin_ids[is_valid])
+            destination_ids.append(one_destination_ids[is_valid])
+            flat_indices.append(one_flat_indices[is_valid])
+            quantities.append(one_quantities[is_valid])
+            num_missing -= np.count_nonzero(is_valid)
+        origin_ids = np.concatenate(origin_ids)
+        destination_ids = np.concatenate(destination_ids)
+        flat_indices = np.concatenate(flat_indices)
+        quantities = np.concatenate(quantities)
+        time_windows = DistributionShipping.sample_time_windows_from_transitions(
+            world, tables.flat_transition_means[flat_indices], tables.flat_transition_stds[flat_indices],
+            quantities, pickup_period)
+        return origin_ids, destination_ids, quantities, time_windows
+
+    @staticmethod
+    def _sample_cargoes_batch(world, class_factory, number_of_cargoes, tables, pickup_period, time):
+        origin_ids, destination_ids, quantities, time_windows = DistributionShipping._sample_cargo_columns(
+            world, number_of_cargoes, tables, pickup_period)
+        new_cargoes = [
+            class_factory.generate_trade(
+                origin_port=tables.ports[origin_id],
+                destination_port=tables.ports[destination_id],
+                amount=quantity,
+                cargo_type="Oil",
+                time=time,
+                time_window=time_window)
+            for origin_id, destination_id, quantity, time_window in zip(
+                origin_ids.tolist(), destination_ids.tolist(), quantities.tolist(), time_windows.tolist())]
+        return new_cargoes
+
+    def _get_distribution_tables(self, world, cargo_weight_distribution, frequency_distribution,
+                                 time_transit_distribution, precomputed_routes):
+        """
+        Returns the compiled distributions, compiling them only if they have not been compiled from the same
+        distributions before.
+        """
+        sources = (world.network, cargo_weight_distribution, frequency_distribution, time_transit_distribution,
+                   precomputed_routes)
+        if (self._distribution_tables_sources is None
+                or any(a is not b for a, b in zip(sources, self._distribution_tables_sources))):
+            self._distribution_tables = CargoDistributionTables.compile(
+                world.network, cargo_weight_distribution, frequency_distribution, time_transit_distribution,
+                precomputed_routes)
+            self._distribution_tables_sources = sources
+        return self._distribution_tables
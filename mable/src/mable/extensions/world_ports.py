@@ -54,6 +54,8 @@ class LatLongLocation(Location):
     A location with latitude and longitude.
     """
 
+    __slots__ = ()
+
     def __init__(self, latitude, longitude, name):
         super().__init__(latitude, longitude, name)
 
@@ -71,6 +73,8 @@ class LatLongPort(Port, JsonAble):
     A port with latitude and longitude.
     """
 
+    __slots__ = ()
+
     def __init__(self, name, latitude, longitude):
         """
         :param name: The name of the port.
@@ -205,6 +209,7 @@ class LatLongShippingNetwork(NetworkWithPortDict):
             with open(self._precomputed_routes_file, 'rb') as file:
                 self._precomputed_routes = pickle.load(file)
         self._graph_file = graph_file
+        self._port_distances = {}
         # canals
         self.canals = {
             "Suez": (LatLongLocation(32.5, 31.245, 'Suez canal start'),
@@ -260,6 +265,9 @@ class LatLongShippingNetwork(NetworkWithPortDict):
         """
         if isinstance(location_one, OnJourney) or isinstance(location_two, OnJourney):
             raise TypeError("OnJourney is not a valid fixed location. Two fixed locations required.")
+        port_ids = (self.get_port_id(location_one), self.get_port_id(location_two))
+        if port_ids[0] is not None and port_ids[1] is not None and port_ids in self._port_distances:
+            return self._port_distances[port_ids]
         if not isinstance(location_one, Location):
             location_one = self.get_port(location_one)
         if not isinstance(location_two, Location):
@@ -271,6 +279,8 @@ class LatLongShippingNetwork(NetworkWithPortDict):
             distance = math.inf
             if route is not None:
                 distance = route.length
+        if port_ids[0] is not None and port_ids[1] is not None:
+            self._port_distances[port_ids] = distance
         return distance
 
     def _get_precomputed_routes(self, location_one, location_two):
@@ -0,0 +1,274 @@
+"""
+Timing instrumentation of simulations.
+"""
+
+from contextlib import contextmanager
+import functools
+import json
+import os
+import threading
+import time
+
+from loguru import logger
+import numpy as np
+
+EVENT_CATEGORY = "event"
+OBSERVER_CATEGORY = "observer"
+COMPANY_CATEGORY = "company"
+ENGINE_CATEGORY = "engine"
+NETWORK_CATEGORY = "network"
+PHASE_CATEGORY = "phase"
+CACHE_CATEGORY = "cache"
+
+
+class Profiler:
+    """
+    Collects the durations of spans of the simulation, e.g. the processing of one event or one call to a company's
+    'inform'. Each span has a category and a name and the durations are aggregated per category and name.
+    The spans can be exported as a Chrome trace (see :py:func:`to_chrome_trace`).
+
+    Besides the spans, the profiler keeps counters per category and name, e.g. the hits and misses of a cache
+    (see :py:func:`add_counts`).
+
+    Methods of objects can be timed by replacing them on the instance (see :py:func:`instrument`).
+    """
+
+    def __init__(self, max_trace_events=1_000_000):
+        """
+        :param max_trace_events: The maximal number of spans kept for the trace. Further spans are only aggregated.
+        :type max_trace_events: int
+        """
+        super().__init__()
+        self._origin_ns = time.perf_counter_ns()
+        self._max_trace_events = max_trace_events
+        self._durations = {}
+        self._trace_events = []
+        self._counts = {}
+        self._instrumented = []
+
+    @property
+    def trace_events(self):
+        """
+        :return: The spans kept for the trace as tuples of name, category, start (ns), duration (ns),
+            thread id and arguments.
+        :rtype: List[Tuple[str, str, int, int, int, Dict | None]]
+        """
+        return self._trace_events
+
+    def add_span(self, name, category, start_ns, duration_ns, args=None):
+        """
+        Add a span.
+
+        :param name: The name of the span, e.g. the event type.
+        :type name: str
+        :param category: The category of the span, e.g. :py:const:`EVENT_CATEGORY`.
+        :type category: str
+        :param start_ns: The start as given by time.perf_counter_ns.
+        :type start_ns: int
+        :param duration_ns: The duration in nanoseconds.
+        :type duration_ns: int
+        :param args: Additional information for the trace.
+        :type args: Dict | None
+        """
+        key = (category, name)
+        durations = self._durations.get(key)
+        if durations is None:
+            durations = []
+            self._durations[key] = durations
+        durations.append(duration_ns)
+        if len(self._trace_events) < self._max_trace_events:
+            self._trace_events.append((name, category, start_ns, duration_ns, threading.get_ident(), args))
+            if len(self._trace_events) == self._max_trace_events:
+                logger.warning(f"Profiler reached {self._max_trace_events} trace events."
+                               f" Further spans are only aggregated.")
+
+    @contextmanager
+    def span(self, name, category, args=None):
+        """
+        Time the enclosed block as one span.
+
+        :param name: The name of the span.
+        :type name: str
+        :param category: The category of the span.
+        :type category: str
+        :param args: Additional information for the trace.
+        :type args: Dict | None
+        """
+        start_ns = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.add_span(name, category, start_ns, time.perf_counter_ns() - start_ns, args)
+
+    def instrument(self, obj, method_name, category, name=None):
+        """
+        Time all calls of a method of an object by replacing the method on the instance.
+        The replacement is undone by :py:func:`restore`.
+
+        :param obj: The object.
+        :type obj: Any
+        :param method_name: The name of the method.
+        :type method_name: str
+        :param category: The category of the spans.
+        :type category: str
+        :param name: The name of the spans. Default, i.e. None, is the method name.
+        :type name: str | None
+        """
+        if name is None:
+            name = method_name
+        had_instance_attribute = method_name in getattr(obj, "__dict__", {})
+        method = getattr(obj, method_name)
+
+        @functools.wraps(method)
+        def timed_method(*args, **kwargs):
+            start_ns = time.perf_counter_ns()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.add_span(name, category, start_ns, time.perf_counter_ns() - start_ns)
+
+        setattr(obj, method_name, timed_method)
+        self._instrumented.append((obj, method_name, had_instance_attribute, method))
+
+    def restore(self):
+        """
+        Undo all method replacements of :py:func:`instrument`.
+        """
+        for obj, method_name, had_instance_attribute, method in reversed(self._instrumented):
+            if had_instance_attribute:
+                setattr(obj, method_name, method)
+            else:
+                delattr(obj, method_name)
+        self._instrumented = []
+
+    def add_counts(self, name, category, **counts):
+        """
+        Add to the counters of a category and name.
+
+        :param name: The name, e.g. the name of the cached computation.
+        :type name: str
+        :param category: The category, e.g. :py:const:`CACHE_CATEGORY`.
+        :type category: str
+        :param counts: The amounts to add by counter, e.g. hits=1.
+        :type counts: int
+        """
+        counters = self._counts.get((category, name))
+        if counters is None:
+            counters = {}
+            self._counts[(category, name)] = counters
+        for counter, count in counts.items():
+            counters[counter] = counters.get(counter, 0) + count
+
+    def get_counts(self, category, name):
+        """
+        The counters of a category and name.
+
+        :param category: The category.
+        :type category: str
+        :param name: The name.
+        :type name: str
+        :return: The values by counter.
+        :rtype: Dict[str, int]
+        """
+        return dict(self._counts.get((category, name), {}))
+
+    def counts_summary(self):
+        """
+        The counters per category and name. Counters with hits and misses additionally have the hit rate,
+        i.e. the share of the hits, or None if there were neither.
+
+        :return: Per category and name the values by counter.
+        :rtype: Dict[str, Dict[str, Dict[str, int | float | None]]]
+        """
+        summary = {}
+        for (category, name), counters in self._counts.items():
+            one_summary = dict(counters)
+            if "hits" in counters and "misses" in counters:
+                number_of_lookups = counters["hits"] + counters["misses"]
+                one_summary["hit_rate"] = counters["hits"] / number_of_lookups if number_of_lookups > 0 else None
+            summary.setdefault(category, {})[name] = one_summary
+        return summary
+
+    def get_durations(self, category, name):
+        """
+        The durations of all spans of a category and name.
+
+        :param category: The category.
+        :type category: str
+        :param name: The name.
+        :type name: str
+        :return: The durations in seconds.
+        :rtype: np.ndarray
+        """
+        return np.array(self._durations.get((category, name), []), dtype=float) / 1e9
+
+    def get_histogram(self, category, name, bins=10):
+        """
+        The histogram of the durations of all spans of a category and name.
+
+        :param category: The category.
+        :type category: str
+        :param name: The name.
+        :type name: str
+        :param bins: The number of bins or the bin edges in seconds (see numpy.histogram).
+        :type bins: int | Sequence[float]
+        :return: The counts and the bin edges in seconds.
+        :rtype: Tuple[np.ndarray, np.ndarray]
+        """
+        return np.histogram(self.get_durations(category, name), bins=bins)
+
+    def summary(self):
+        """
+        Aggregate the durations per category and name.
+
+        :return: Per category and name the number of spans as well as the total, mean, median, 95th percentile and
+            maximum duration in seconds.
+        :rtype: Dict[str, Dict[str, Dict[str, float]]]
+        """
+        summary = {}
+        for (category, name) in self._durations:
+            durations = self.get_durations(category, name)
+            summary.setdefault(category, {})[name] = {
+                "count": len(durations),
+                "total": float(np.sum(durations)),
+                "mean": float(np.mean(durations)),
+                "median": float(np.median(durations)),
+                "p95": float(np.percentile(durations, 95)),
+                "max": float(np.max(durations))
+            }
+        return summary
+
+    def to_chrome_trace(self):
+        """
+        The spans in the Chrome trace event format as complete events, which can be viewed in, e.g.,
+        chrome://tracing or Perfetto.
+
+        :return: The trace.
+        :rtype: Dict
+        """
+        process_id = os.getpid()
+        trace_events = []
+        for name, category, start_ns, duration_ns, thread_id, args in self._trace_events:
+            one_trace_event = {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": (start_ns - self._origin_ns) / 1000,
+                "dur": duration_ns / 1000,
+                "pid": process_id,
+                "tid": thread_id
+            }
+            if args is not None:
+                one_trace_event["args"] = args
+            trace_events.append(one_trace_event)
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, file_path):
+        """
+        Write the spans as a Chrome trace json file.
+
+        :param file_path: The path of the file.
+        :type file_path: str | pathlib.Path
+        """
+        with open(file_path, "w") as trace_file:
+            json.dump(self.to_chrome_trace(), trace_file)
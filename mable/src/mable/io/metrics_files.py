@@ -0,0 +1,65 @@
+"""
+Reading of exported metrics files.
+"""
+
+import json
+
+
+def load_metrics(metrics_file_name):
+    """
+    Load the metrics of a simulation run.
+
+    For JSON Lines files (see :py:class:`mable.observers.JsonLinesExportObserver`) the metrics are taken from the
+    summary record and the auction outcomes are restored from the auction records.
+
+    :param metrics_file_name: The name of a json or JSON Lines (.jsonl) metrics file.
+    :type metrics_file_name: str
+    :return: The metrics.
+    :rtype: dict
+    :raises ValueError: If a JSON Lines file has no summary record, e.g. because the run did not finish.
+    """
+    with open(metrics_file_name, "r") as f:
+        if not metrics_file_name.endswith(".jsonl"):
+            return json.load(f)
+        records = [json.loads(line) for line in f if line.strip()]
+    summaries = [r for r in records if r["record"] == "summary"]
+    if len(summaries) == 0:
+        raise ValueError(f"No summary in {metrics_file_name}. The simulation might not have finished.")
+    metrics = summaries[-1]
+    company_ids = {name: company_id for company_id, name in metrics["company_names"].items()}
+    metrics["global_metrics"]["auction_outcomes"] = [
+        {company_ids[name]: contracts for name, contracts in r["contracts"].items() if name in company_ids}
+        for r in records if r["record"] == "auction"]
+    return metrics
+
+
+def get_metrics_overview(metrics):
+    """
+    The cost, penalty, revenue and income of each company.
+
+    The cost is the fuel cost, the revenue is the total payment of all won contracts and the income is the
+    revenue minus the cost and the penalty.
+
+    :param metrics: The metrics, e.g. as loaded by :py:func:`load_metrics`.
+    :type metrics: dict
+    :return: The overview per company name.
+    :rtype: Dict[str, Dict[str, float]]
+    """
+    overview = {}
+    for one_company_key in metrics["company_metrics"]:
+        company_name = metrics["company_names"][one_company_key]
+        cost = 0
+        if "fuel_cost" in metrics["company_metrics"][one_company_key]:
+            cost = metrics["company_metrics"][one_company_key]["fuel_cost"]
+        penalty = metrics["global_metrics"]["penalty"][one_company_key]
+        all_outcomes = metrics["global_metrics"]["auction_outcomes"]
+        all_outcomes_company_per_round = [d[one_company_key] for d in all_outcomes if one_company_key in d]
+        all_outcomes_company = [x for sublist in all_outcomes_company_per_round for x in sublist]
+        revenue = sum(d["payment"] for d in all_outcomes_company)
+        overview[company_name] = {
+            "cost": cost,
+            "penalty": penalty,
+            "revenue": revenue,
+            "income": revenue - cost - penalty
+        }
+    return overview
@@ -0,0 +1,345 @@
+"""
+A compact log of the events a vessel performed.
+"""
+
+import os
+import tempfile
+import weakref
+
+import attrs
+import numpy as np
+
+from mable.event_management import (
+    TravelEvent, IdleEvent, VesselCargoEvent, ArrivalEvent, CargoTransferEvent, VesselLocationInformationEvent)
+
+OTHER_EVENT_CODE = 0
+TRAVEL_EVENT_CODE = 1
+IDLE_EVENT_CODE = 2
+ARRIVAL_EVENT_CODE = 3
+CARGO_TRANSFER_EVENT_CODE = 4
+LOCATION_INFORMATION_EVENT_CODE = 5
+
+NO_ID = -1
+
+JOURNEY_LOG_DTYPE = np.dtype([
+    ("event_type", np.int8),
+    ("is_pickup", np.int8),
+    ("time_started", np.float64),
+    ("time", np.float64),
+    ("origin_id", np.int32),
+    ("destination_id", np.int32),
+    ("trade_id", np.int32),
+    ("distance", np.float64)
+])
+
+
+@attrs.define(frozen=True)
+class JourneyLogEntry:
+    """
+    One record of a :py:class:`JourneyLog`.
+
+    :param event_type: The code of the event type, e.g. :py:const:`TRAVEL_EVENT_CODE`.
+    :type event_type: int
+    :param is_pickup: 1 for a pickup, 0 for a drop-off and -1 for events that do not involve a trade.
+    :type is_pickup: int
+    :param time_started: The time the event started.
+    :type time_started: float
+    :param time: The time the event occurred, i.e. ended.
+    :type time: float
+    :param origin_id: The port id of the origin or -1 if the location is not a port.
+    :type origin_id: int
+    :param destination_id: The port id of the destination or -1 if the location is not a port.
+    :type destination_id: int
+    :param trade_id: The id of the trade within the log (see :py:func:`JourneyLog.get_trade`) or -1.
+    :type trade_id: int
+    :param distance: The distance crossed during the event or NaN if it was not determined.
+    :type distance: float
+    """
+    event_type: int
+    is_pickup: int
+    time_started: float
+    time: float
+    origin_id: int
+    destination_id: int
+    trade_id: int
+    distance: float
+
+
+def _remove_spill_file(file_path):
+    if file_path is not None and os.path.exists(file_path):
+        os.remove(file_path)
+
+
+class JourneyLog:
+    """
+    A log of the events of a vessel stored as fixed size records (see :py:const:`JOURNEY_LOG_DTYPE`) in one
+    array instead of the event objects.
+
+    The records are kept sorted by the occurrence time of the events. Since events are logged in the order in
+    which they occur this usually only appends. If a spill threshold is set the records are moved into a
+    memory-mapped file once the log grows beyond the threshold.
+    """
+
+    def __init__(self, capacity=64, spill_threshold=None, spill_directory=None):
+        """
+        :param capacity: The initial number of records the buffer can hold.
+        :type capacity: int
+        :param spill_threshold: The number of records beyond which the log is kept in a memory-mapped file.
+            None, the default, always keeps the log in memory.
+        :type spill_threshold: int | None
+        :param spill_directory: The directory for the memory-mapped file. None, the default, uses the system's
+            temporary directory.
+        :type spill_directory: str | None
+        """
+        super().__init__()
+        self._records = np.zeros(max(capacity, 1), dtype=JOURNEY_LOG_DTYPE)
+        self._size = 0
+        self._spill_threshold = None
+        self._spill_directory = None
+        self._spill_file_path = None
+        self._spill_finalizer = None
+        self._trades = []
+        self._trade_ids = {}
+        self.set_spill(spill_threshold, spill_directory)
+
+    def set_spill(self, spill_threshold, spill_directory=None):
+        """
+        Set the threshold beyond which the log is kept in a memory-mapped file.
+
+        :param spill_threshold: The number of records or None to always keep the log in memory.
+        :type spill_threshold: int | None
+        :param spill_directory: The directory for the memory-mapped file. None uses the system's temporary directory.
+        :type spill_directory: str | None
+        :raises ValueError: if the threshold is not positive.
+        """
+        if spill_threshold is not None and spill_threshold < 1:
+            raise ValueError(f"The spill threshold has to be positive, not {spill_threshold}")
+        self._spill_threshold = spill_threshold
+        self._spill_directory = spill_directory
+        if self._spill_threshold is not None and self._size > self._spill_threshold:
+            self._reallocate(len(self._records))
+
+    def __getstate__(self):
+        # The records are pickled in memory and spilled again on unpickling.
+        state = dict(vars(self))
+        state["_records"] = np.array(self.records)
+        state["_spill_file_path"] = None
+        state["_spill_finalizer"] = None
+        return state
+
+    def __setstate__(self, state):
+        vars(self).update(state)
+        self._trade_ids = {id(one_trade): trade_id for trade_id, one_trade in enumerate(self._trades)}
+        self._reallocate(max(2 * self._size, 1))
+
+    @property
+    def is_spilled(self):
+        """
+        :return: True if the records are in a memory-mapped file and False otherwise.
+        :rtype: bool
+        """
+        return self._spill_file_path is not None
+
+    @property
+    def spill_file_path(self):
+        """
+        :return: The path of the memory-mapped file or None if the log is in memory.
+        :rtype: str | None
+        """
+        return self._spill_file_path
+
+    @property
+    def records(self):
+        """
+        :return: A view on the records sorted by the time of the events.
+        :rtype: np.ndarray
+        """
+        return self._records[:self._size]
+
+    @property
+    def times_started(self):
+        """
+        :return: The start times of the events.
+        :rtype: np.ndarray
+        """
+        return self.records["time_started"]
+
+    @property
+    def times(self):
+        """
+        :return: The occurrence times of the events.
+        :rtype: np.ndarray
+        """
+        return self.records["time"]
+
+    @property
+    def event_types(self):
+        """
+        :return: The codes of the event types.
+        :rtype: np.ndarray
+        """
+        return self.records["event_type"]
+
+    @property
+    def distances(self):
+        """
+        :return: The distances crossed during the events.
+        :rtype: np.ndarray
+        """
+        return self.records["distance"]
+
+    @property
+    def nbytes(self):
+        """
+        :return: The number of bytes of the record buffer.
+        :rtype: int
+        """
+        return self._records.nbytes
+
+    def get_trade(self, trade_id):
+        """
+        The trade of the events with the specified trade id.
+
+        :param trade_id: The trade id.
+        :type trade_id: int
+        :return: The trade.
+        :rtype: Trade
+        """
+        return self._trades[trade_id]
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, index):
+        record = self.records[index]
+        return JourneyLogEntry(*record.tolist())
+
+    def __iter__(self):
+        for one_record in self.records.tolist():
+            yield JourneyLogEntry(*one_record)
+
+    def log_event(self, event, engine=None):
+        """
+        Log an event.
+
+        :param event: The event.
+        :type event: VesselEvent
+        :param engine: The simulation engine used to determine the distance of the event. If None, the distance is NaN.
+        :type engine: SimulationEngine | None
+        """
+        is_pickup = -1
+        trade_id = NO_ID
+        if isinstance(event, TravelEvent):
+            event_type = TRAVEL_EVENT_CODE
+            journey = event.location
+            origin, destination = journey.origin, journey.destination
+        elif isinstance(event, VesselCargoEvent):
+            if isinstance(event, ArrivalEvent):
+                event_type = ARRIVAL_EVENT_CODE
+            elif isinstance(event, CargoTransferEvent):
+                event_type = CARGO_TRANSFER_EVENT_CODE
+            else:
+                event_type = OTHER_EVENT_CODE
+            is_pickup = int(event.is_pickup)
+            origin, destination = event.trade.origin_port, event.trade.destination_port
+            trade_id = self._get_trade_id(event.trade)
+        else:
+            if isinstance(event, IdleEvent):
+                event_type = IDLE_EVENT_CODE
+            elif isinstance(event, VesselLocationInformationEvent):
+                event_type = LOCATION_INFORMATION_EVENT_CODE
+            else:
+                event_type = OTHER_EVENT_CODE
+            origin = destination = event.location
+        distance = np.nan
+        if engine is not None:
+            distance = event.distance(engine)
+        self.append(event_type, event.time_started, event.time,
+                    origin_id=self._get_port_id(origin), destination_id=self._get_port_id(destination),
+                    trade_id=trade_id, distance=distance, is_pickup=is_pickup)
+
+    def append(self, event_type, time_started, time, origin_id=NO_ID, destination_id=NO_ID, trade_id=NO_ID,
+               distance=np.nan, is_pickup=-1):
+        """
+        Add a record. The record is inserted after all records that occurred at the same time or before.
+
+        :param event_type: The code of the event type.
+        :type event_type: int
+        :param time_started: The time the event started.
+        :type time_started: float
+        :param time: The time the event occurred.
+        :type time: float
+        :param origin_id: The port id of the origin.
+        :type origin_id: int
+        :param destination_id: The port id of the destination.
+        :type destination_id: int
+        :param trade_id: The id of the trade.
+        :type trade_id: int
+        :param distance: The distance crossed.
+        :type distance: float
+        :param is_pickup: 1 for a pickup, 0 for a drop-off and -1 for events that do not involve a trade.
+        :type is_pickup: int
+        """
+        if self._size == len(self._records):
+            self._reallocate(2 * len(self._records))
+        record = (event_type, is_pickup, time_started, time, origin_id, destination_id, trade_id, distance)
+        position = self._size
+        if position > 0 and time < self._records["time"][position - 1]:
+            position = int(np.searchsorted(self._records["time"][:self._size], time, side="right"))
+            self._records[position + 1:self._size + 1] = self._records[position:self._size]
+        self._records[position] = record
+        self._size += 1
+
+    def idle_periods(self, end_time, start_time=0):
+        """
+        The periods between the logged events, i.e. from the occurrence of one event to the start of the next, in
+        which the vessel was idle. This includes the period from the start time to the first event and from the
+        last event to the end time.
+
+        :param end_time: The end of the last period.
+        :type end_time: float
+        :param start_time: The start of the first period.
+        :type start_time: float
+        :return: The start times and the end times of all periods with a positive length.
+        :rtype: Tuple[np.ndarray, np.ndarray]
+        """
+        period_starts = np.concatenate(([start_time], self.times))
+        period_ends = np.concatenate((self.times_started, [end_time]))
+        is_gap = period_ends - period_starts > 0
+        return period_starts[is_gap], period_ends[is_gap]
+
+    def _get_trade_id(self, trade):
+        trade_id = self._trade_ids.get(id(trade))
+        if trade_id is None:
+            trade_id = len(self._trades)
+            self._trade_ids[id(trade)] = trade_id
+            self._trades.append(trade)
+        return trade_id
+
+    @staticmethod
+    def _get_port_id(location):
+        port_id = getattr(location, "port_id", None)
+        if port_id is None:
+            port_id = NO_ID
+        return port_id
+
+    def _reallocate(self, capacity):
+        old_records = self._records
+        old_finalizer = self._spill_finalizer
+        if self._spill_threshold is not None and capacity > self._spill_threshold:
+            file_descriptor, file_path = tempfile.mkstemp(
+                prefix="journey_log_", suffix=".npy", dir=self._spill_directory)
+            os.close(file_descriptor)
+            new_records = np.lib.format.open_memmap(
+                file_path, mode="w+", dtype=JOURNEY_LOG_DTYPE, shape=(capacity,))
+            self._spill_file_path = file_path
+            self._spill_finalizer = weakref.finalize(self, _remove_spill_file, file_path)
+        else:
+            new_records = np.zeros(capacity, dtype=JOURNEY_LOG_DTYPE)
+            self._spill_file_path = None
+            self._spill_finalizer = None
+        new_records[:self._size] = old_records[:self._size]
+        self._records = new_records
+        if old_finalizer is not None:
+            del old_records
+            old_finalizer()
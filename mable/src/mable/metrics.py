@@ -2,6 +2,8 @@
 A module to support the collection of metrics for a simulation.
 """
 
+import numpy as np
+
 from mable.simulation_environment import SimulationEngineAware
 from mable.util import JsonAble
 
@@ -88,6 +90,10 @@ class MetricsCollector(JsonAble, SimulationEngineAware):
     """
     An object to collect company level and vessel level metrics. Each vessel and company can have collections
     of metrics via specifiable keys.
+
+    Companies, vessels and the keys of numeric metrics are assigned dense indices and numeric metrics are
+    accumulated in arrays with one row per company or vessel and one column per key. The arrays are only
+    transformed into dicts for :py:func:`to_json`.
     """
 
     def __init__(self):
@@ -100,6 +106,57 @@ class MetricsCollector(JsonAble, SimulationEngineAware):
         self._company_metrics = MetricDict()
         self._vessel_metrics = MetricDict()
         self._global_metrics = MetricDict()
+        self._metric_columns = {}
+        self._vessel_rows = {}
+        self._vessel_keys = []
+        self._vessel_company_rows = np.zeros(0, dtype=int)
+        self._company_values = np.zeros((0, 0))
+        self._company_has_value = np.zeros((0, 0), dtype=bool)
+        self._vessel_values = np.zeros((0, 0))
+        self._vessel_has_value = np.zeros((0, 0), dtype=bool)
+
+    def set_engine(self, engine):
+        """
+        Set the simulation engine and assign the ids of all companies and vessels of the engine.
+
+        :param engine: The simulation engine.
+        :type engine: SimulationEngine
+        """
+        super().set_engine(engine)
+        shipping_companies = getattr(engine, "shipping_companies", None)
+        if isinstance(shipping_companies, list):
+            for one_company in shipping_companies:
+                for one_vessel in one_company.fleet:
+                    self.get_vessel_id(one_vessel, one_company)
+
+    @staticmethod
+    def _grow(array, num_rows, num_columns):
+        rows, columns = array.shape
+        if num_rows <= rows and num_columns <= columns:
+            return array
+        new_shape = (max(num_rows, 2 * rows if num_rows > rows else rows),
+                     max(num_columns, 2 * columns if num_columns > columns else columns))
+        new_array = np.zeros(new_shape, dtype=array.dtype)
+        new_array[:rows, :columns] = array
+        return new_array
+
+    def _get_metric_column(self, key):
+        """
+        Get the column of a numeric metric. A new column is assigned to keys that are unknown.
+
+        :param key: The key of the metric.
+        :return: The column.
+        :rtype: int
+        """
+        column = self._metric_columns.get(key)
+        if column is None:
+            column = len(self._metric_columns)
+            self._metric_columns[key] = column
+            self._company_values = self._grow(self._company_values, self._company_values.shape[0], column + 1)
+            self._company_has_value = self._grow(self._company_has_value, self._company_has_value.shape[0], column + 1)
+            self._vessel_values = self._grow(self._vessel_values, self._vessel_values.shape[0], column + 1)
+            self._vessel_has_value = self._grow(self._vessel_has_value, self._vessel_has_value.shape[0], column + 1)
+        return column
 
     def _get_next_company_id(self, company):
         """
@@ -113,6 +170,9 @@ class MetricsCollector(JsonAble, SimulationEngineAware):
         self._company_ids[company] = self._last_company_id
         self._last_vessel_ids[self._last_company_id] = -1
         self._company_metrics[self._last_company_id] = {}
+        num_companies = self._last_company_id + 1
+        self._company_values = self._grow(self._company_values, num_companies, self._company_values.shape[1])
+        self._company_has_value = self._grow(self._company_has_value, num_companies, self._company_has_value.shape[1])
         return self._last_company_id
 
     def _get_next_vessel_id(self, company, vessel):
@@ -133,6 +193,15 @@ class MetricsCollector(JsonAble, SimulationEngineAware):
         current_vessel_id = VesselKey(company_id, self._last_vessel_ids[company_id])
         self._vessel_ids[vessel] = current_vessel_id
         self._vessel_metrics[current_vessel_id] = {}
+        vessel_row = len(self._vessel_keys)
+        self._vessel_rows[vessel] = vessel_row
+        self._vessel_keys.append(current_vessel_id)
+        num_vessels = vessel_row + 1
+        self._vessel_values = self._grow(self._vessel_values, num_vessels, self._vessel_values.shape[1])
+        self._vessel_has_value = self._grow(self._vessel_has_value, num_vessels, self._vessel_has_value.shape[1])
+        if num_vessels > len(self._vessel_company_rows):
+            self._vessel_company_rows = np.resize(self._vessel_company_rows, 2 * num_vessels)
+        self._vessel_company_rows[vessel_row] = company_id
         return current_vessel_id
 
     def get_company_id(self, company, create_id_if_not_exists=True):
@@ -193,10 +262,17 @@ class MetricsCollector(JsonAble, SimulationEngineAware):
                 raise key_error
         return vessel_id
 
+    def _get_vessel_row(self, vessel):
+        vessel_row = self._vessel_rows.get(vessel)
+        if vessel_row is None:
+            self.get_vessel_id(vessel)
+            vessel_row = self._vessel_rows[vessel]
+        return vessel_row
+
     def _add_company_numeric_metric(self, company_id, key, value):
-        if key not in self._company_metrics[company_id]:
-            self._company_metrics[company_id][key] = 0
-        self._company_metrics[company_id][key] += value
+        column = self._get_metric_column(key)
+        self._company_values[company_id, column] += value
+        self._company_has_value[company_id, column] = True
 
     def add_company_numeric_metric(self, company, key, value):
         """
@@ -207,8 +283,8 @@ class MetricsCollector(JsonAble, SimulationEngineAware):
             The company
         :param key:
             The key.
-        :param value:
-            The value. Anything that specifies __iadd__ or __add__.
+        :param value: float
+            The value.
         """
         company_id = self.get_company_id(company)
         self._add_company_numeric_metric(company_id, key, value)
@@ -222,15 +298,36 @@ class MetricsCollector(JsonAble, SimulationEngineAware):
             The vessel
         :param key:
             The key.
-        :param value:
-            The value. Anything that specifies __iadd__ or __add__.
+        :param value: float
+            The value.
         """
-        vessel_id = self.get_vessel_id(vessel)
-        company_id = vessel_id.company_id
-        self._add_company_numeric_metric(company_id, key, value)
-        if key not in self._vessel_metrics[vessel_id]:
-            self._vessel_metrics[vessel_id][key] = 0
-        self._vessel_metrics[vessel_id][key] += value
+        vessel_row = self._get_vessel_row(vessel)
+        column = self._get_metric_column(key)
+        company_row = self._vessel_company_rows[vessel_row]
+        self._vessel_values[vessel_row, column] += value
+        self._vessel_has_value[vessel_row, column] = True
+        self._company_values[company_row, column] += value
+        self._company_has_value[company_row, column] = True
+
+    def add_dual_numeric_metrics(self, vessel, keys, values):
+        """
+        Add several numeric metrics for a vessel and its company at once.
+        See :py:func:`add_dual_numeric_metric`.
+
+        :param vessel:
+            The vessel
+        :param keys: List
+            The keys. Each key may only occur once.
+        :param values: List[float]
+            The values in the order of the keys.
+        """
+        vessel_row = self._get_vessel_row(vessel)
+        columns = [self._get_metric_column(one_key) for one_key in keys]
+        company_row = self._vessel_company_rows[vessel_row]
+        self._vessel_values[vessel_row, columns] += values
+        self._vessel_has_value[vessel_row, columns] = True
+        self._company_values[company_row, columns] += values
+        self._company_has_value[company_row, columns] = True
 
     def add_global_company_list_metric(self, key, value):
         """
@@ -244,16 +341,31 @@ class MetricsCollector(JsonAble, SimulationEngineAware):
             self._global_metrics[key] = []
         self._global_metrics[key].append(value)
 
+    def _get_numeric_metrics(self, values, has_value, row):
+        return {one_key: values[row, column].item()
+                for one_key, column in self._metric_columns.items()
+                if has_value[row, column]}
+
     def to_json(self):
         """
         A dict of the company and the vessel metrics.
         :return: dict
             {"company_metrics": <companies' metrics>, "vessel_metrics": <vessels' metrics>}
         """
+        company_metrics = MetricDict()
+        for company_id in self._company_metrics:
+            company_metrics[company_id] = {
+                **self._get_numeric_metrics(self._company_values, self._company_has_value, company_id),
+                **self._company_metrics[company_id]}
+        vessel_metrics = MetricDict()
+        for vessel_row, vessel_key in enumerate(self._vessel_keys):
+            vessel_metrics[vessel_key] = {
+                **self._get_numeric_metrics(self._vessel_values, self._vessel_has_value, vessel_row),
+                **self._vessel_metrics[vessel_key]}
         return {
             "company_names": self._company_names,
-            "company_metrics": self._company_metrics,
-            "vessel_metrics": self._vessel_metrics,
+            "company_metrics": company_metrics,
+            "vessel_metrics": vessel_metrics,
             "global_metrics": self._global_metrics
         }
 
@@ -1,6 +1,9 @@
 """
 Simulation observation related classes and functions.
 """
+import json
+import pathlib
+
 from loguru import logger
 
 from mable.competition.generation import AuctionCargoEvent
@@ -9,10 +12,15 @@ from mable.event_management import (
     EventObserver, ArrivalEvent, CargoTransferEvent, TravelEvent, IdleEvent, VesselEvent,
     VesselLocationInformationEvent
 )
-from mable.metrics import GlobalMetricsCollector
+from mable.metrics import GlobalMetricsCollector, FUEL_CONSUMPTION_KEY, CO2_EMISSIONS_KEY, FUEL_COST_KEY
+from mable.util import JsonAbleEncoder
 
 
 class EventFuelPrintObserver(EventObserver):
+    """
+    A logger that prints every event and the fuel consumption, emissions and cost of the vessel events.
+    The consumption is only calculated if the logger emits the message.
+    """
 
     def __init__(self, logger):
         self._logger = logger
@@ -20,12 +28,16 @@ class EventFuelPrintObserver(EventObserver):
     def notify(self, engine, event, data):
         self._logger.info(event)
         if isinstance(event, VesselEvent) and event.performed_time() > 0:
-            consumption = MetricsObserver.calculate_consumption(engine, event)
-            co2_emissions = event.vessel.get_co2_emissions(consumption)
-            cost = event.vessel.get_cost(consumption)
-            self._logger.info(f"{event.vessel.name} Fuel consumption<{type(event).__name__.replace('Event', '')}>: "
-                              f"{round(consumption, 3)} t,"
-                              f" CO2: {round(co2_emissions, 3)} t, Cost: {round(cost, 2)} $")
+            self._logger.opt(lazy=True).info("{}", lambda: self._get_consumption_message(engine, event))
+
+    @staticmethod
+    def _get_consumption_message(engine, event):
+        consumption = MetricsObserver.calculate_consumption(engine, event)
+        co2_emissions = event.vessel.get_co2_emissions(consumption)
+        cost = event.vessel.get_cost(consumption)
+        return (f"{event.vessel.name} Fuel consumption<{type(event).__name__.replace('Event', '')}>: "
+                f"{round(consumption, 3)} t,"
+                f" CO2: {round(co2_emissions, 3)} t, Cost: {round(cost, 2)} $")
 
 
 class TradeDeliveryObserver(EventObserver):
@@ -36,7 +48,7 @@ class TradeDeliveryObserver(EventObserver):
     def notify(self, engine, event, data):
         if isinstance(event, CargoTransferEvent) and event.is_drop_off:
             company_for_vessel = engine.find_company_for_vessel(event.vessel)
-            logger.debug(f"Notified delivery observer about {type(company_for_vessel).__name__}'s event: {event}")
+            logger.debug("Notified delivery observer about {}'s event: {}", type(company_for_vessel).__name__, event)
             engine.market_authority.trade_fulfilled(event.trade, company_for_vessel)
 
 
@@ -81,10 +93,17 @@ class AuctionOutcomePrintObserver(EventObserver):
 
 
 class MetricsObserver(EventObserver):
+    """
+    An observer that collects the fuel, emission and cost metrics of the vessel events.
+
+    The idle time of each vessel between its events is tracked as the events occur.
+    The idle time after the last event of each vessel is added via :py:func:`add_final_idle_times`.
+    """
 
     def __init__(self):
         super().__init__()
         self._metrics = GlobalMetricsCollector()
+        self._vessel_last_event_times = {}
 
     @property
     def metrics(self):
@@ -109,18 +128,53 @@ class MetricsObserver(EventObserver):
         return vessel_status
 
     def notify(self, engine, event, data):
+        if isinstance(event, VesselEvent):
+            self._track_idle_time(event)
         if isinstance(event, VesselEvent) and event.performed_time() > 0:
             consumption = MetricsObserver.calculate_consumption(engine, event)
-            self._metrics.add_fuel_consumption(event.vessel, consumption)
             co2_emissions = event.vessel.get_co2_emissions(consumption)
-            self._metrics.add_co2_emissions(event.vessel, co2_emissions)
             cost = event.vessel.get_cost(consumption)
-            self._metrics.add_cost(event.vessel, cost)
             vessel_status = f"vessel_status_{MetricsObserver._get_event_vessel_status(event)}"
-            self._metrics.add_dual_numeric_metric(event.vessel, vessel_status, event.performed_time())
+            self._metrics.add_dual_numeric_metrics(
+                event.vessel,
+                [FUEL_CONSUMPTION_KEY, CO2_EMISSIONS_KEY, FUEL_COST_KEY, vessel_status],
+                [consumption, co2_emissions, cost, event.performed_time()])
         if isinstance(event, ArrivalEvent) or isinstance(event, VesselLocationInformationEvent):
             self._metrics.add_route_point(event.location.name, event.vessel)
 
+    def _track_idle_time(self, event):
+        last_event_time = self._vessel_last_event_times.get(event.vessel, 0)
+        if event.has_started() and event.time_started > last_event_time:
+            self._add_idle_time(event.vessel, event.time_started - last_event_time)
+        # Events before the start of the simulation, e.g. the initial location information at time -1, do not
+        # move the start of the idle periods before time 0.
+        self._vessel_last_event_times[event.vessel] = max(event.time, last_event_time)
+
+    def _add_idle_time(self, vessel, idle_time):
+        consumption = vessel.get_idle_consumption(idle_time)
+        self._metrics.add_dual_numeric_metrics(
+            vessel,
+            [FUEL_CONSUMPTION_KEY, CO2_EMISSIONS_KEY, FUEL_COST_KEY, "vessel_status_idle"],
+            [consumption, vessel.get_co2_emissions(consumption), vessel.get_cost(consumption), idle_time])
+
+    def add_final_idle_times(self, engine, end_time=None):
+        """
+        Add the idle time of all vessels from their last event until the end time.
+
+        :param engine: The simulation engine.
+        :type engine: SimulationEngine
+        :param end_time: The end time. Default, i.e. None, is the current time.
+        :type end_time: float
+        """
+        if end_time is None:
+            end_time = engine.world.current_time
+        for one_company in engine.shipping_companies:
+            for one_vessel in one_company.fleet:
+                last_event_time = self._vessel_last_event_times.get(one_vessel, 0)
+                if end_time > last_event_time:
+                    self._add_idle_time(one_vessel, end_time - last_event_time)
+                    self._vessel_last_event_times[one_vessel] = end_time
+
     @staticmethod
     def calculate_consumption(engine, event):
         time = event.performed_time()
@@ -128,7 +182,9 @@ class MetricsObserver(EventObserver):
         if any(isinstance(event, event_type) for event_type in (ArrivalEvent, TravelEvent)) and time > 0:
             distance = event.distance(engine)
             speed = distance / time
-            if event.vessel.has_any_load():
+            # The load on the voyage as determined when the event occurred, which is also correct when the vessel
+            # has proceeded with further events before the observers are notified (fast-forward).
+            if event.is_laden:
                 consumption = event.vessel.get_laden_consumption(time, speed)
             else:
                 consumption = event.vessel.get_ballast_consumption(time, speed)
@@ -151,6 +207,168 @@ class AuctionMetricsObserver(MetricsObserver):
             self._metrics.add_global_company_list_metric("auction_outcomes", auction_results)
 
 
+class JsonLinesExportObserver(EventObserver):
+    """
+    An observer that streams records of the vessel events and the auction outcomes to a JSON Lines file
+    while the simulation runs, i.e. one json object per line.
+
+    Every record has a field 'record' with the type of the record: 'event' for vessel events,
+    'auction' for the outcome of an auction and 'summary' for the final record written by
+    :py:func:`write_summary`. Records are buffered and appended to the file every flush_interval records
+    and after each auction.
+    """
+
+    SANDBOX_SAFE = False
+
+    def __init__(self, file_path, flush_interval=1000):
+        """
+        :param file_path: The path of the JSON Lines file. Records are appended if the file exists.
+        :type file_path: str | pathlib.Path
+        :param flush_interval: The number of records after which the buffered records are written to the file.
+        :type flush_interval: int
+        """
+        super().__init__()
+        self._file_path = file_path
+        self._flush_interval = flush_interval
+        self._buffer = []
+        self._file = None
+
+    @property
+    def file_path(self):
+        return self._file_path
+
+    def __getstate__(self):
+        # Checkpoints keep the position up to which the file was written instead of the file handle.
+        state = dict(vars(self))
+        state["_file"] = None
+        state["_file_size"] = self._file.tell() if self._file is not None else None
+        return state
+
+    def __setstate__(self, state):
+        file_size = state.pop("_file_size")
+        vars(self).update(state)
+        if file_size is not None:
+            # Drops the records written after the checkpoint.
+            self._file = open(self._file_path, "a")
+            self._file.truncate(file_size)
+
+    def _write(self, record):
+        self._buffer.append(json.dumps(record, cls=JsonAbleEncoder))
+        if len(self._buffer) >= self._flush_interval:
+            self.flush()
+
+    def flush(self):
+        """
+        Write all buffered records to the file.
+        """
+        if len(self._buffer) > 0:
+            if self._file is None:
+                self._file = open(self._file_path, "a")
+            self._file.write("\n".join(self._buffer) + "\n")
+            self._file.flush()
+            self._buffer = []
+
+    def prepare_checkpoint(self):
+        """
+        Write all buffered records so that the checkpoint does not store them.
+        """
+        self.flush()
+
+    def close(self):
+        """
+        Write all buffered records and close the file.
+        """
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def notify(self, engine, event, data):
+        if isinstance(event, VesselEvent) and event.performed_time() > 0:
+            consumption = MetricsObserver.calculate_consumption(engine, event)
+            self._write({
+                "record": "event",
+                "event": type(event).__name__,
+                "time": event.time,
+                "time_started": event.time_started,
+                "vessel": event.vessel.name,
+                "fuel_consumption": consumption,
+                "co2_emissions": event.vessel.get_co2_emissions(consumption),
+                "fuel_cost": event.vessel.get_cost(consumption),
+                "info": None if event.info is None else str(event.info)
+            })
+        elif isinstance(event, AuctionCargoEvent):
+            allocation_result = event.allocation_result
+            self._write({
+                "record": "auction",
+                "time": event.time,
+                "contracts": {one_company.name: allocation_result.ledger[one_company]
+                              for one_company in allocation_result.ledger.keys()},
+                "unallocated_trades": allocation_result.unallocated_trades
+            })
+            # Keeps the records of all finished auction periods on disk in case the run does not finish.
+            self.flush()
+
+    def write_summary(self, summary):
+        """
+        Write a final summary record and close the file.
+
+        :param summary: The summary, e.g. the collected metrics.
+        :type summary: dict
+        """
+        self._write({"record": "summary", **summary})
+        self.close()
+
+
+class CheckpointObserver(EventObserver):
+    """
+    An observer that writes a checkpoint of the simulation (see :py:func:`SimulationEngine.checkpoint`) after the
+    first event at or beyond every interval of simulation time.
+
+    The observer should be registered last so that all other observers have been notified about an event
+    when the checkpoint is written.
+    """
+
+    SANDBOX_SAFE = False
+
+    def __init__(self, directory, interval, pickle_companies=True):
+        """
+        :param directory: The directory of the checkpoint files.
+        :type directory: str | pathlib.Path
+        :param interval: The simulation time between two checkpoints.
+        :type interval: float
+        :param pickle_companies: See :py:func:`SimulationEngine.checkpoint`.
+        :type pickle_companies: bool
+        :raises ValueError: If the interval is not positive.
+        """
+        super().__init__()
+        if interval <= 0:
+            raise ValueError(f"The checkpoint interval has to be positive, not {interval}")
+        self._directory = directory
+        self._interval = interval
+        self._pickle_companies = pickle_companies
+        self._next_checkpoint_time = interval
+        self._checkpoint_paths = []
+
+    @property
+    def checkpoint_paths(self):
+        """
+        :return: The paths of all written checkpoints.
+        :rtype: List[pathlib.Path]
+        """
+        return self._checkpoint_paths
+
+    def notify(self, engine, event, data):
+        current_time = engine.world.current_time
+        if current_time >= self._next_checkpoint_time:
+            while self._next_checkpoint_time <= current_time:
+                self._next_checkpoint_time += self._interval
+            checkpoint_path = pathlib.Path(self._directory) / f"checkpoint_{current_time:.0f}.ckpt"
+            # The observer's own state is part of the checkpoint and is therefore updated before writing.
+            self._checkpoint_paths.append(checkpoint_path)
+            engine.checkpoint(checkpoint_path, self._pickle_companies)
+
+
 class LogRunner(EnginePrePostRunner):
 
     def __init__(self, run_logger, message):
@@ -0,0 +1,397 @@
+"""
+Parallel processing of the vessels' events between the other events, e.g. the auctions.
+
+The vessels' events between two other events are independent of each other (see
+:py:func:`SimulationEngine.enable_fast_forward`). A pool of worker processes is forked once and each worker owns a
+partition of the vessels for the rest of the run. At each barrier, i.e. before the next other event, the workers
+process their vessels' events up to the barrier and send back the processed events and the operational state of the
+vessels, i.e. the schedules, locations and cargo holds. The engine applies the states, logs the events in the
+vessels' journey logs and notifies the observers centrally. The state of a vessel is only sent to its worker if it
+changed in the engine since the last exchange, e.g. because the vessel got a new schedule after an auction.
+
+The objects that existed before the fork, e.g. the vessels and the ports, and the trades of the schedules that were
+sent to the workers are referenced instead of being sent again.
+
+Each barrier exchanges all processed events and the states of the processed vessels between the processes. The
+parallel processing therefore only pays off if the vessels' events between the barriers take considerably longer
+than this exchange, e.g. large fleets with long schedules, and if the machine has a CPU core for each worker.
+:py:mod:`mable.examples.benchmark` compares the numbers of processes for a setting.
+"""
+
+import io
+import multiprocessing
+import os
+import pickle
+import traceback
+import weakref
+
+from loguru import logger
+
+from mable.transport_operation import Vessel, ShippingCompany
+
+
+VESSEL_OPERATION_ATTRIBUTES = ("_schedule", "_location", "_cargo_hold")
+"""
+The attributes of a vessel that change when the vessel's events occur, except the journey log.
+"""
+
+
+def _get_reference_objects(engine):
+    """
+    The objects which are referenced instead of being sent between the engine and the workers. The trades the
+    workers can encounter are the trades of the vessels' schedules, which are the companies' copies of the
+    contracts' trades.
+
+    :param engine: The simulation engine.
+    :type engine: SimulationEngine
+    :return: The objects.
+    :rtype: List[Any]
+    """
+    world = engine.world
+    reference_objects = [engine, world, world.network, world.event_queue, world.random, engine.headquarters,
+                         engine.market, engine.class_factory, engine.shipping, engine.market_authority, logger]
+    reference_objects.extend(world.network.ports)
+    for one_company in engine.shipping_companies:
+        reference_objects.append(one_company)
+        for one_vessel in one_company.fleet:
+            reference_objects.append(one_vessel)
+            reference_objects.extend(one_vessel.schedule.get_scheduled_trades())
+    for one_company_contracts in engine.market_authority.contracts_per_company.values():
+        reference_objects.extend(one_contract.trade for one_contract in one_company_contracts)
+    return reference_objects
+
+
+class _SharedObjects:
+    """
+    The objects that the engine and the workers share by key. The objects that existed before the fork are keyed by
+    their id in the engine's process. Objects that the engine sends later are added under keys that the engine
+    assigns and sends along.
+    """
+
+    def __init__(self, objects):
+        """
+        :param objects: The objects that exist in all processes.
+        :type objects: List[Any]
+        """
+        self._objects = {id(one_object): one_object for one_object in objects}
+        self._keys = {id(one_object): id(one_object) for one_object in objects}
+        self._number_of_added_objects = 0
+
+    def get_key(self, obj):
+        """
+        :param obj: An object.
+        :type obj: Any
+        :return: The key of the object or None if the object is not shared.
+        :rtype: Hashable | None
+        """
+        key = self._keys.get(id(obj))
+        if key is not None and self._objects[key] is not obj:
+            key = None
+        return key
+
+    def get_object(self, key):
+        """
+        :param key: The key of a shared object.
+        :type key: Hashable
+        :return: The object.
+        :rtype: Any
+        """
+        return self._objects[key]
+
+    def get_new_keys(self, objects):
+        """
+        Assigns keys to objects that are not shared yet without adding them (see :py:func:`add`).
+
+        :param objects: The objects.
+        :type objects: List[Any]
+        :return: The keys and the objects.
+        :rtype: List[Tuple[Hashable, Any]]
+        """
+        keyed_objects = [(("added", self._number_of_added_objects + i), one_object)
+                         for i, one_object in enumerate(objects)]
+        self._number_of_added_objects += len(objects)
+        return keyed_objects
+
+    def add(self, keyed_objects):
+        """
+        Shares objects under the keys assigned by the engine (see :py:func:`get_new_keys`).
+
+        :param keyed_objects: The keys and the objects.
+        :type keyed_objects: List[Tuple[Hashable, Any]]
+        """
+        for key, one_object in keyed_objects:
+            self._objects[key] = one_object
+            self._keys[id(one_object)] = key
+
+
+class _ReferencePickler(pickle.Pickler):
+    """
+    A pickler that references the shared objects instead of storing them. Ports which are not the network's ports,
+    e.g. those of the companies' copies of the trades, are stored since ports are compared by value.
+    """
+
+    def __init__(self, file, shared_objects):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self._shared_objects = shared_objects
+
+    def persistent_id(self, obj):
+        key = self._shared_objects.get_key(obj)
+        if key is None and isinstance(obj, (Vessel, ShippingCompany)):
+            raise ValueError(f"{obj} is not known to the simulation and cannot be referenced.")
+        return key
+
+
+class _ReferenceUnpickler(pickle.Unpickler):
+    """
+    An unpickler that resolves the references of :py:class:`_ReferencePickler`.
+    """
+
+    def __init__(self, file, shared_objects):
+        super().__init__(file)
+        self._shared_objects = shared_objects
+
+    def persistent_load(self, key):
+        return self._shared_objects.get_object(key)
+
+
+def _dumps(obj, shared_objects):
+    buffer = io.BytesIO()
+    _ReferencePickler(buffer, shared_objects).dump(obj)
+    return buffer.getvalue()
+
+
+def _loads(data, shared_objects):
+    return _ReferenceUnpickler(io.BytesIO(data), shared_objects).load()
+
+
+def _get_operation_state(vessel):
+    """
+    :param vessel: The vessel.
+    :type vessel: Vessel
+    :return: The vessel's attributes that change when the vessel's events occur by name.
+    :rtype: Dict[str, Any]
+    """
+    return {one_attribute: getattr(vessel, one_attribute) for one_attribute in VESSEL_OPERATION_ATTRIBUTES}
+
+
+def partition_vessels(vessels, number_of_partitions):
+    """
+    Partition the vessels into partitions with about the same number of vessels.
+
+    :param vessels: The vessels.
+    :type vessels: List[Vessel]
+    :param number_of_partitions: The maximal number of partitions.
+    :type number_of_partitions: int
+    :return: The non-empty partitions.
+    :rtype: List[List[Vessel]]
+    """
+    partitions = [vessels[i::number_of_partitions] for i in range(number_of_partitions)]
+    return [one_partition for one_partition in partitions if len(one_partition) > 0]
+
+
+def _process_request(engine, shared_objects, request):
+    """
+    Process the vessels' events of one barrier in a worker.
+
+    :return: The processed events and the states of the processed vessels.
+    :rtype: Tuple[List[Tuple[VesselEvent, EventExecutionData]], List[Dict[str, Any]]]
+    """
+    added_objects, barrier_time, vessel_states, vessels = _loads(request, shared_objects)
+    shared_objects.add(added_objects)
+    for one_vessel, one_vessel_state in vessel_states:
+        vars(one_vessel).update(one_vessel_state)
+    event_queue = engine.world.event_queue
+    event_queue.hold(barrier_time)
+    try:
+        processed_events = engine.process_vessel_events([one_vessel._next_event for one_vessel in vessels])
+    finally:
+        event_queue.release_held_events()
+        # The engine keeps the next events of the vessels.
+        event_queue.restore_event_items([])
+    return processed_events, [_get_operation_state(one_vessel) for one_vessel in vessels]
+
+
+def _run_worker(engine, shared_objects, connection, engine_connection):
+    """
+    Process the requests of the engine in a forked process until the engine sends an empty request or closes the
+    connection. The results or errors are sent through the connection.
+    """
+    engine_connection.close()
+    engine.world.event_queue.restore_event_items([])
+    is_running = True
+    while is_running:
+        try:
+            request = connection.recv_bytes()
+        except EOFError:
+            request = b""
+        if len(request) == 0:
+            is_running = False
+        else:
+            try:
+                result = _dumps((True, _process_request(engine, shared_objects, request)), shared_objects)
+            except Exception:
+                result = pickle.dumps((False, traceback.format_exc()))
+            try:
+                connection.send_bytes(result)
+            except OSError:
+                # The engine stopped the workers.
+                is_running = False
+    connection.close()
+
+
+def _close_workers(workers, process_id):
+    """
+    Stop the workers unless called in another process than the one that started them, e.g. a fork of the engine.
+    """
+    if os.getpid() == process_id:
+        for process, connection in workers:
+            try:
+                connection.send_bytes(b"")
+            except OSError:
+                pass
+            connection.close()
+            process.join()
+        workers.clear()
+
+
+class VesselWorkerPool:
+    """
+    Forked worker processes which each own a partition of the vessels and process the vessels' events between the
+    other events (see :py:mod:`mable.parallel`).
+    """
+
+    def __init__(self, engine, number_of_processes):
+        """
+        Forks the workers. The vessels of the engine's companies are partitioned across the workers.
+
+        :param engine: The simulation engine.
+        :type engine: SimulationEngine
+        :param number_of_processes: The maximal number of worker processes.
+        :type number_of_processes: int
+        """
+        vessels = [one_vessel for one_company in engine.shipping_companies for one_vessel in one_company.fleet]
+        self._engine = engine
+        self._shared_objects = _SharedObjects(_get_reference_objects(engine))
+        self._worker_indices = {}
+        self._synchronised_states = {one_vessel: _get_operation_state(one_vessel) for one_vessel in vessels}
+        self._process_id = os.getpid()
+        self._workers = []
+        context = multiprocessing.get_context("fork")
+        for worker_index, one_partition in enumerate(partition_vessels(vessels, number_of_processes)):
+            for one_vessel in one_partition:
+                self._worker_indices[one_vessel] = worker_index
+            connection, worker_connection = context.Pipe()
+            process = context.Process(
+                target=_run_worker, args=(engine, self._shared_objects, worker_connection, connection), daemon=True)
+            process.start()
+            worker_connection.close()
+            self._workers.append((process, connection))
+        self._finalizer = weakref.finalize(self, _close_workers, self._workers, self._process_id)
+
+    @property
+    def number_of_workers(self):
+        """
+        :return: The number of worker processes.
+        :rtype: int
+        """
+        return len(self._workers)
+
+    def is_usable(self, engine):
+        """
+        :param engine: The simulation engine.
+        :type engine: SimulationEngine
+        :return: True if the workers were started by this process for the engine and are still running.
+        :rtype: bool
+        """
+        return (engine is self._engine and os.getpid() == self._process_id and len(self._workers) > 0
+                and all(process.is_alive() for process, _ in self._workers))
+
+    def _is_synchronised(self, vessel):
+        """
+        :param vessel: The vessel.
+        :type vessel: Vessel
+        :return: True if the vessel's worker has the vessel's current state.
+        :rtype: bool
+        """
+        synchronised_state = self._synchronised_states[vessel]
+        return all(getattr(vessel, one_attribute) is synchronised_state[one_attribute]
+                   for one_attribute in VESSEL_OPERATION_ATTRIBUTES)
+
+    def _get_request(self, vessels, barrier_time):
+        """
+        The request for a worker to process the vessels' events up to the barrier time with the states of the
+        vessels that changed since the last exchange.
+        """
+        vessel_states = [(one_vessel, _get_operation_state(one_vessel)) for one_vessel in vessels
+                         if not self._is_synchronised(one_vessel)]
+        new_trades = {}
+        for _, one_vessel_state in vessel_states:
+            for one_trade in one_vessel_state["_schedule"].get_scheduled_trades():
+                if self._shared_objects.get_key(one_trade) is None:
+                    new_trades[id(one_trade)] = one_trade
+        added_objects = self._shared_objects.get_new_keys(list(new_trades.values()))
+        # The new trades are stored before they are shared and referenced from then on.
+        request = _dumps((added_objects, barrier_time, vessel_states, vessels), self._shared_objects)
+        self._shared_objects.add(added_objects)
+        return request
+
+    def process_vessel_events(self, vessel_events, barrier_time):
+        """
+        Process the vessels' events before the barrier time in the workers.
+
+        The vessels' states are updated, the processed events are logged in the vessels' journey logs and the next
+        events of the vessels are added to the event queue. The observers are not notified.
+
+        :param vessel_events: The vessels' current events before the barrier time, which are not in the event queue.
+        :type vessel_events: List[VesselEvent]
+        :param barrier_time: The time of the next other event.
+        :type barrier_time: float
+        :return: The processed events and their associated data.
+        :rtype: List[Tuple[VesselEvent, EventExecutionData]]
+        :raises ValueError: If the processing failed in a worker process. The workers are stopped.
+        """
+        vessels_per_worker = [[] for _ in self._workers]
+        for one_event in vessel_events:
+            vessels_per_worker[self._worker_indices[one_event.vessel]].append(one_event.vessel)
+        requested_workers = [(worker, vessels) for worker, vessels in zip(self._workers, vessels_per_worker)
+                             if len(vessels) > 0]
+        results = []
+        try:
+            for (_, connection), vessels in requested_workers:
+                connection.send_bytes(self._get_request(vessels, barrier_time))
+            for (process, connection), _ in requested_workers:
+                try:
+                    results.append(connection.recv_bytes())
+                except EOFError:
+                    results.append(pickle.dumps((False, f"The worker process exited with code {process.exitcode}.")))
+        except OSError as e:
+            results.append(pickle.dumps((False, f"The communication with a worker process failed: {e}")))
+        processed_events = []
+        errors = []
+        for one_result, (_, vessels) in zip(results, requested_workers):
+            is_successful, worker_result = _loads(one_result, self._shared_objects)
+            if is_successful:
+                worker_events, vessel_states = worker_result
+                for one_vessel, one_vessel_state in zip(vessels, vessel_states):
+                    vars(one_vessel).update(one_vessel_state)
+                    self._synchronised_states[one_vessel] = one_vessel_state
+                    # The worker already started the vessel's next event.
+                    next_event = one_vessel_state["_schedule"].next()
+                    if next_event is not None:
+                        self._engine.world.event_queue.restore_event(next_event)
+                processed_events.extend(worker_events)
+            else:
+                errors.append(worker_result)
+        if len(errors) > 0:
+            self.close()
+            raise ValueError(f"Processing the vessel events failed in {len(errors)} worker process(es):\n"
+                             + "\n".join(errors))
+        for one_event, _ in processed_events:
+            one_event.vessel.log_journey_log_event(one_event)
+        return processed_events
+
+    def close(self):
+        """
+        Stop the workers.
+        """
+        self._finalizer()
@@ -0,0 +1,161 @@
+"""
+Independent random streams of the simulation's subsystems.
+
+Each subsystem draws its random numbers from its own stream. The streams are spawned from one root seed sequence
+(see numpy.random.SeedSequence.spawn) and are therefore statistically independent and reproducible. The numbers a
+subsystem draws do not depend on how many numbers other subsystems drew before, i.e. generating trades lazily or
+processing in a different order does not change the outcome of the other subsystems.
+"""
+
+import numpy as np
+
+
+VESSEL_PLACEMENT = "vessel_placement"
+TRADE_GENERATION = "trade_generation"
+TRADE_REALISATION = "trade_realisation"
+
+# The order determines the spawn keys and must therefore only be appended to.
+STREAMS = (VESSEL_PLACEMENT, TRADE_GENERATION, TRADE_REALISATION)
+
+
+def get_stream_seed_sequence(seed_sequence, stream, *keys):
+    """
+    The seed sequence of a stream. The stream's seed sequence is the child of the root seed sequence that
+    :py:func:`numpy.random.SeedSequence.spawn` would create for the stream's index. Further keys, e.g. the index of a
+    period, derive further independent children from the stream's seed sequence.
+
+    :param seed_sequence: The root seed sequence.
+    :type seed_sequence: np.random.SeedSequence
+    :param stream: The name of the stream (see :py:const:`STREAMS`).
+    :type stream: str
+    :param keys: Non-negative integers to derive a child of the stream's seed sequence.
+    :type keys: int
+    :return: The seed sequence.
+    :rtype: np.random.SeedSequence
+    :raises ValueError: If the stream does not exist.
+    """
+    if stream not in STREAMS:
+        raise ValueError(f"Unknown random stream {stream}. Streams are {', '.join(STREAMS)}.")
+    spawn_key = tuple(seed_sequence.spawn_key) + (STREAMS.index(stream),) + tuple(int(k) for k in keys)
+    return np.random.SeedSequence(seed_sequence.entropy, spawn_key=spawn_key)
+
+
+def get_generator(seed, stream, *keys):
+    """
+    A generator of a stream spawned from a seed.
+
+    :param seed: The root seed.
+    :type seed: int | np.random.SeedSequence
+    :param stream: The name of the stream (see :py:const:`STREAMS`).
+    :type stream: str
+    :param keys: Non-negative integers to derive a child of the stream (see :py:func:`get_stream_seed_sequence`).
+    :type keys: int
+    :return: The generator.
+    :rtype: np.random.Generator
+    """
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    return np.random.Generator(np.random.PCG64(get_stream_seed_sequence(seed, stream, *keys)))
+
+
+class RandomStreams:
+    """
+    The random streams of a simulation spawned from one root seed sequence.
+    """
+
+    def __init__(self, seed_sequence):
+        """
+        :param seed_sequence: The root seed sequence.
+        :type seed_sequence: np.random.SeedSequence
+        """
+        super().__init__()
+        self._seed_sequence = seed_sequence
+        self._generators = {}
+
+    @property
+    def seed_sequence(self):
+        """
+        :return: The root seed sequence.
+        :rtype: np.random.SeedSequence
+        """
+        return self._seed_sequence
+
+    def get_seed_sequence(self, stream, *keys):
+        """
+        The seed sequence of a stream (see :py:func:`get_stream_seed_sequence`).
+
+        :param stream: The name of the stream.
+        :type stream: str
+        :param keys: Non-negative integers to derive a child of the stream's seed sequence.
+        :type keys: int
+        :return: The seed sequence.
+        :rtype: np.random.SeedSequence
+        """
+        return get_stream_seed_sequence(self._seed_sequence, stream, *keys)
+
+    def get_generator(self, stream):
+        """
+        The generator of a stream. The generator is created on first request and then kept, i.e. consecutive
+        requests continue the same stream.
+
+        :param stream: The name of the stream.
+        :type stream: str
+        :return: The generator.
+        :rtype: np.random.Generator
+        """
+        generator = self._generators.get(stream)
+        if generator is None:
+            generator = np.random.Generator(np.random.PCG64(self.get_seed_sequence(stream)))
+            self._generators[stream] = generator
+        return generator
+
+    def reseed(self, seed_sequence):
+        """
+        Restart all streams from a new root seed sequence.
+
+        :param seed_sequence: The root seed sequence.
+        :type seed_sequence: np.random.SeedSequence
+        """
+        self._seed_sequence = seed_sequence
+        self._generators = {}
+
+    def get_state(self):
+        """
+        :return: The state of the generators that were requested so far by stream name.
+        :rtype: Dict[str, dict]
+        """
+        return {stream: generator.bit_generator.state for stream, generator in self._generators.items()}
+
+    def set_state(self, state):
+        """
+        Set the state of the generators, e.g. as obtained by :py:func:`get_state`.
+
+        :param state: The state of the generators by stream name.
+        :type state: Dict[str, dict]
+        """
+        self._generators = {}
+        for stream, generator_state in state.items():
+            self.get_generator(stream).bit_generator.state = generator_state
+
+
+def draw_integers(random, low, high=None, size=None):
+    """
+    Draw integers from [low, high) with either a :py:class:`numpy.random.Generator` or a legacy
+    :py:class:`numpy.random.RandomState`.
+
+    :param random: The random number generator.
+    :type random: np.random.Generator | np.random.RandomState
+    :param low: The lowest integer or, if high is None, one above the highest integer with zero as the lowest.
+    :type low: int | np.ndarray
+    :param high: One above the highest integer.
+    :type high: int | np.ndarray | None
+    :param size: The number of integers or None for a single integer.
+    :type size: int | None
+    :return: The integer(s).
+    :rtype: int | np.ndarray
+    """
+    if isinstance(random, np.random.Generator):
+        integers = random.integers(low, high, size=size)
+    else:
+        integers = random.randint(low, high, size=size)
+    return integers
@@ -7,18 +7,23 @@ from abc import abstractmethod
 from enum import Enum
 from typing import Union, Hashable, TYPE_CHECKING, List, Dict
 import math
+import weakref
 
 import attrs
 import loguru
+import numpy as np
 
 from mable.util import JsonAble
 from mable.simulation_space.universe import Port
+from mable.random_streams import TRADE_REALISATION
 from mable.simulation_environment import SimulationEngineAware
+from mable.competition.resources import get_company_operation
 
 
 if TYPE_CHECKING:
     from mable.cargo_bidding import TradingCompany
     from mable.transport_operation import ShippingCompany
+    from mable.competition.resources import AgentResourceMonitor
 
 
 logger = loguru.logger
@@ -70,6 +75,29 @@ class Shipping(SimulationEngineAware):
         times = list(self._all_trades.keys())
         return times
 
+    def get_static_objects(self):
+        """
+        The objects of the shipping that do not change while the simulation runs, e.g. the inputs the trades are
+        generated from. Checkpoints reference these objects instead of storing them (see :py:mod:`mable.checkpointing`).
+        The shipping has no such objects on default.
+
+        :return: The objects by name.
+        :rtype: Dict[str, Any]
+        """
+        return {}
+
+    def resample_future_trades(self, seed):
+        """
+        Replace the trades that have not been announced yet by newly sampled ones, e.g. in sandbox continuations
+        of the simulation so that they do not reveal the simulation's future trades.
+
+        Trades that are specified rather than sampled are kept, which is the default.
+
+        :param seed: The seed for the new trades.
+        :type seed: int
+        """
+        pass
+
     def get_trades(self, time):
         """
         Get trades for a specific time.
@@ -84,17 +112,37 @@ class Shipping(SimulationEngineAware):
         else:
             if time in self._all_trades:
                 trades = self._all_trades[time]
-                all_occurring_trades = [
-                    t for t in trades
-                    if self._engine.world.random.choice([0, 1], p=[1 - t.probability, t.probability])]
-                logger.info(f"{len(all_occurring_trades)} trades of a total of {len(trades)} trades realised (time: {time}).")
-                for one_trade in [t for t in trades if t not in all_occurring_trades]:
-                    one_trade.status = TradeStatus.NOT_REALISED
+                probabilities = np.fromiter((t.probability for t in trades), dtype=float, count=len(trades))
+                is_occurring = self._draw_realisation(time, probabilities)
+                all_occurring_trades = [t for t, occurs in zip(trades, is_occurring) if occurs]
+                for one_trade, occurs in zip(trades, is_occurring):
+                    if not occurs:
+                        one_trade.status = TradeStatus.NOT_REALISED
                 self._occurred_trades[time] = all_occurring_trades
             else:
                 all_occurring_trades = []
         return all_occurring_trades
 
+    def _draw_realisation(self, time, probabilities):
+        """
+        Draw which of the trades of a time occur.
+
+        :param time: The time.
+        :type time: float
+        :param probabilities: The probabilities of the trades.
+        :type probabilities: np.ndarray
+        :return: For each trade if it occurs.
+        :rtype: np.ndarray
+        """
+        # The realisation of each time's trades has an own stream so it does not depend on the order in
+        # which the times are requested.
+        realisation_random = np.random.Generator(np.random.PCG64(
+            self._engine.world.random_streams.get_seed_sequence(TRADE_REALISATION, int(time))))
+        is_occurring = realisation_random.random(len(probabilities)) < probabilities
+        logger.info("{} trades of a total of {} trades realised (time: {}).",
+                    np.count_nonzero(is_occurring), len(probabilities), time)
+        return is_occurring
+
 
 class TradeStatus(Enum):
     UNKNOWN = 1
@@ -103,6 +151,21 @@ class TradeStatus(Enum):
     REJECTED = 4
 
 
+def _reset_key(trade, attribute, value):
+    """
+    Resets the cached key of a trade when an attribute of the key is set (see :py:attr:`Trade.key`).
+    """
+    trade._key = None
+    return value
+
+
+def _is_exported(attribute, value):
+    """
+    Excludes the cached key of trades from their export, e.g. in :py:func:`Trade.to_json`.
+    """
+    return attribute.name != "_key"
+
+
 @attrs.define(kw_only=True)
 class Trade(JsonAble):
     """
@@ -119,18 +182,39 @@ class Trade(JsonAble):
     :param time: The time that trade becomes available for allocation or a market etc.
     :type time: int
     """
-    origin_port: Union[Port, str]
-    destination_port: Union[Port, str]
-    amount: float
-    cargo_type: Hashable = None
-    time: int = 0
+    origin_port: Union[Port, str] = attrs.field(on_setattr=_reset_key)
+    destination_port: Union[Port, str] = attrs.field(on_setattr=_reset_key)
+    amount: float = attrs.field(on_setattr=_reset_key)
+    cargo_type: Hashable = attrs.field(default=None, on_setattr=_reset_key)
+    time: int = attrs.field(default=0, on_setattr=_reset_key)
     probability: float = 1
     status: TradeStatus = TradeStatus.UNKNOWN
+    _key: tuple = attrs.field(default=None, init=False, eq=False, repr=False)
+
+    @property
+    def key(self):
+        """
+        A hashable key that identifies the trade independently of the object, e.g. the companies' copies of a trade
+        have the same key as the trade. The key consists of the names of the ports, the amount, the cargo type,
+        the time and the time windows, which are all unset for trades without time windows.
+        The key is built on the first access and kept until one of these attributes is set.
+
+        :return: The key.
+        :rtype: tuple
+        """
+        if self._key is None:
+            self._key = (getattr(self.origin_port, "name", self.origin_port),
+                         getattr(self.destination_port, "name", self.destination_port),
+                         self.amount, self.cargo_type, self.time, self._get_time_window_key())
+        return self._key
+
+    def _get_time_window_key(self):
+        return None, None, None, None
 
     def to_json(self):
         # noinspection PyTypeChecker
         # Trade is an attrs instance.
-        return attrs.asdict(self)
+        return attrs.asdict(self, filter=_is_exported)
 
 
 @attrs.define(kw_only=True)
@@ -150,7 +234,7 @@ class TimeWindowTrade(Trade):
 
     For additional parameters see :py:class:`Trade`
     """
-    time_window: list = [None, None, None, None]
+    time_window: list = attrs.field(default=[None, None, None, None], on_setattr=_reset_key)
 
     @property
     def earliest_pickup(self):
@@ -237,11 +321,252 @@ class TimeWindowTrade(Trade):
         return [self.earliest_pickup_clean, self.latest_pickup_clean,
                 self.earliest_drop_off_clean, self.latest_drop_off_clean]
 
+    def _get_time_window_key(self):
+        return tuple(self.time_window)
+
     def __hash__(self):
         hash_value = hash(f"super.__hash__(self) {self.time_window}")
         return hash_value
 
 
+class TradeTable:
+    """
+    A columnar store of time window trades.
+
+    The attributes of the trades are kept in numpy arrays: the ports by their id, the cargo types as codes,
+    the statuses as the statuses' values and time windows without a value (None) as nan.
+    Trades are only created on demand (see :py:func:`get_trade`) as regular :py:class:`TimeWindowTrade` objects.
+    The table keeps no reference to the trade objects: a trade is the same object as long as it is referenced
+    elsewhere and is created again from the columns otherwise. The columns are the only source of truth, i.e.
+    statuses have to be changed via :py:func:`set_status`, which also updates the existing trade objects.
+    """
+
+    def __init__(self, ports, capacity=1024):
+        """
+        :param ports: The ports indexed by their id, e.g. :py:attr:`NetworkWithPortDict.ports`.
+        :type ports: List[Port]
+        :param capacity: The initial number of trades to allocate space for.
+        :type capacity: int
+        """
+        self._ports = list(ports)
+        self._port_ids_by_name = {one_port.name: port_id for port_id, one_port in enumerate(self._ports)}
+        self._size = 0
+        capacity = max(capacity, 1)
+        self._origin_ids = np.empty(capacity, dtype=np.int32)
+        self._destination_ids = np.empty(capacity, dtype=np.int32)
+        self._amounts = np.empty(capacity, dtype=float)
+        self._cargo_type_codes = np.empty(capacity, dtype=np.int16)
+        self._times = np.empty(capacity, dtype=np.int64)
+        self._probabilities = np.empty(capacity, dtype=float)
+        self._statuses = np.empty(capacity, dtype=np.int8)
+        self._time_windows = np.empty((capacity, 4), dtype=float)
+        self._cargo_types = []
+        self._cargo_type_codes_by_type = {}
+        self._trades = weakref.WeakValueDictionary()
+
+    def __len__(self):
+        return self._size
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_trades"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._trades = weakref.WeakValueDictionary()
+
+    @property
+    def nbytes(self):
+        """
+        :return: The number of bytes used by the columns (including allocated but unused space).
+        :rtype: int
+        """
+        return sum(column.nbytes for column in [
+            self._origin_ids, self._destination_ids, self._amounts, self._cargo_type_codes, self._times,
+            self._probabilities, self._statuses, self._time_windows])
+
+    @property
+    def origin_ids(self):
+        return self._origin_ids[:self._size]
+
+    @property
+    def destination_ids(self):
+        return self._destination_ids[:self._size]
+
+    @property
+    def amounts(self):
+        return self._amounts[:self._size]
+
+    @property
+    def times(self):
+        return self._times[:self._size]
+
+    @property
+    def probabilities(self):
+        return self._probabilities[:self._size]
+
+    @property
+    def time_windows(self):
+        """
+        :return: The time windows with one row per trade. Time points without a value are nan.
+        :rtype: np.ndarray
+        """
+        return self._time_windows[:self._size]
+
+    @property
+    def statuses(self):
+        """
+        :return: The values of the trades' statuses (see :py:class:`TradeStatus`).
+        :rtype: np.ndarray
+        """
+        return self._statuses[:self._size]
+
+    def _ensure_capacity(self, size):
+        capacity = len(self._amounts)
+        if size <= capacity:
+            return
+        new_capacity = max(size, 2 * capacity)
+        for column_name in ["_origin_ids", "_destination_ids", "_amounts", "_cargo_type_codes", "_times",
+                            "_probabilities", "_statuses", "_time_windows"]:
+            column = getattr(self, column_name)
+            new_column = np.empty((new_capacity,) + column.shape[1:], dtype=column.dtype)
+            new_column[:capacity] = column
+            setattr(self, column_name, new_column)
+
+    def _get_cargo_type_code(self, cargo_type):
+        code = self._cargo_type_codes_by_type.get(cargo_type)
+        if code is None:
+            code = len(self._cargo_types)
+            self._cargo_types.append(cargo_type)
+            self._cargo_type_codes_by_type[cargo_type] = code
+        return code
+
+    def _get_port_id(self, port):
+        port_id = getattr(port, "port_id", None)
+        if port_id is None or port_id >= len(self._ports) or self._ports[port_id] is not port:
+            port_id = self._port_ids_by_name[getattr(port, "name", port)]
+        return port_id
+
+    def add_columns(self, origin_ids, destination_ids, amounts, times, time_windows=None, cargo_type=None,
+                    probabilities=1.0):
+        """
+        Add trades specified by columns.
+
+        :param origin_ids: The ids of the origin ports.
+        :type origin_ids: np.ndarray
+        :param destination_ids: The ids of the destination ports.
+        :type destination_ids: np.ndarray
+        :param amounts: The amounts of cargo.
+        :type amounts: np.ndarray
+        :param times: The times the trades become available.
+        :type times: np.ndarray | int
+        :param time_windows: The time windows as one row per trade. Nan or None for no time windows.
+        :type time_windows: np.ndarray | None
+        :param cargo_type: The cargo type of all trades.
+        :type cargo_type: Hashable
+        :param probabilities: The probabilities of the trades.
+        :type probabilities: np.ndarray | float
+        :return: The indices of the trades.
+        :rtype: np.ndarray
+        """
+        num_trades = len(amounts)
+        start = self._size
+        end = start + num_trades
+        self._ensure_capacity(end)
+        self._origin_ids[start:end] = origin_ids
+        self._destination_ids[start:end] = destination_ids
+        self._amounts[start:end] = amounts
+        self._cargo_type_codes[start:end] = self._get_cargo_type_code(cargo_type)
+        self._times[start:end] = times
+        self._probabilities[start:end] = probabilities
+        self._statuses[start:end] = TradeStatus.UNKNOWN.value
+        self._time_windows[start:end] = np.nan if time_windows is None else time_windows
+        self._size = end
+        return np.arange(start, end)
+
+    def add_trades(self, trades):
+        """
+        Add trades. The trades become the trades of the table, i.e. :py:func:`get_trade` returns the passed objects
+        as long as they are referenced elsewhere.
+
+        :param trades: The trades.
+        :type trades: List[Trade]
+        :return: The indices of the trades.
+        :rtype: np.ndarray
+        """
+        start = self._size
+        end = start + len(trades)
+        self._ensure_capacity(end)
+        for index, one_trade in enumerate(trades, start):
+            self._origin_ids[index] = self._get_port_id(one_trade.origin_port)
+            self._destination_ids[index] = self._get_port_id(one_trade.destination_port)
+            self._amounts[index] = one_trade.amount
+            self._cargo_type_codes[index] = self._get_cargo_type_code(one_trade.cargo_type)
+            self._times[index] = one_trade.time
+            self._probabilities[index] = one_trade.probability
+            self._statuses[index] = one_trade.status.value
+            time_window = getattr(one_trade, "time_window", [None, None, None, None])
+            self._time_windows[index] = [np.nan if t is None else t for t in time_window]
+            self._trades[index] = one_trade
+        self._size = end
+        return np.arange(start, end)
+
+    def get_trade(self, index):
+        """
+        Get a trade. The trade is created on the first request.
+
+        :param index: The index of the trade.
+        :type index: int
+        :return: The trade.
+        :rtype: TimeWindowTrade
+        """
+        index = int(index)
+        one_trade = self._trades.get(index)
+        if one_trade is None:
+            if not 0 <= index < self._size:
+                raise IndexError(f"Trade index {index} out of range.")
+            time_window = [None if np.isnan(t) else t for t in self._time_windows[index].tolist()]
+            one_trade = TimeWindowTrade(
+                origin_port=self._ports[self._origin_ids[index]],
+                destination_port=self._ports[self._destination_ids[index]],
+                amount=self._amounts[index].item(),
+                cargo_type=self._cargo_types[self._cargo_type_codes[index]],
+                time=self._times[index].item(),
+                probability=self._probabilities[index].item(),
+                status=TradeStatus(self._statuses[index].item()),
+                time_window=time_window)
+            self._trades[index] = one_trade
+        return one_trade
+
+    def get_trades(self, indices):
+        """
+        :param indices: The indices of the trades.
+        :type indices: Iterable[int]
+        :return: The trades.
+        :rtype: List[TimeWindowTrade]
+        """
+        return [self.get_trade(index) for index in indices]
+
+    def set_status(self, indices, status):
+        """
+        Set the status of several trades.
+
+        :param indices: The indices of the trades or a boolean mask over all trades.
+        :type indices: np.ndarray
+        :param status: The status.
+        :type status: TradeStatus
+        """
+        indices = np.asarray(indices)
+        if indices.dtype == bool:
+            indices = np.flatnonzero(indices)
+        self._statuses[indices] = status.value
+        for index in np.atleast_1d(indices).tolist():
+            one_trade = self._trades.get(index)
+            if one_trade is not None:
+                one_trade.status = status
+
+
 class StaticShipping(Shipping):
     """
     A shipping unit that simply takes a list of trades.
@@ -335,7 +660,7 @@ class Contract(JsonAble):
     def to_json(self):
         # noinspection PyTypeChecker
         # Contract is an attrs instance.
-        return attrs.asdict(self)
+        return attrs.asdict(self, filter=_is_exported)
 
 
 class AuctionLedger:
@@ -418,7 +743,7 @@ class AuctionMarket(Market, SimulationEngineAware):
         return all_trades.index(trade)
 
     @staticmethod
-    def inform_future_trades(trades, time, shipping_companies, timeout=60):
+    def inform_future_trades(trades, time, shipping_companies, timeout=60, resource_monitor=None):
         """
         Informs the shipping companies of upcoming trades.
 
@@ -429,13 +754,15 @@ class AuctionMarket(Market, SimulationEngineAware):
         :type shipping_companies: List[ShippingCompany]
         :param timeout: The time to give every company to process the trade information. Default is 60 seconds.
         :type timeout: int
+        :param resource_monitor: A monitor to meter the companies' resource usage. Default is None.
+        :type resource_monitor: AgentResourceMonitor | None
         """
         for current_company in shipping_companies:
             asyncio.run(AuctionMarket._company_pre_inform_timeout(
-                current_company, trades, time, timeout=timeout))
+                current_company, trades, time, timeout=timeout, resource_monitor=resource_monitor))
 
     @staticmethod
-    def distribute_trades(time, trades, shipping_companies, timeout=60):
+    def distribute_trades(time, trades, shipping_companies, timeout=60, resource_monitor=None):
         """
         Distribute trades on a second price auction basis. The shipping companies are
         informed (ShippingCompany.receive) of the trades they get allocated via Contracts. All allocations
@@ -449,6 +776,8 @@ class AuctionMarket(Market, SimulationEngineAware):
         :type shipping_companies: list[TradingCompany]
         :param timeout: The time to give every company to process the trade information. Default is 60 seconds.
         :type timeout: int
+        :param resource_monitor: A monitor to meter the companies' resource usage. Default is None.
+        :type resource_monitor: AgentResourceMonitor | None
         :return: All allocated traded per company.
         :rtype: AuctionLedger
         """
@@ -456,7 +785,7 @@ class AuctionMarket(Market, SimulationEngineAware):
         ledger = AuctionLedger(shipping_companies)
         for current_company in shipping_companies:
             company_bids = asyncio.run(AuctionMarket._company_inform_timeout(
-                current_company, trades, timeout=timeout))
+                current_company, trades, timeout=timeout, resource_monitor=resource_monitor))
             for one_bid in company_bids:
                 one_bid.company = current_company
                 all_bids_per_trade[AuctionMarket._get_trade_index(one_bid.trade, trades)].append(one_bid)
@@ -474,11 +803,14 @@ class AuctionMarket(Market, SimulationEngineAware):
         return ledger
 
     @staticmethod
-    async def _company_inform_timeout(company, trades, timeout=60):
+    async def _company_inform_timeout(company, trades, timeout=60, resource_monitor=None):
         company_bids = []
+        inform = get_company_operation(company, "inform", resource_monitor)
+        if inform is None:
+            return company_bids
         try:
             company_bids = await asyncio.wait_for(
-                asyncio.to_thread(company.inform, trades[:]),
+                asyncio.to_thread(inform, trades[:]),
                 timeout=timeout
             )
         except asyncio.TimeoutError:
@@ -488,11 +820,14 @@ class AuctionMarket(Market, SimulationEngineAware):
         return company_bids
 
     @staticmethod
-    async def _company_pre_inform_timeout(company, trades, time, timeout=60):
+    async def _company_pre_inform_timeout(company, trades, time, timeout=60, resource_monitor=None):
         company_bids = []
+        pre_inform = get_company_operation(company, "pre_inform", resource_monitor)
+        if pre_inform is None:
+            return company_bids
         try:
             await asyncio.wait_for(
-                asyncio.to_thread(company.pre_inform, trades, time),
+                asyncio.to_thread(pre_inform, trades, time),
                 timeout=timeout
             )
         except asyncio.TimeoutError:
@@ -4,6 +4,10 @@ Classes and functions for the environment in which the simulation takes place.
 
 from typing import TYPE_CHECKING
 
+import numpy as np
+
+from mable.random_streams import RandomStreams
+
 if TYPE_CHECKING:
     from event_management import EventQueue
     from mable.engine import SimulationEngine
@@ -37,19 +41,28 @@ class World(SimulationEngineAware):
     Also keeps track of the current time.
     """
 
-    def __init__(self, network, event_queue, random):
+    def __init__(self, network, event_queue, random, seed_sequence=None):
         """
         :param network: The space/network of operation.
         :type network: ShippingNetwork
         :param event_queue: The event queue.
         :type event_queue: EventQueue
         :param random: A random to use wherever randomness is needed.
+        :param seed_sequence: The root seed sequence of the subsystems' random streams (see :py:attr:`random_streams`).
+            Default, i.e. None, derives the seed sequence from the state of the random or uses 0 without a random.
+        :type seed_sequence: np.random.SeedSequence | None
         """
         super().__init__()
         self._event_queue = event_queue
         self._current_time = 0
         self._network = network
         self._random = random
+        if seed_sequence is None:
+            entropy = 0
+            if random is not None:
+                entropy = random.get_state()[1]
+            seed_sequence = np.random.SeedSequence(entropy)
+        self._random_streams = RandomStreams(seed_sequence)
 
     @property
     def network(self):
@@ -66,6 +79,14 @@ class World(SimulationEngineAware):
         """
         return self._random
 
+    @property
+    def random_streams(self):
+        """
+        :return: The independent random streams of the simulation's subsystems, e.g. the trade generation.
+        :rtype: RandomStreams
+        """
+        return self._random_streams
+
     @property
     def event_queue(self):
         """
@@ -105,6 +126,15 @@ class World(SimulationEngineAware):
         """
         return self._current_time
 
+    def set_current_time(self, current_time):
+        """
+        Set the current time, e.g. when a checkpoint is restored.
+
+        :param current_time: The time.
+        :type current_time: float
+        """
+        self._current_time = current_time
+
     def set_engine(self, engine):
         """
         Make the simulation engine know to the world and the event queue.
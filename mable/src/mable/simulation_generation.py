@@ -121,10 +121,32 @@ class SimulationBuilder:
                                                          self._random)
         return self
 
+    @property
+    def network(self):
+        """
+        :return: The network or None if it has not been generated yet.
+        :rtype: ShippingNetwork | None
+        """
+        return self._network
+
+    def set_network(self, network):
+        """
+        Use an already generated network instead of generating one from the specifications, e.g. to share one network
+        between several simulations. The network must not change during a simulation.
+
+        :param network: The network.
+        :type network: ShippingNetwork
+        :return:
+            self
+        """
+        self._network = network
+        return self
+
     def generate_network(self, *args, **kwargs):
         """
         Generates the network (space) including the ports based on the specification information and the class factory's
         :py:func:`ClassFactory.generate_network` and :py:func:`ClassFactory.generate_port`, respectively.
+        If a network was set via :py:func:`set_network`, that network is used.
         :param args:
             Positional args.
             (Most likely no arguments since the args from the specifications are used. But can be used for further
@@ -136,17 +158,18 @@ class SimulationBuilder:
         :return:
             self
         """
-        args, kwargs = self._specifications.get(instructions.NETWORK_KEY)
-        ports_args = kwargs[instructions.PORTS_LIST_KEY]
-        ports = []
-        for one_ports_args in ports_args:
-            if isinstance(one_ports_args, dict):
-                one_port = self._class_factory.generate_port(**one_ports_args)
-            else:
-                one_port = one_ports_args
-            ports.append(one_port)
-        kwargs[instructions.PORTS_LIST_KEY] = ports
-        self._network = self._class_factory.generate_network(*args, **kwargs)
+        if self._network is None:
+            args, kwargs = self._specifications.get(instructions.NETWORK_KEY)
+            ports_args = kwargs[instructions.PORTS_LIST_KEY]
+            ports = []
+            for one_ports_args in ports_args:
+                if isinstance(one_ports_args, dict):
+                    one_port = self._class_factory.generate_port(**one_ports_args)
+                else:
+                    one_port = one_ports_args
+                ports.append(one_port)
+            kwargs[instructions.PORTS_LIST_KEY] = ports
+            self._network = self._class_factory.generate_network(*args, **kwargs)
         return self
 
     def generate_shipping_companies(self, *args, **kwargs):
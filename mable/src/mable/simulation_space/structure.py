@@ -37,6 +37,30 @@ class ShippingNetwork(SimulationEngineAware):
         """
         pass
 
+    def get_distances(self, locations_one, locations_two):
+        """
+        Returns the distances between two sequences of locations, i.e. the distance between the first
+        location of the first sequence and the first location of the second sequence and so on.
+
+        By default, this determines each distance via :py:func:`get_distance`.
+
+        :param locations_one: The first locations.
+        :type locations_one: List[Location | Port | str]
+        :param locations_two: The second locations.
+        :type locations_two: List[Location | Port | str]
+        :return: The distances.
+        :rtype: np.ndarray
+        :raises ValueError: If the two sequences have different lengths.
+        """
+        if len(locations_one) != len(locations_two):
+            raise ValueError(
+                f"Number of locations differ: {len(locations_one)} and {len(locations_two)}.")
+        distances = np.array(
+            [self.get_distance(one_location, other_location)
+             for one_location, other_location in zip(locations_one, locations_two)],
+            dtype=float)
+        return distances
+
     @abstractmethod
     def get_port(self, name):
         """
@@ -102,6 +126,9 @@ class ShippingNetwork(SimulationEngineAware):
 class NetworkWithPortDict(ShippingNetwork, ABC):
     """
     A space of operation that stores the ports in form of a dictionary.
+
+    On construction each port is interned with a dense integer id, i.e. the ports' index in :py:attr:`ports`,
+    which allows to index caches by id rather than by port name.
     """
 
     def __init__(self, ports=None):
@@ -110,6 +137,9 @@ class NetworkWithPortDict(ShippingNetwork, ABC):
         self._ports = {}
         if ports is not None:
             self._ports = ports
+        self._ports_by_id = list(self._ports.values())
+        for port_id, one_port in enumerate(self._ports_by_id):
+            one_port.port_id = port_id
 
     @staticmethod
     def _create_port_dict(ports):
@@ -131,7 +161,43 @@ class NetworkWithPortDict(ShippingNetwork, ABC):
 
     @property
     def ports(self):
-        return list(self._ports.values())
+        return list(self._ports_by_id)
+
+    def get_port_id(self, location):
+        """
+        Returns the id of a port of the network.
+
+        :param location: A port, a location or the name of a port.
+        :type location: Port | Location | str
+        :return: The id of the port or None if the location is not one of the network's ports.
+        :rtype: int | None
+        """
+        port_id = None
+        if isinstance(location, Port):
+            port_id = location.port_id
+            if port_id is not None and (port_id >= len(self._ports_by_id) or self._ports_by_id[port_id] is not location):
+                port_id = None
+        if port_id is None:
+            if isinstance(location, Location):
+                port = self._ports.get(location.name)
+                if port is not None and port == location:
+                    port_id = port.port_id
+            elif isinstance(location, str):
+                port = self._ports.get(location)
+                if port is not None:
+                    port_id = port.port_id
+        return port_id
+
+    def get_port_by_id(self, port_id):
+        """
+        Returns the port with the id.
+
+        :param port_id: The id of the port.
+        :type port_id: int
+        :return: The port instance.
+        :rtype: Port
+        """
+        return self._ports_by_id[port_id]
 
     def get_port(self, name):
         """
@@ -164,6 +230,9 @@ class NetworkWithPortDict(ShippingNetwork, ABC):
 class UnitShippingNetwork(NetworkWithPortDict):
     """
     A space of operation in the [0,1]^2 Euclidian space.
+
+    The distances between all ports are calculated once on construction and kept in a matrix so that
+    distance queries between ports are lookups.
     """
 
     def __init__(self, ports=None):
@@ -173,6 +242,46 @@ class UnitShippingNetwork(NetworkWithPortDict):
             The collection of ports.
         """
         super().__init__(ports)
+        self._distance_matrix = np.zeros((0, 0))
+        self._build_distance_matrix()
+
+    def _build_distance_matrix(self):
+        """
+        Calculates the pairwise distances between all ports of the network.
+        Ports outside of [0,1]^2 have a distance of float('inf') to all ports.
+        """
+        all_ports = self.ports
+        coordinates = np.array([[one_port.x, one_port.y] for one_port in all_ports], dtype=float).reshape(-1, 2)
+        differences = coordinates[:, np.newaxis, :] - coordinates[np.newaxis, :, :]
+        distance_matrix = np.hypot(differences[:, :, 0], differences[:, :, 1])
+        in_bounds = np.all((coordinates >= 0) & (coordinates <= 1), axis=1)
+        distance_matrix[~in_bounds, :] = math.inf
+        distance_matrix[:, ~in_bounds] = math.inf
+        self._distance_matrix = distance_matrix
+
+    @property
+    def distance_matrix(self):
+        """
+        The pairwise distances between all ports indexed by the ports' ids.
+
+        :return: The distance matrix.
+        :rtype: np.ndarray
+        """
+        return self._distance_matrix
+
+    def _to_location(self, location):
+        if not isinstance(location, Location):
+            location = self.get_port(location)
+        return location
+
+    @staticmethod
+    def _get_euclidean_distance(location_one, location_two):
+        x_one, y_one = location_one.x, location_one.y
+        x_two, y_two = location_two.x, location_two.y
+        distance = math.inf
+        if 0 <= x_one <= 1 and 0 <= y_one <= 1 and 0 <= x_two <= 1 and 0 <= y_two <= 1:
+            distance = math.hypot(x_one - x_two, y_one - y_two)
+        return distance
 
     def get_distance(self, location_one, location_two):
         """
@@ -184,17 +293,46 @@ class UnitShippingNetwork(NetworkWithPortDict):
         :return: float
             The Euclidean distance. If the location are outside of [0,1]^2 float('inf') is returned.
         """
-        if not isinstance(location_one, Location):
-            location_one = self.get_port(location_one)
-        if not isinstance(location_two, Location):
-            location_two = self.get_port(location_two)
-        distance = math.inf
-        if all(0 <= coord <= 1 for coord in [location_one.x, location_one.y, location_two.x, location_two.y]):
-            x_diff_square = (location_one.x - location_two.x)**2
-            y_diff_square = (location_one.y - location_two.y)**2
-            distance = np.sqrt(x_diff_square + y_diff_square)
+        index_one = self.get_port_id(location_one)
+        index_two = self.get_port_id(location_two)
+        if index_one is not None and index_two is not None:
+            distance = float(self._distance_matrix[index_one, index_two])
+        else:
+            distance = self._get_euclidean_distance(self._to_location(location_one), self._to_location(location_two))
         return distance
 
+    def get_distances(self, locations_one, locations_two):
+        """
+        Returns the Euclidean distances between two sequences of locations, i.e. the distance between the first
+        location of the first sequence and the first location of the second sequence and so on.
+
+        :param locations_one: The first locations.
+        :type locations_one: List[Location | Port | str]
+        :param locations_two: The second locations.
+        :type locations_two: List[Location | Port | str]
+        :return: The distances. Locations outside of [0,1]^2 have a distance of float('inf').
+        :rtype: np.ndarray
+        :raises ValueError: If the two sequences have different lengths.
+        """
+        if len(locations_one) != len(locations_two):
+            raise ValueError(
+                f"Number of locations differ: {len(locations_one)} and {len(locations_two)}.")
+        indices_one = [self.get_port_id(one_location) for one_location in locations_one]
+        indices_two = [self.get_port_id(one_location) for one_location in locations_two]
+        if all(idx is not None for idx in indices_one) and all(idx is not None for idx in indices_two):
+            distances = self._distance_matrix[indices_one, indices_two]
+        else:
+            coordinates_one = np.array(
+                [[loc.x, loc.y] for loc in map(self._to_location, locations_one)], dtype=float).reshape(-1, 2)
+            coordinates_two = np.array(
+                [[loc.x, loc.y] for loc in map(self._to_location, locations_two)], dtype=float).reshape(-1, 2)
+            differences = coordinates_one - coordinates_two
+            distances = np.hypot(differences[:, 0], differences[:, 1])
+            in_bounds = (np.all((coordinates_one >= 0) & (coordinates_one <= 1), axis=1)
+                         & np.all((coordinates_two >= 0) & (coordinates_two <= 1), axis=1))
+            distances[~in_bounds] = math.inf
+        return distances
+
     def get_journey_location(self, journey, vessel, current_time):
         """
         Returns the current position of the vessel based on the journey information and the current time.
@@ -209,16 +347,18 @@ class UnitShippingNetwork(NetworkWithPortDict):
         :return: Location
             The current location the vessel is in or one of the endpoints.
         """
-        distance = self.get_distance(journey.origin, journey.destination)
+        origin = self._to_location(journey.origin)
+        destination = self._to_location(journey.destination)
+        distance = self.get_distance(origin, destination)
         travel_time = vessel.get_travel_time(distance)
         end_time = journey.start_time + travel_time
-        if journey.start_time < current_time:
-            location = journey.origin
-        elif end_time >= current_time:
-            location = journey.destination
+        if current_time <= journey.start_time:
+            location = origin
+        elif current_time >= end_time:
+            location = destination
         else:
-            percentage = current_time - journey.start_time/travel_time
-            location_x = journey.origin.x + (journey.origin.x - journey.destination.x) * percentage
-            location_y = journey.origin.y + (journey.origin.y - journey.destination.y) * percentage
+            percentage = (current_time - journey.start_time) / travel_time
+            location_x = origin.x + (destination.x - origin.x) * percentage
+            location_y = origin.y + (destination.y - origin.y) * percentage
             location = Location(location_x, location_y)
         return location
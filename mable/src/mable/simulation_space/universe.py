@@ -6,8 +6,12 @@ from mable.util import JsonAble
 class Location:
     """
     A location in the operational space.
+
+    Locations are immutable. The hash is calculated once on construction.
     """
 
+    __slots__ = ("_x", "_y", "_name", "_hash")
+
     def __init__(self, x, y, name=None):
         """
         :param x: The x coordinate of the location.
@@ -21,6 +25,7 @@ class Location:
         self._x = x
         self._y = y
         self._name = name
+        self._hash = hash((name, x, y))
 
     @property
     def x(self):
@@ -39,24 +44,45 @@ class Location:
         return str_repr
 
     def __eq__(self, other):
+        if self is other:
+            return True
         are_equal = False
         if isinstance(other, Location):
             if (
-                    self.name == other.name
-                    and self.x == other.x
-                    and self.y == other.y):
+                    self._hash == other._hash
+                    and self._name == other._name
+                    and self._x == other._x
+                    and self._y == other._y):
                 are_equal = True
         return are_equal
 
     def __hash__(self):
-        return hash((self.name, self._x, self._y))
+        return self._hash
+
+    def __getstate__(self):
+        state = {}
+        for one_class in type(self).__mro__:
+            for one_slot in getattr(one_class, "__slots__", ()):
+                if one_slot != "_hash" and hasattr(self, one_slot):
+                    state[one_slot] = getattr(self, one_slot)
+        return state
+
+    def __setstate__(self, state):
+        # The hash is recalculated since string hashes differ between interpreter processes.
+        for one_slot, value in state.items():
+            setattr(self, one_slot, value)
+        self._hash = hash((self._name, self._x, self._y))
 
 
 class Port(Location, JsonAble):
     """
     A port, i.e. a location in the operational space at which cargo gets exchanged.
+
+    A network assigns each of its ports a dense integer id (see :py:attr:`port_id`) on construction.
     """
 
+    __slots__ = ("_port_id",)
+
     def __init__(self, name, x, y):
         """
         :param name: The name of the port.
@@ -67,13 +93,28 @@ class Port(Location, JsonAble):
         :type y: float
         """
         super().__init__(x, y, name)
+        self._port_id = None
+
+    @property
+    def port_id(self):
+        """
+        The id of the port within the network that contains the port.
+
+        :return: The id or None if the port is not part of a network.
+        :rtype: int | None
+        """
+        return self._port_id
+
+    @port_id.setter
+    def port_id(self, port_id):
+        self._port_id = port_id
 
     def __repr__(self):
         str_repr = f"Port<{self.name} ({self.x}, {self.y})>"
         return str_repr
 
     def to_json(self):
-        return self.__dict__
+        return {"_x": self._x, "_y": self._y, "_name": self._name}
 
 
 @attrs.define(repr=False)
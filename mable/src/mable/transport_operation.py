@@ -4,6 +4,7 @@ Classes for shipping companies.
 
 from abc import abstractmethod
 import copy
+import uuid
 from dataclasses import dataclass
 from typing import Hashable, List, Dict, TYPE_CHECKING, TypeVar, Generic
 
@@ -14,6 +15,7 @@ from loguru import logger
 from mable.simulation_de_serialisation import DataSchema, DataClass, DynamicNestedField
 from mable.shipping_market import Trade
 from mable.transportation_scheduling import Schedule
+from mable.journey_log import JourneyLog
 from mable.simulation_environment import SimulationEngineAware
 from mable.util import JsonAble
 from mable.simulation_space.universe import OnJourney
@@ -258,9 +260,10 @@ class Vessel(SimulationEngineAware):
         self._location = location
         self._schedule = Schedule(self, 0)
         self._keep_journey_log = keep_journey_log
-        self._journey_log = []
+        self._journey_log = JourneyLog()
         self._name = name
         self._company = company
+        self._identifier = uuid.uuid4()
 
     @attrs.define
     class Data(DataClass):
@@ -407,9 +410,11 @@ class Vessel(SimulationEngineAware):
     @property
     def journey_log(self):
         """
-        The current log of events pertaining the vessel.
+        The current log of events pertaining the vessel. The log holds compact records of the events rather than
+        the events themselves. Use :py:func:`JourneyLog.set_spill` to move long logs into a memory-mapped file.
 
-        :return: [VesselEvent]
+        :return: The journey log.
+        :rtype: JourneyLog
         """
         return self._journey_log
 
@@ -423,7 +428,7 @@ class Vessel(SimulationEngineAware):
         :type log_entry: VesselEvent
         """
         if self._keep_journey_log:
-            self._journey_log.append(log_entry)
+            self._journey_log.log_event(log_entry, self._engine)
 
     @schedule.setter
     def schedule(self, new_schedule):
@@ -494,6 +499,14 @@ class Vessel(SimulationEngineAware):
         """
         return self._name
 
+    @property
+    def identifier(self):
+        """
+        :return: An identifier that is unique to the vessel, unlike the name, and is kept by copies of the vessel.
+        :rtype: uuid.UUID
+        """
+        return self._identifier
+
     @abstractmethod
     def get_travel_time(self, distance, *args, **kwargs):
         """
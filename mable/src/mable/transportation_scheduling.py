@@ -4,6 +4,7 @@ Shipping operation
 
 from __future__ import annotations
 
+from collections import OrderedDict
 from enum import IntEnum
 import math
 from itertools import product
@@ -16,6 +17,7 @@ import numpy as np
 from mable.shipping_market import TimeWindowTrade
 from mable.simulation_environment import SimulationEngineAware
 from mable.event_management import IdleEvent, TravelEvent
+from mable.instrumentation import CACHE_CATEGORY
 
 if TYPE_CHECKING:
     from mable.transport_operation import Vessel
@@ -51,6 +53,77 @@ class CurrentState:
     is_valid: bool = True
 
 
+class ScheduleVerificationCache:
+    """
+    A bounded least recently used cache of the schedules' verification results and completion times keyed by the
+    schedules' signatures (see :py:func:`Schedule.get_signature`). One cache is shared by all schedules of a
+    simulation, i.e. of the companies and of the engine, and is emptied whenever the simulation's time advances.
+    """
+
+    def __init__(self, max_size=10_000):
+        """
+        :param max_size: The maximal number of kept results. The least recently used results are dropped first.
+        :type max_size: int
+        """
+        super().__init__()
+        self._max_size = max_size
+        self._time = None
+        self._results = OrderedDict()
+
+    @property
+    def max_size(self):
+        """
+        :return: The maximal number of kept results.
+        :rtype: int
+        """
+        return self._max_size
+
+    def __len__(self):
+        return len(self._results)
+
+    def clear(self):
+        """
+        Drop all results.
+        """
+        self._results.clear()
+
+    def get(self, name, key, current_time, compute, profiler=None):
+        """
+        The result of a computation for a key. The result is computed and kept if it is not in the cache.
+
+        :param name: The name of the computation, e.g. 'verify_schedule_time'.
+        :type name: str
+        :param key: The key, e.g. the schedule's signature.
+        :type key: Hashable
+        :param current_time: The current time of the simulation. All results are dropped if the time differs from
+            the time of the previous request.
+        :type current_time: float
+        :param compute: Computes the result.
+        :type compute: Callable[[], Any]
+        :param profiler: If not None, the hit or miss is counted by the profiler under :py:const:`CACHE_CATEGORY`
+            and the name.
+        :type profiler: Profiler | None
+        :return: The result.
+        :rtype: Any
+        """
+        if current_time != self._time:
+            self._results.clear()
+            self._time = current_time
+        cache_key = (name, key)
+        is_hit = cache_key in self._results
+        if is_hit:
+            self._results.move_to_end(cache_key)
+            result = self._results[cache_key]
+        else:
+            result = compute()
+            self._results[cache_key] = result
+            if len(self._results) > self._max_size:
+                self._results.popitem(last=False)
+        if profiler is not None:
+            profiler.add_counts(name, CACHE_CATEGORY, hits=int(is_hit), misses=int(not is_hit))
+        return result
+
+
 class Schedule(SimulationEngineAware):
     """
     The schedule of a vessel.
@@ -76,6 +149,8 @@ class Schedule(SimulationEngineAware):
         self._creation_time = creation_time
         self._next_event = None
         self._last_event = None
+        # The schedule's signature (see get_signature).
+        self._signature = None
 
     @classmethod
     def init_with_engine(cls, vessel, current_time, engine):
@@ -100,6 +175,7 @@ class Schedule(SimulationEngineAware):
             self._vessel, current_time=self._time_schedule_head, creation_time=self._creation_time,
             schedule=self._stn.copy())
         copy_with_copy_stn.set_engine(self._engine)
+        copy_with_copy_stn._signature = self._signature
         return copy_with_copy_stn
 
     def _shift_task_push(self, location, is_right_direction=True):
@@ -273,6 +349,7 @@ class Schedule(SimulationEngineAware):
             location.
         :return:
         """
+        self._signature = None
         if not isinstance(trade, TimeWindowTrade):
             trade = TimeWindowTrade(origin_port=trade.origin_port,
                                     destination_port=trade.destination_port,
@@ -369,13 +446,61 @@ class Schedule(SimulationEngineAware):
         self._add_relocation_task(index_in_schedule)
 
 
+    def get_signature(self):
+        """
+        The canonical signature of the schedule. Schedules with the same signature have the same timing, i.e. the
+        same time verification and completion time, and, given the same cargo hold, the same cargo verification.
+
+        The signature consists of the vessel's identifier (see :py:func:`Vessel.identifier`), the schedule's head and creation time and per task in the order of
+        the schedule the task's node, the location type, the key of the trade (see :py:func:`Trade.key`) and the
+        earliest start. The earliest start of the first task includes the travel from the vessel's start location.
+
+        :return: The signature.
+        :rtype: Tuple
+        """
+        if self._signature is None:
+            tasks = []
+            for one_node in self._get_task_nodes():
+                node_data = self._stn.nodes[one_node]
+                tasks.append((one_node, node_data["location_type"], node_data["trade"].key,
+                              self._stn[one_node][0]["weight"]))
+            self._signature = (self._vessel.identifier, self._time_schedule_head, self._creation_time, tuple(tasks))
+        return self._signature
+
+    def _get_cached(self, name, key, compute):
+        """
+        The result of a computation from the engine's cache (see :py:class:`ScheduleVerificationCache`).
+        The result is computed directly if the engine has no cache.
+
+        :param name: The name of the computation.
+        :type name: str
+        :param key: The key.
+        :type key: Hashable
+        :param compute: Computes the result.
+        :type compute: Callable[[], Any]
+        :return: The result.
+        :rtype: Any
+        """
+        cache = getattr(self._engine, "schedule_verification_cache", None)
+        if isinstance(cache, ScheduleVerificationCache):
+            result = cache.get(
+                name, key, self._engine.world.current_time, compute, getattr(self._engine, "profiler", None))
+        else:
+            result = compute()
+        return result
+
     def completion_time(self):
         """
         Determine the time when the schedule completes.
 
+        The result is cached per signature (see :py:func:`get_signature`).
+
         :return: The completion time.
         :rtype: float
         """
+        return self._get_cached("completion_time", self.get_signature(), self._calculate_completion_time)
+
+    def _calculate_completion_time(self):
         completion_time = 0
         start_compensator = 0
         finish_compensator = 0
@@ -438,9 +563,14 @@ class Schedule(SimulationEngineAware):
         """
         Verifies that the schedule's timing is possible. A schedule is valid is it has no negative cycles.
 
+        The result is cached per signature (see :py:func:`get_signature`).
+
         :return: True is the schedule is valid, False otherwise.
         :rtype: bool
         """
+        return self._get_cached("verify_schedule_time", self.get_signature(), self._verify_schedule_time)
+
+    def _verify_schedule_time(self):
         # TODO Going through all cycles seems like a bad idea but negative_edge_cycle seems to not work reliably.
         # At least sometimes it is False despite there being a negative cycle
         # has_negative_cycle = nx.negative_edge_cycle(self._stn)
@@ -462,9 +592,16 @@ class Schedule(SimulationEngineAware):
         Verifies that the schedule's cargo loading and unloading is possible.
         The verification is done via simulating all loading and unloading events.
 
+        The result is cached per signature (see :py:func:`get_signature`) and current load of the vessel.
+
         :return: True is the schedule is valid, False otherwise.
         :rtype: bool
         """
+        vessel_loads = tuple(self._vessel.current_load(t) for t in self._vessel.loadable_cargo_types())
+        return self._get_cached(
+            "verify_schedule_cargo", (self.get_signature(), vessel_loads), self._verify_schedule_cargo)
+
+    def _verify_schedule_cargo(self):
         current_cargo_hold = self._vessel.copy_hold()
         i = 1
         valid_schedule = True
@@ -488,11 +625,13 @@ class Schedule(SimulationEngineAware):
         Verify that a schedule can be completed in time and without over-/under-loading the cargo hold.
         This is convenience function that combines :func:`verify_schedule_time` and :func:`verify_schedule_cargo`.
 
+        Both verifications are cached, i.e. verifying a schedule with the same signature again at the same time,
+        e.g. the schedule a company verified when it proposed the schedule, reuses the results.
+
         :return: True if the timing and the cargo load are valid over all tasks and associated trades. Otherwise, False.
         :rtype: bool
         """
-        valid_schedule = self.verify_schedule_time() and self.verify_schedule_cargo()
-        return valid_schedule
+        return self.verify_schedule_time() and self.verify_schedule_cargo()
 
     def get_insertion_points(self):
         """
@@ -720,6 +859,7 @@ class Schedule(SimulationEngineAware):
         event = self.next()
         self._last_event = event
         self._next_event = None
+        self._signature = None
         no_node_shift_events = [IdleEvent, TravelEvent]
         next_event_is_no_shift_event = any(isinstance(event, one_no_shift_event_type)
                                            for one_no_shift_event_type in no_node_shift_events)
@@ -16,6 +16,8 @@ class JsonAble:
     Ensures that a class is transformable into a json. On default that means an objects __dict__ is json dumped.
     """
 
+    __slots__ = ()
+
     def __init__(self):
         super().__init__()
 
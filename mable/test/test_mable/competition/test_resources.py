@@ -0,0 +1,96 @@
+"""
+Tests for the resources module.
+"""
+import threading
+import tracemalloc
+
+from mable.competition.resources import AgentResourceMonitor, get_company_operation
+from mable.shipping_market import AuctionMarket, TimeWindowTrade
+from mable.transport_operation import Bid
+
+
+class BusyCompany:
+
+    def __init__(self, name, bid_amount, allocation_size=0, work=200_000):
+        self.name = name
+        self._bid_amount = bid_amount
+        self._allocation_size = allocation_size
+        self._work = work
+
+    def inform(self, trades, *args, **kwargs):
+        allocation = bytearray(self._allocation_size)
+        total = 0
+        for i in range(self._work):
+            total += i
+        return [Bid(trade=one_trade, amount=self._bid_amount) for one_trade in trades]
+
+
+class BlockedCompany:
+
+    def __init__(self, name):
+        self.name = name
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def inform(self, trades, *args, **kwargs):
+        self.started.set()
+        self.release.wait()
+        return []
+
+
+class TestAgentResourceMonitor:
+
+    def test_metering(self):
+        company = BusyCompany("A", 1, allocation_size=5_000_000)
+        monitor = AgentResourceMonitor(track_memory=True)
+        bids = monitor.metered(company, "inform")([])
+        assert bids == []
+        usage = monitor.get_usage(company)
+        assert len(usage.calls) == 1
+        assert usage.calls[0].operation == "inform"
+        assert usage.cpu_time > 0
+        assert usage.peak_memory >= 5_000_000
+        assert not usage.exceeded_budget
+        assert not tracemalloc.is_tracing()
+        json_usage = monitor.to_json()
+        assert json_usage["A"]["number_of_calls"] == 1
+        assert json_usage["A"]["calls"][0]["peak_memory"] == usage.peak_memory
+
+    def test_no_memory_tracking(self):
+        company = BusyCompany("A", 1)
+        monitor = AgentResourceMonitor()
+        monitor.metered(company, "inform")([])
+        assert monitor.get_usage(company).calls[0].peak_memory is None
+        assert get_company_operation(company, "inform") == company.inform
+
+    def test_no_memory_attribution_while_other_call_runs(self):
+        timed_out_company = BlockedCompany("A")
+        company = BusyCompany("B", 1, allocation_size=5_000_000)
+        monitor = AgentResourceMonitor(track_memory=True)
+        timed_out_thread = threading.Thread(target=monitor.metered(timed_out_company, "inform"), args=([],))
+        timed_out_thread.start()
+        timed_out_company.started.wait()
+        monitor.metered(company, "inform")([])
+        timed_out_company.release.set()
+        timed_out_thread.join()
+        monitor.metered(company, "inform")([])
+        assert monitor.get_usage(timed_out_company).calls[0].peak_memory is None
+        assert [c.peak_memory is None for c in monitor.get_usage(company).calls] == [True, False]
+        assert monitor.get_usage(company).peak_memory >= 5_000_000
+        assert not tracemalloc.is_tracing()
+
+    def test_cpu_time_budget(self):
+        trade = TimeWindowTrade(origin_port="A", destination_port="B", amount=1, cargo_type="Oil", time=0)
+        cheap_bidder = BusyCompany("1", 5, work=2_000_000)
+        expensive_bidder = BusyCompany("2", 10, work=0)
+        monitor = AgentResourceMonitor(cpu_time_budget=0.01)
+        ledger = AuctionMarket.distribute_trades(
+            0, [trade], [cheap_bidder, expensive_bidder], resource_monitor=monitor)
+        assert len(ledger[cheap_bidder]) == 1
+        assert monitor.is_over_budget(cheap_bidder)
+        ledger = AuctionMarket.distribute_trades(
+            0, [trade], [cheap_bidder, expensive_bidder], resource_monitor=monitor)
+        assert len(ledger[cheap_bidder]) == 0
+        assert len(ledger[expensive_bidder]) == 1
+        assert len(monitor.get_usage(cheap_bidder).calls) == 1
+        assert get_company_operation(cheap_bidder, "inform", monitor) is None
@@ -0,0 +1,71 @@
+"""
+Tests for the sandbox module.
+"""
+import pytest
+
+from mable.cargo_bidding import TradingCompany
+from mable.competition.sandbox import ContinuationSummary
+
+
+class ForesightCompany(TradingCompany):
+
+    def __init__(self, fleet, name):
+        super().__init__(fleet, name)
+        self.summaries = None
+
+    def inform(self, trades, *args, **kwargs):
+        if self.summaries is None and self.name == "One":
+            self.summaries = self.headquarters.simulate_futures(
+                {}, number_of_continuations=3, number_of_processes=2, seed=1)
+        return super().inform(trades, *args, **kwargs)
+
+
+def summarise_time(engine):
+    return engine.world.current_time
+
+
+def summarise_failing(engine):
+    raise ValueError("Failing summary")
+
+
+class TestSimulateFutures:
+
+    def test_simulation_is_not_affected(self, build_simulation, get_outcome):
+        engine = build_simulation()
+        engine.run()
+        foresight_engine = build_simulation(ForesightCompany)
+        foresight_engine.run()
+        assert get_outcome(foresight_engine) == get_outcome(engine)
+        summaries = foresight_engine.shipping_companies[0].summaries
+        assert len(summaries) == 3
+        assert all(isinstance(s, ContinuationSummary) for s in summaries)
+        assert all(s.end_time == engine.world.current_time for s in summaries)
+        assert set(summaries[0].companies.keys()) == {"One", "Two"}
+        assert summaries[0].companies["One"].number_of_contracts > 0
+
+    def test_seeded_continuations_are_reproducible(self, build_simulation):
+        engine = build_simulation()
+        first_summaries = engine.headquarters.simulate_futures({}, number_of_continuations=2, seed=3)
+        second_summaries = engine.headquarters.simulate_futures({}, number_of_continuations=2, seed=3)
+        assert first_summaries == second_summaries
+        assert engine.world.current_time == 0
+
+    def test_end_time_and_summarise(self, build_simulation):
+        engine = build_simulation()
+        engine._pre_run()
+        summaries = engine.headquarters.simulate_futures(
+            {}, number_of_continuations=1, end_time=1000, summarise=summarise_time)
+        assert 0 < summaries[0] <= 1000
+
+    def test_failed_continuation(self, build_simulation):
+        engine = build_simulation()
+        engine._pre_run()
+        summaries = engine.headquarters.simulate_futures(
+            {}, number_of_continuations=2, summarise=summarise_failing)
+        assert summaries == [None, None]
+
+    def test_no_nesting(self, build_simulation):
+        engine = build_simulation()
+        engine.headquarters.set_sandbox()
+        with pytest.raises(ValueError):
+            engine.headquarters.simulate_futures({})
@@ -0,0 +1,88 @@
+"""
+Fixtures shared by the tests.
+"""
+import numpy as np
+import pytest
+
+from mable.cargo_bidding import TradingCompany
+from mable.competition.generation import AuctionClassFactory, AuctionSimulationEngine
+from mable.event_management import EventQueue
+from mable.extensions.fuel_emissions import VesselWithEngine, VesselEngine, Fuel, ConsumptionRate
+from mable.observers import AuctionMetricsObserver, AuctionOutcomeObserver, TradeDeliveryObserver
+from mable.shipping_market import AuctionMarket, StaticShipping, TimeWindowTrade
+from mable.simulation_environment import World
+from mable.simulation_space.structure import UnitShippingNetwork
+from mable.simulation_space.universe import Port
+from mable.transport_operation import CargoCapacity
+
+
+def _get_vessel(name, location, fuel):
+    propelling_engine = VesselEngine(
+        fuel, 1, ConsumptionRate(base=0.5, speed_power=2, factor=1 / 24),
+        ConsumptionRate(base=0.1, speed_power=2, factor=1 / 24), 2, 3)
+    return VesselWithEngine(
+        [CargoCapacity(cargo_type="Oil", loading_rate=10, capacity=100)], location, 0.01, propelling_engine,
+        name=name)
+
+
+def _build_simulation(company_class=TradingCompany, fleets=None, routes=None):
+    """
+    A small auction simulation with three auctions. By default, of two companies with three vessels.
+
+    :param company_class: The class of the companies.
+    :param fleets: The names of the companies and the names and locations of their vessels.
+    :param routes: The origins and destinations of the trades of each auction.
+    """
+    if fleets is None:
+        fleets = [("One", [("V1", "A"), ("V2", "C")]), ("Two", [("V3", "B")])]
+    if routes is None:
+        routes = [("A", "B"), ("B", "C"), ("C", "A")]
+    network = UnitShippingNetwork([Port("A", 0.1, 0.1), Port("B", 0.5, 0.6), Port("C", 0.9, 0.2)])
+    world = World(network, EventQueue(), np.random.RandomState(0))
+    fuel = Fuel(name="MFO", price=1, energy_coefficient=40, co2_coefficient=3.16)
+    companies = [company_class([_get_vessel(vessel_name, location, fuel) for vessel_name, location in vessels],
+                               company_name)
+                 for company_name, vessels in fleets]
+    shipping = StaticShipping(fixed_trades=[])
+    shipping.add_to_all_trades([
+        TimeWindowTrade(origin_port=network.get_port(origin), destination_port=network.get_port(destination),
+                        amount=50, cargo_type="Oil", time=one_time)
+        for one_time in [720, 1440, 2160]
+        for origin, destination in routes])
+    engine = AuctionSimulationEngine(
+        world, companies, shipping, AuctionMarket(), AuctionClassFactory(), post_run_cmds=[])
+    for one_engine_aware in [world, network, shipping, engine.market] + companies:
+        one_engine_aware.set_engine(engine)
+    for one_company in companies:
+        one_company.headquarters = engine.headquarters
+        for one_vessel in one_company.fleet:
+            one_vessel.set_engine(engine)
+    metrics_observer = AuctionMetricsObserver()
+    metrics_observer.metrics.set_engine(engine)
+    engine.register_event_observer(metrics_observer)
+    engine.register_event_observer(AuctionOutcomeObserver())
+    engine.register_event_observer(TradeDeliveryObserver())
+    return engine
+
+
+def _get_outcome(engine):
+    metrics_observer = next(o for o in engine.get_event_observers() if isinstance(o, AuctionMetricsObserver))
+    contracts = {one_company.name: [(c.trade.origin_port.name, c.trade.time, c.fulfilled) for c in contracts]
+                 for one_company, contracts in engine.market_authority.contracts_per_company.items()}
+    return engine.world.current_time, metrics_observer.metrics.to_json(), contracts
+
+
+@pytest.fixture
+def build_simulation():
+    """
+    Creates a small auction simulation with three auctions (see :py:func:`_build_simulation`).
+    """
+    return _build_simulation
+
+
+@pytest.fixture
+def get_outcome():
+    """
+    Gets the time, the metrics and the contracts of a simulation to compare simulations.
+    """
+    return _get_outcome
@@ -0,0 +1,42 @@
+"""
+Tests for the batch module.
+"""
+import pytest
+
+from mable.examples.batch import BatchRunResult, aggregate_runs
+from mable.io.metrics_files import get_metrics_overview
+
+
+def _get_overview(cost, penalty, revenue):
+    return {"cost": cost, "penalty": penalty, "revenue": revenue, "income": revenue - cost - penalty}
+
+
+class TestAggregateRuns:
+
+    def test_aggregate_over_successful_runs(self):
+        run_results = [
+            BatchRunResult(0, "run_0", overview={"One": _get_overview(10, 0, 30), "Two": _get_overview(5, 1, 6)}),
+            BatchRunResult(1, "run_1", error="Traceback"),
+            BatchRunResult(2, "run_2", overview={"One": _get_overview(20, 2, 50), "Two": _get_overview(5, 1, 6)})]
+        aggregate = aggregate_runs(run_results)
+        assert set(aggregate.keys()) == {"One", "Two"}
+        assert aggregate["One"]["income"] == {"mean": 24, "std": 4, "min": 20, "max": 28}
+        assert aggregate["One"]["cost"]["mean"] == 15
+        assert aggregate["Two"]["penalty"] == {"mean": 1, "std": 0, "min": 1, "max": 1}
+
+    def test_no_successful_runs(self):
+        assert aggregate_runs([BatchRunResult(0, "run_0", error="Traceback")]) == {}
+
+
+def test_get_metrics_overview():
+    metrics = {
+        "company_names": {"1": "One", "2": "Two"},
+        "company_metrics": {"1": {"fuel_cost": 10}, "2": {}},
+        "global_metrics": {
+            "penalty": {"1": 2, "2": 0},
+            "auction_outcomes": [{"1": [{"payment": 20}, {"payment": 5}]}, {"1": [{"payment": 3}], "2": []}]
+        }
+    }
+    overview = get_metrics_overview(metrics)
+    assert overview["One"] == {"cost": 10, "penalty": 2, "revenue": 28, "income": pytest.approx(16)}
+    assert overview["Two"] == {"cost": 0, "penalty": 0, "revenue": 0, "income": 0}
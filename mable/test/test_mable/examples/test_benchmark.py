@@ -0,0 +1,53 @@
+"""
+Tests for the benchmark module.
+"""
+from loguru import logger
+
+from mable.examples import environment
+from mable.examples.benchmark import (
+    compare_modes, compare_fast_forward_processes, measure_events_per_second, DEFAULT_MODE, HEADLESS_MODE)
+from mable.observers import EventFuelPrintObserver
+
+
+def test_measure_events_per_second(build_simulation):
+    engine = build_simulation()
+    number_of_events, seconds = measure_events_per_second(engine)
+    assert number_of_events > 0
+    assert seconds > 0
+    assert len(engine.get_event_observers()) == 3
+
+
+def test_compare_modes(tmp_path, build_simulation):
+
+    def build_mode_simulation(headless):
+        engine = build_simulation()
+        if not headless:
+            engine.register_event_observer(EventFuelPrintObserver(logger))
+        return engine
+
+    log_file_path = tmp_path / "benchmark.log"
+    default_result, headless_result = compare_modes(build_mode_simulation, repetitions=1, log_file_path=log_file_path)
+    assert (default_result.mode, headless_result.mode) == (DEFAULT_MODE, HEADLESS_MODE)
+    assert default_result.number_of_events == headless_result.number_of_events > 0
+    assert headless_result.to_json()["events_per_second"] == headless_result.events_per_second
+    assert "Fuel consumption" in log_file_path.read_text()
+
+
+def test_compare_fast_forward_processes(build_simulation):
+
+    def build_fast_forward_simulation(number_of_processes):
+        engine = build_simulation()
+        engine.enable_fast_forward(number_of_processes)
+        return engine
+
+    results = compare_fast_forward_processes(build_fast_forward_simulation, [1, 2], repetitions=1)
+    assert [r.mode for r in results] == ["fast-forward-1", "fast-forward-2"]
+    assert results[0].number_of_events == results[1].number_of_events > 0
+
+
+def test_headless_stats_collection(mocker):
+    simulation = mocker.Mock(output_directory=".")
+    environment._activate_stats_collection(simulation, show_detailed_auction_outcome=True, headless=True)
+    registered_observers = [c.args[0] for c in simulation.register_event_observer.call_args_list]
+    assert len(registered_observers) == 1
+    assert not any(isinstance(o, EventFuelPrintObserver) for o in registered_observers)
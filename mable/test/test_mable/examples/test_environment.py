@@ -1,5 +1,7 @@
+import numpy as np
 import pytest
 
+from mable.competition.information import MarketAuthority
 from mable.examples import environment
 from mable.shipping_market import Contract
 
@@ -24,7 +26,7 @@ def test__calculate_penalty(mocker):
     mock_shipping_company.fleet = [mock_vessel_1, mock_vessel_2]
     mock_simulation_engine = mocker.patch("mable.engine.SimulationEngine")
     mock_simulation_engine.shipping_companies = [mock_shipping_company]
-    mock_simulation_engine.headquarters.get_network_distance = lambda x, y: y - x
+    mock_simulation_engine.headquarters.get_network_distances = lambda xs, ys: np.arange(len(xs), dtype=float)
     mock_trade_1 = mocker.patch("mable.shipping_market.Trade")
     mock_trade_1.x = 1
     mock_trade_1.y = 5
@@ -33,14 +35,43 @@ def test__calculate_penalty(mocker):
     mock_trade_1.y = 2
     payment_unfulfilled = 10
     payment_fulfilled = 20
-    mock_simulation_engine.market_authority.contracts_per_company = {
+    mock_simulation_engine.market_authority = MarketAuthority()
+    mock_simulation_engine.market_authority.add_allocation_results(mocker.Mock(ledger={
         mock_simulation_engine.shipping_companies[0]: [
         Contract(payment=payment_unfulfilled, trade=mock_trade_1),
         Contract(payment=payment_fulfilled, trade=mock_trade_2, fulfilled=True)]
-    }
+    }))
     mock_metrics_observer = mocker.patch("mable.observers.MetricsObserver")
     company_id = 0
     mock_metrics_observer.metrics.get_company_id.return_value = company_id
     penalties = environment._calculate_penalty(mock_simulation_engine, mock_metrics_observer)
     assert len(penalties) == 1
     assert penalties[company_id] == mock_vessel_2.propelling_engine.fuel.get_cost(None)
+
+
+def test__calculate_penalty_batch(mocker):
+    vessel = mocker.Mock(location="X", speed=2)
+    vessel.capacity.return_value = 10
+    vessel.get_loading_time = lambda cargo_type, amount: amount / 10
+    vessel.get_loading_consumption = lambda time: time
+    vessel.get_travel_time = lambda distance: distance / 2
+    vessel.get_ballast_consumption = lambda time, speed: time * speed
+    vessel.get_laden_consumption = lambda time, speed: 2 * time * speed
+    vessel.propelling_engine.fuel.get_cost = lambda consumption: 100 * consumption
+    company = mocker.Mock(fleet=[vessel])
+    distances = {("X", "A"): 3, ("A", "B"): 5, ("X", "C"): 1, ("C", "A"): 2}
+    simulation_engine = mocker.Mock(shipping_companies=[company])
+    simulation_engine.headquarters.get_network_distances = lambda xs, ys: np.array(
+        [distances[(x, y)] for x, y in zip(xs, ys)])
+    trades = [mocker.Mock(origin_port="A", destination_port="B", amount=20),
+              mocker.Mock(origin_port="C", destination_port="A", amount=10)]
+    simulation_engine.market_authority = MarketAuthority()
+    simulation_engine.market_authority.add_allocation_results(mocker.Mock(ledger={
+        company: [Contract(payment=1, trade=trades[0]), Contract(payment=1, trade=trades[1])]}))
+    metrics_observer = mocker.Mock()
+    metrics_observer.metrics.get_company_id.return_value = 0
+    penalties = environment._calculate_penalty(simulation_engine, metrics_observer)
+    loading = (2 + 1) * 2
+    ballast = 3 + 1
+    laden = 2 * (5 + 2)
+    assert penalties[0] == pytest.approx(100 * (loading + ballast + laden))
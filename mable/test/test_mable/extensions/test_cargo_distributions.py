@@ -0,0 +1,249 @@
+"""
+Tests for the cargo_distributions module.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from mable.extensions.cargo_distributions import AliasTable, CargoDistributionTables, DistributionShipping
+from mable.shipping_market import TimeWindowTrade
+from mable.simulation_environment import World
+from mable.simulation_space.structure import UnitShippingNetwork
+from mable.simulation_space.universe import Port
+
+
+def get_distributions():
+    cargo_weight_distribution = pd.DataFrame({
+        "Port": ["A", "B", "C", "A", "B", "C"],
+        "SupplyDemand": ["Supply", "Supply", "Supply", "Demand", "Demand", "Demand"],
+        "Mean": [100000, 120000, 90000, 110000, 100000, 95000],
+        "Std. Dev": [10000, float('inf'), 12000, 9000, 11000, 10000]})
+    frequency_distribution = pd.DataFrame({
+        "Port": ["A", "B", "C", "X", "A", "B", "C"],
+        "SupplyDemand": ["Supply", "Supply", "Supply", "Supply", "Demand", "Demand", "Demand"],
+        "Num Samples": [10, 30, 0, 50, 20, 20, 5]})
+    time_transit_distribution = pd.DataFrame({
+        "From": ["A", "B", "A"],
+        "To": ["B", "C", "X"],
+        "Mean": [5000, 7000, 6000],
+        "Std. Dev": [500, float('inf'), 400]})
+    return cargo_weight_distribution, frequency_distribution, time_transit_distribution
+
+
+def get_world(seed=0):
+    network = UnitShippingNetwork([Port("A", 0, 0), Port("B", 0.5, 0.5), Port("C", 1, 1)])
+    return World(network, None, np.random.RandomState(seed))
+
+
+class DummyClassFactory:
+
+    @staticmethod
+    def generate_trade(*args, **kwargs):
+        return TimeWindowTrade(*args, **kwargs)
+
+
+class TestAliasTable:
+
+    def test_sample(self):
+        table = AliasTable([1, 0, 3])
+        samples = table.sample(np.random.RandomState(0), 20000)
+        frequencies = np.bincount(samples, minlength=3) / len(samples)
+        assert frequencies[1] == 0
+        assert frequencies[0] == pytest.approx(0.25, abs=0.02)
+        assert isinstance(table.sample(np.random.RandomState(0)), int)
+
+    def test_no_weights(self):
+        with pytest.raises(ValueError):
+            AliasTable([0, 0])
+
+
+class TestCargoDistributionTables:
+
+    def test_compile(self):
+        world = get_world()
+        tables = CargoDistributionTables.compile(world.network, *get_distributions())
+        # C has no supply and X is not in the network
+        assert list(tables.origin_ids) == [0, 1]
+        assert list(tables.destination_ids[0]) == [1]
+        assert list(tables.destination_ids[1]) == [0, 2]
+        assert tables.transition_stds[1][1] == pytest.approx(450)
+
+    def test_compile_with_precomputed_routes(self):
+        world = get_world()
+        tables = CargoDistributionTables.compile(world.network, *get_distributions(), precomputed_routes={"CB": []})
+        assert list(tables.origin_ids) == [1]
+        assert list(tables.destination_ids[0]) == [2]
+
+    @staticmethod
+    def _rejection_sample_origins(random, size, precomputed_routes):
+        """
+        Samples the origins like the sampler before the compilation: an origin by its supply frequency and a
+        destination among the demand ports with a transition record, rejecting invalid combinations.
+        """
+        _, frequency_distribution, time_transit_distribution = get_distributions()
+        network_port_names = {"A", "B", "C"}
+        supply = frequency_distribution[frequency_distribution.SupplyDemand == "Supply"]
+        supply_probabilities = (supply["Num Samples"] / supply["Num Samples"].sum()).values
+        demand = frequency_distribution[frequency_distribution.SupplyDemand == "Demand"]
+        linked_demand = {}
+        for origin in supply.Port.values:
+            linked = (list(time_transit_distribution[time_transit_distribution.From == origin].To)
+                      + list(time_transit_distribution[time_transit_distribution.To == origin].From))
+            origin_demand = demand[demand.Port.isin(linked)]
+            linked_demand[origin] = (
+                origin_demand.Port.values, (origin_demand["Num Samples"] / origin_demand["Num Samples"].sum()).values)
+        origins = []
+        while len(origins) < size:
+            origin = random.choice(supply.Port.values, p=supply_probabilities)
+            destinations, destination_probabilities = linked_demand[origin]
+            if origin not in network_port_names or len(destinations) == 0:
+                continue
+            destination = random.choice(destinations, p=destination_probabilities)
+            if (destination == origin or destination not in network_port_names
+                    or not (f"{origin}{destination}" in precomputed_routes
+                            or f"{destination}{origin}" in precomputed_routes)):
+                continue
+            origins.append(origin)
+        return np.array(origins)
+
+    def test_origin_marginals_with_missing_routes(self):
+        precomputed_routes = {"AB": []}
+        world = get_world()
+        tables = CargoDistributionTables.compile(
+            world.network, *get_distributions(), precomputed_routes=precomputed_routes)
+        origin_ids, _, _ = tables.sample_routes(np.random.default_rng(0), 20000)
+        rejection_origins = self._rejection_sample_origins(np.random.RandomState(1), 20000, precomputed_routes)
+        # B's linked demand is A (20) and C (5) of which only A has a route.
+        assert np.mean(origin_ids == 1) == pytest.approx(24 / 34, abs=0.01)
+        assert np.mean(origin_ids == 1) == pytest.approx(np.mean(rejection_origins == "B"), abs=0.015)
+
+
+class TestDistributionShipping:
+
+    @staticmethod
+    def _sample(seed, batch_sampling, number_of_cargoes=50):
+        shipping = DistributionShipping.__new__(DistributionShipping)
+        shipping._distribution_tables = None
+        shipping._distribution_tables_sources = None
+        shipping._batch_sampling = batch_sampling
+        world = get_world(seed)
+        cargo_weight_distribution, frequency_distribution, time_transit_distribution = get_distributions()
+        return shipping.sample_cargoes_from_port_distributions(
+            world, DummyClassFactory(), number_of_cargoes, cargo_weight_distribution, frequency_distribution,
+            time_transit_distribution, (0, 29.96), time=0)
+
+    @pytest.mark.parametrize("batch_sampling", [False, True])
+    def test_sample_cargoes_from_port_distributions(self, batch_sampling):
+        trades = self._sample(1, batch_sampling)
+        assert len(trades) == 50
+        for one_trade in trades:
+            assert one_trade.origin_port != one_trade.destination_port
+            assert one_trade.amount > 1
+            assert one_trade.time_window[0] <= one_trade.time_window[1] <= one_trade.time_window[3]
+        assert [t.amount for t in trades] == [t.amount for t in self._sample(1, batch_sampling)]
+
+    def test_batch_sampling_distributions(self):
+        single_trades = self._sample(2, False, 4000)
+        batch_trades = self._sample(3, True, 4000)
+        for trades in [single_trades, batch_trades]:
+            assert np.mean([t.origin_port.name == "B" for t in trades]) == pytest.approx(0.75, abs=0.03)
+        single_amounts = [t.amount for t in single_trades]
+        batch_amounts = [t.amount for t in batch_trades]
+        assert np.mean(batch_amounts) == pytest.approx(np.mean(single_amounts), rel=0.02)
+        single_windows = [t.time_window[2] - t.time_window[0] for t in single_trades]
+        batch_windows = [t.time_window[2] - t.time_window[0] for t in batch_trades]
+        assert np.mean(batch_windows) == pytest.approx(np.mean(single_windows), rel=0.05)
+
+    @staticmethod
+    def _get_shipping(tmp_path, **kwargs):
+        paths = {}
+        for key, distribution in zip(
+                ["port_cargo_weight_distribution_path",
+                 "port_trade_frequency_distribution_path",
+                 "port_transition_duration_distributions_path"],
+                get_distributions()):
+            paths[key] = tmp_path / f"{key}.csv"
+            distribution.to_csv(paths[key], index=False)
+        return DistributionShipping(
+            world=get_world(), class_factory=DummyClassFactory(), trade_occurrence_frequency=30,
+            trades_per_occurrence=3, simulation_length=90, precomputed_routes_file=None,
+            distribution_cache_directory=str(tmp_path / "cache"), **paths, **kwargs)
+
+    def test_lazy_trade_generation(self, tmp_path, mocker):
+        eager_shipping = self._get_shipping(tmp_path)
+        lazy_shipping = self._get_shipping(tmp_path, lazy_trade_generation=True)
+        lazy_shipping.set_engine(mocker.Mock(world=get_world()))
+        assert lazy_shipping.get_trading_times() == eager_shipping.get_trading_times() == [0, 720, 1440, 2160]
+        assert len(lazy_shipping._all_trades) == 0
+        for one_time in reversed(lazy_shipping.get_trading_times()):
+            lazy_amounts = [t.amount for t in lazy_shipping.get_trades(one_time)]
+            assert lazy_amounts == [t.amount for t in eager_shipping._all_trades[one_time]]
+
+    def test_trade_table(self, tmp_path, mocker):
+        shipping = self._get_shipping(tmp_path)
+        table_shipping = self._get_shipping(tmp_path, trade_table=True)
+        table_shipping.set_engine(mocker.Mock(world=get_world()))
+        assert len(table_shipping.trade_table) == 12
+        assert len(table_shipping._all_trades) == 0
+        table_trades = table_shipping.get_trades(720)
+        assert len(table_shipping._all_trades) == 0
+        assert [t.amount for t in table_trades] == [t.amount for t in shipping._all_trades[720]]
+        assert table_trades[0].origin_port == shipping._all_trades[720][0].origin_port
+
+    def test_static_objects(self, tmp_path):
+        shipping = self._get_shipping(tmp_path, trade_table=True)
+        assert shipping._distribution_tables is not None
+        static_objects = shipping.get_static_objects()
+        assert static_objects == {
+            "time_transition_distribution": shipping._time_transition_dist,
+            "cargo_weight_distribution": shipping._cargo_weight_dist,
+            "frequency_distribution": shipping._frequency_dist}
+        state = shipping.__getstate__()
+        assert state["_distribution_tables"] is None
+        assert state["_distribution_tables_sources"] is None
+        assert shipping._distribution_tables is not None
+
+    def test_resample_future_trades(self, tmp_path, mocker):
+        shipping = self._get_shipping(tmp_path)
+        world = get_world()
+        world.set_current_time(720)
+        shipping.set_engine(mocker.Mock(world=world))
+        trades_before = {t: [one_trade.amount for one_trade in shipping.get_trades(t)] for t in [720, 1440, 2160]}
+        shipping.resample_future_trades(1)
+        assert [t.amount for t in shipping.get_trades(720)] == trades_before[720]
+        assert [t.amount for t in shipping.get_trades(1440)] == trades_before[1440]
+        assert [t.amount for t in shipping.get_trades(2160)] != trades_before[2160]
+
+    def test_warm_read_and_compile_without_pandas(self, tmp_path, mocker):
+        paths = []
+        for index, distribution in enumerate(get_distributions()):
+            paths.append(tmp_path / f"distribution_{index}.csv")
+            distribution.to_csv(paths[-1], index=False)
+        cache_directory = tmp_path / "cache"
+        for one_path in paths:
+            DistributionShipping.read_distribution_columns(one_path, cache_directory)
+        pandas = mocker.patch("mable.extensions.cargo_distributions.pd")
+        columns = [DistributionShipping.read_distribution_columns(p, cache_directory) for p in paths]
+        tables = CargoDistributionTables.compile(get_world().network, *columns)
+        assert pandas.mock_calls == []
+        mocker.stopall()
+        frame_tables = CargoDistributionTables.compile(get_world().network, *get_distributions())
+        assert list(tables.origin_ids) == list(frame_tables.origin_ids)
+        assert np.array_equal(tables.flat_transition_stds, frame_tables.flat_transition_stds)
+        assert np.array_equal(tables.origin_table.probabilities, frame_tables.origin_table.probabilities)
+
+    def test_read_distribution_cache(self, tmp_path, mocker):
+        path = tmp_path / "distribution.csv"
+        cache_directory = tmp_path / "cache"
+        distribution = get_distributions()[0]
+        distribution.to_csv(path, index=False)
+        cold_distribution = DistributionShipping.read_distribution(path, cache_directory)
+        assert len(list(cache_directory.glob("distribution-*.npz"))) == 1
+        read_csv = mocker.patch("mable.extensions.cargo_distributions.pd.read_csv")
+        warm_distribution = DistributionShipping.read_distribution(path, cache_directory)
+        read_csv.assert_not_called()
+        pd.testing.assert_frame_equal(warm_distribution, cold_distribution, check_dtype=False)
+        assert warm_distribution["Std. Dev"].iloc[1] == float('inf')
+        distribution.iloc[:3].to_csv(path, index=False)
+        mocker.stopall()
+        assert len(DistributionShipping.read_distribution(path, cache_directory)) == 3
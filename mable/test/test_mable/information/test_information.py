@@ -1,12 +1,17 @@
+import copy
 import csv
+import pickle
 from unittest.mock import PropertyMock
 
+import pytest
+
 from mable import global_setup
 from mable.cargo_bidding import TradingCompany
-from mable.competition.information import CompanyHeadquarters
+from mable.competition.information import CompanyHeadquarters, MarketAuthority
 from mable.extensions.fuel_emissions import VesselWithEngine, ConsumptionRate, VesselEngine, Fuel
 from mable.extensions.world_ports import LatLongPort, LatLongShippingNetwork, LatLongLocation
 from mable.simulation_de_serialisation import SimulationSpecification
+from mable.shipping_market import AuctionAllocationResult, Contract, TimeWindowTrade
 from mable.simulation_space.universe import OnJourney
 from mable.transport_operation import CargoCapacity
 
@@ -132,3 +137,59 @@ class TestCompanyHeadquarters:
         company_headquarters._engine.world._current_time = start_time + 1
         the_company = company.headquarters.get_companies()[0]
         assert the_company.fleet[0].location == port_singapore
+
+
+class TestMarketAuthority:
+
+    def test_awarded_trades(self, mocker):
+        company_one, company_two, replacement = mocker.Mock(), mocker.Mock(), mocker.Mock()
+        trades = [TimeWindowTrade(origin_port="A", destination_port="B", amount=1, time=t) for t in range(3)]
+        market_authority = MarketAuthority()
+        market_authority.add_allocation_results(mocker.Mock(ledger={
+            company_one: [Contract(payment=1, trade=trades[0])], company_two: [Contract(payment=1, trade=trades[1])]}))
+        market_authority.add_allocation_results(mocker.Mock(ledger={company_one: [Contract(payment=1, trade=trades[2])]}))
+        assert market_authority.get_awarded_trade_keys(company_one) == {trades[0].key, trades[2].key}
+        assert market_authority.is_awarded(copy.deepcopy(trades[1]), company_two)
+        assert not market_authority.is_awarded(trades[1], company_one)
+        market_authority.replace_companies({company_one: replacement})
+        assert market_authority.is_awarded(trades[0], replacement)
+        assert not market_authority.is_awarded(trades[0], company_one)
+        assert len(market_authority.contracts_per_company[replacement]) == 2
+
+    def test_trade_fulfilled(self, mocker):
+        company = mocker.Mock()
+        trades = [TimeWindowTrade(origin_port="A", destination_port="B", amount=1, time=t) for t in [0, 1, 1]]
+        contracts = [Contract(payment=1, trade=t) for t in trades]
+        market_authority = MarketAuthority()
+        market_authority.add_allocation_results(mocker.Mock(ledger={company: contracts}))
+        assert market_authority.get_number_of_unfulfilled_contracts(company) == 3
+        market_authority.trade_fulfilled(copy.deepcopy(trades[1]), company)
+        assert [c.fulfilled for c in contracts] == [False, True, False]
+        market_authority.trade_fulfilled(trades[2], company)
+        assert market_authority.get_open_contracts(company) == [contracts[0]]
+        assert market_authority.get_number_of_fulfilled_contracts(company) == 2
+        assert market_authority.get_number_of_unfulfilled_contracts(company) == 1
+        with pytest.raises(ValueError):
+            market_authority.trade_fulfilled(
+                TimeWindowTrade(origin_port="A", destination_port="C", amount=1, time=0), company)
+
+    def test_pickling_restores_indices(self):
+        trades = [TimeWindowTrade(origin_port="A", destination_port="B", amount=1, time=t) for t in range(2)]
+        market_authority = MarketAuthority()
+        market_authority.add_allocation_results(AuctionAllocationResult(
+            {"company": [Contract(payment=1, trade=t) for t in trades]}, []))
+        market_authority.trade_fulfilled(trades[0], "company")
+        restored_authority = pickle.loads(pickle.dumps(market_authority))
+        assert restored_authority.get_number_of_fulfilled_contracts("company") == 1
+        restored_authority.trade_fulfilled(trades[1], "company")
+        assert restored_authority.get_open_contracts("company") == []
+
+    def test_headquarters_open_contracts(self, mocker):
+        company = mocker.Mock()
+        contract = Contract(payment=1, trade=TimeWindowTrade(origin_port="A", destination_port="B", amount=1))
+        market_authority = MarketAuthority()
+        market_authority.add_allocation_results(mocker.Mock(ledger={company: [contract]}))
+        headquarters = CompanyHeadquarters(mocker.Mock(market_authority=market_authority))
+        open_contracts = headquarters.get_open_contracts(company)
+        assert open_contracts == [contract]
+        assert open_contracts[0] is not contract
@@ -0,0 +1,55 @@
+"""
+Tests for the simulation_space.structure module.
+"""
+import math
+
+import numpy as np
+import pytest
+
+from mable.simulation_space.structure import UnitShippingNetwork
+from mable.simulation_space.universe import Port, Location, OnJourney
+from mable.transport_operation import SimpleVessel
+
+
+class TestUnitShippingNetwork:
+
+    @staticmethod
+    def _get_network():
+        ports = [Port("A", 0, 0), Port("B", 0.3, 0.4), Port("C", 1, 1), Port("D", 1.5, 0)]
+        return UnitShippingNetwork(ports)
+
+    def test_get_distance(self):
+        network = self._get_network()
+        assert network.get_distance("A", "B") == pytest.approx(0.5)
+        assert network.get_distance(network.get_port("A"), "C") == pytest.approx(math.sqrt(2))
+        assert network.get_distance(Location(0, 0), Location(0, 0.25)) == pytest.approx(0.25)
+        assert network.get_distance("A", "D") == math.inf
+        assert network.get_distance(Location(0, 0), Location(0, 1.1)) == math.inf
+
+    def test_distance_matrix(self):
+        network = self._get_network()
+        assert network.distance_matrix.shape == (4, 4)
+        for one_port in network.ports[:3]:
+            for other_port in network.ports[:3]:
+                assert network.get_distance(one_port, other_port) == pytest.approx(
+                    math.hypot(one_port.x - other_port.x, one_port.y - other_port.y))
+
+    def test_get_distances(self):
+        network = self._get_network()
+        distances = network.get_distances(["A", "B", "A"], ["B", "C", "D"])
+        np.testing.assert_allclose(distances, [0.5, math.hypot(0.7, 0.6), math.inf])
+        distances = network.get_distances([Location(0, 0), "A"], [Location(0.5, 0), "B"])
+        np.testing.assert_allclose(distances, [0.5, 0.5])
+        with pytest.raises(ValueError):
+            network.get_distances(["A"], ["B", "C"])
+
+    def test_get_journey_location(self):
+        network = self._get_network()
+        vessel = SimpleVessel([], "A", speed=0.1)
+        journey = OnJourney(network.get_port("A"), network.get_port("B"), 10)
+        assert network.get_journey_location(journey, vessel, 5) == network.get_port("A")
+        assert network.get_journey_location(journey, vessel, 15) == network.get_port("B")
+        assert network.get_journey_location(journey, vessel, 20) == network.get_port("B")
+        location = network.get_journey_location(journey, vessel, 12.5)
+        assert location.x == pytest.approx(0.15)
+        assert location.y == pytest.approx(0.2)
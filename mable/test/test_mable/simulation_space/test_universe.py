@@ -0,0 +1,45 @@
+"""
+Tests for the simulation_space.universe module.
+"""
+import copy
+import pickle
+
+from mable.simulation_space.structure import UnitShippingNetwork
+from mable.simulation_space.universe import Port, Location
+
+
+class TestLocation:
+
+    def test_equality_and_hash(self):
+        location = Location(0.1, 0.2, "A")
+        assert location == location
+        assert location == Location(0.1, 0.2, "A")
+        assert location != Location(0.1, 0.2)
+        assert location != "A"
+        assert hash(location) == hash(Location(0.1, 0.2, "A"))
+        assert Port("A", 0.1, 0.2) == location
+
+    def test_copy_and_pickle(self):
+        port = Port("A", 0.1, 0.2)
+        port.port_id = 3
+        for one_copy in [copy.deepcopy(port), pickle.loads(pickle.dumps(port))]:
+            assert one_copy == port
+            assert hash(one_copy) == hash(port)
+            assert one_copy.port_id == 3
+
+    def test_to_json(self):
+        assert Port("A", 0.1, 0.2).to_json() == {"_x": 0.1, "_y": 0.2, "_name": "A"}
+
+
+class TestPortIds:
+
+    def test_ports_are_interned(self):
+        ports = [Port("A", 0, 0), Port("B", 0.5, 0.5), Port("C", 1, 1)]
+        network = UnitShippingNetwork(ports)
+        assert [p.port_id for p in network.ports] == [0, 1, 2]
+        assert network.get_port_id("B") == 1
+        assert network.get_port_id(ports[2]) == 2
+        assert network.get_port_id(Location(0.5, 0.5, "B")) == 1
+        assert network.get_port_id(Location(0.4, 0.5, "B")) is None
+        assert network.get_port_id("X") is None
+        assert network.get_port_by_id(1) is ports[1]
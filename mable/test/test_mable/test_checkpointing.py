@@ -0,0 +1,97 @@
+"""
+Tests for the checkpointing module.
+"""
+import gzip
+import pickle
+
+import pytest
+
+from mable.observers import CheckpointObserver, JsonLinesExportObserver
+from mable.shipping_market import StaticShipping
+
+
+class TestCheckpoint:
+
+    @pytest.mark.parametrize("pickle_companies", [True, False])
+    def test_continuation_matches_uninterrupted_run(self, tmp_path, pickle_companies, build_simulation, get_outcome):
+        engine = build_simulation()
+        checkpoint_observer = CheckpointObserver(tmp_path, 1000, pickle_companies=pickle_companies)
+        engine.register_event_observer(checkpoint_observer)
+        engine.run()
+        uninterrupted_outcome = get_outcome(engine)
+        assert len(checkpoint_observer.checkpoint_paths) == 2
+        assert len(uninterrupted_outcome[2]["One"]) > 0
+        for one_checkpoint_path in checkpoint_observer.checkpoint_paths:
+            restored_engine = build_simulation()
+            restored_engine.restore(one_checkpoint_path)
+            assert restored_engine.world.current_time >= 1000
+            restored_engine.run()
+            assert get_outcome(restored_engine) == uninterrupted_outcome
+
+    def test_ports_and_engine_are_referenced(self, tmp_path, build_simulation):
+        engine = build_simulation()
+        checkpoint_path = tmp_path / "checkpoint.ckpt"
+        engine.checkpoint(checkpoint_path)
+        restored_engine = build_simulation()
+        restored_engine.restore(checkpoint_path)
+        restored_trades = restored_engine.shipping.get_trades(720)
+        assert restored_trades[0].origin_port is restored_engine.world.network.get_port("A")
+        assert all(v._engine is restored_engine
+                   for c in restored_engine.shipping_companies for v in c.fleet)
+
+    def test_shipping_static_objects_are_referenced(self, tmp_path, mocker, build_simulation):
+        mocker.patch.object(StaticShipping, "get_static_objects", lambda shipping: {"routes": shipping.routes})
+        engine = build_simulation()
+        engine.shipping.routes = {("A", "B"): [0.5]}
+        checkpoint_path = tmp_path / "checkpoint.ckpt"
+        engine.checkpoint(checkpoint_path)
+        restored_engine = build_simulation()
+        routes = {("A", "B"): [0.5]}
+        restored_engine.shipping.routes = routes
+        restored_engine.restore(checkpoint_path)
+        assert restored_engine.shipping.routes is routes
+
+    def test_unsupported_version(self, tmp_path, build_simulation):
+        checkpoint_path = tmp_path / "checkpoint.ckpt"
+        with gzip.open(checkpoint_path, "wb") as checkpoint_file:
+            pickle.dump({"version": -1}, checkpoint_file)
+        with pytest.raises(ValueError):
+            build_simulation().restore(checkpoint_path)
+
+    def test_fleets_mismatch(self, tmp_path, build_simulation):
+        engine = build_simulation()
+        checkpoint_path = tmp_path / "checkpoint.ckpt"
+        engine.checkpoint(checkpoint_path, pickle_companies=False)
+        restored_engine = build_simulation()
+        restored_engine.shipping_companies[1].fleet.pop()
+        with pytest.raises(ValueError):
+            restored_engine.restore(checkpoint_path)
+
+
+class TestJsonLinesExportObserverPickling:
+
+    def test_records_after_pickling_are_dropped(self, tmp_path):
+        file_path = tmp_path / "records.jsonl"
+        observer = JsonLinesExportObserver(file_path)
+        observer._write({"record": "one"})
+        observer.prepare_checkpoint()
+        pickled_observer = pickle.dumps(observer)
+        observer._write({"record": "two"})
+        observer.close()
+        restored_observer = pickle.loads(pickled_observer)
+        restored_observer.write_summary({"value": 3})
+        with open(file_path) as records_file:
+            lines = records_file.read().splitlines()
+        assert lines == ['{"record": "one"}', '{"record": "summary", "value": 3}']
+
+    def test_pickling_does_not_write(self, tmp_path):
+        file_path = tmp_path / "records.jsonl"
+        observer = JsonLinesExportObserver(file_path)
+        observer._write({"record": "one"})
+        pickled_observer = pickle.dumps(observer)
+        assert not file_path.exists()
+        restored_observer = pickle.loads(pickled_observer)
+        restored_observer.write_summary({"value": 3})
+        with open(file_path) as records_file:
+            lines = records_file.read().splitlines()
+        assert lines == ['{"record": "one"}', '{"record": "summary", "value": 3}']
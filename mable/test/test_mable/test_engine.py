@@ -4,6 +4,7 @@ Tests for engine module.
 
 import mable.engine as sim_engine
 from mable.event_management import EventObserver, Event
+from mable.instrumentation import EVENT_CATEGORY, OBSERVER_CATEGORY, COMPANY_CATEGORY, NETWORK_CATEGORY
 
 
 class DummyObserver(EventObserver):
@@ -29,3 +30,107 @@ class TestSimulationEngine:
         assert test_observer.observations[0][0].time == 1
         assert test_observer.observations[0][0].info == "A"
         assert test_observer.observations[0][1] == "B"
+
+
+class DummyCompany:
+
+    def __init__(self, name):
+        self.name = name
+
+    def inform(self, trades):
+        return []
+
+
+class InformEvent(Event):
+
+    def event_action(self, engine):
+        engine.world.network.get_distance("A", "B")
+        return engine.shipping_companies[0].inform([])
+
+
+class TestSimulationEngineProfiling:
+
+    def _get_engine(self, mocker, events):
+        world = mocker.Mock()
+        world.do_events_exists = lambda: len(events) > 0
+        world.get_next_event = lambda: events.pop(0)
+        world.network.get_distance.return_value = 1
+        shipping = mocker.Mock()
+        shipping.get_trading_times.return_value = []
+        return sim_engine.SimulationEngine(
+            world, [DummyCompany("C")], shipping, None, None, pre_run_cmds=[], post_run_cmds=[])
+
+    def test_profiling(self, mocker):
+        test_engine = self._get_engine(mocker, [InformEvent(1), InformEvent(2), Event(3)])
+        test_observer = DummyObserver()
+        test_engine.register_event_observer(test_observer)
+        profiler = test_engine.enable_profiling()
+        test_engine.run()
+        summary = profiler.summary()
+        assert summary[EVENT_CATEGORY]["InformEvent"]["count"] == 2
+        assert summary[EVENT_CATEGORY]["Event"]["count"] == 1
+        assert summary[OBSERVER_CATEGORY]["DummyObserver"]["count"] == 3
+        assert summary[COMPANY_CATEGORY]["C.inform"]["count"] == 2
+        assert summary[NETWORK_CATEGORY]["get_distance"]["count"] == 2
+        assert len(test_observer.observations) == 3
+        trace = profiler.to_chrome_trace()
+        assert {e["cat"] for e in trace["traceEvents"]} >= {EVENT_CATEGORY, OBSERVER_CATEGORY, COMPANY_CATEGORY}
+        assert all(e["ph"] == "X" and e["dur"] >= 0 for e in trace["traceEvents"])
+        test_engine.disable_profiling()
+        assert "inform" not in vars(test_engine.shipping_companies[0])
+        assert "apply_new_schedules" not in vars(test_engine)
+
+    def test_no_profiling(self, mocker):
+        test_engine = self._get_engine(mocker, [InformEvent(1)])
+        test_engine.run()
+        assert test_engine.profiler is None
+        assert "inform" not in vars(test_engine.shipping_companies[0])
+
+
+class BatchObserver(EventObserver):
+
+    def __init__(self):
+        self.batch_sizes = []
+        self.event_times = []
+
+    def notify(self, engine, event, data):
+        self.batch_sizes.append(1)
+        self.event_times.append(event.time)
+
+    def notify_batch(self, engine, events):
+        self.batch_sizes.append(len(events))
+        self.event_times.extend(e.time for e, _ in events)
+
+
+class TestSimulationEngineFastForward:
+
+    def test_same_outcome(self, build_simulation, get_outcome):
+        engine = build_simulation()
+        engine.run()
+        fast_forward_engine = build_simulation()
+        batch_observer = BatchObserver()
+        fast_forward_engine.register_event_observer(batch_observer)
+        fast_forward_engine.enable_fast_forward()
+        fast_forward_engine.run()
+        assert get_outcome(fast_forward_engine) == get_outcome(engine)
+        assert max(batch_observer.batch_sizes) > 1
+        assert batch_observer.event_times == sorted(batch_observer.event_times)
+
+    def test_same_outcome_with_large_fleet(self, build_simulation, get_outcome):
+        fleets = [(company_name, [(f"{company_name}{i}", "ABC"[i % 3]) for i in range(30)])
+                  for company_name in ["One", "Two"]]
+        routes = [("A", "B"), ("A", "C"), ("B", "A"), ("B", "C"), ("C", "A"), ("C", "B")]
+        engine = build_simulation(fleets=fleets, routes=routes)
+        engine.run()
+        fast_forward_engine = build_simulation(fleets=fleets, routes=routes)
+        fast_forward_engine.enable_fast_forward()
+        fast_forward_engine.run()
+        assert get_outcome(fast_forward_engine) == get_outcome(engine)
+        assert len(fast_forward_engine.event_queue.queue) == 0
+
+    def test_end_time(self, build_simulation):
+        engine = build_simulation()
+        engine.enable_fast_forward()
+        engine._pre_run()
+        engine.run_events(1500)
+        assert engine.world.current_time <= 1500 < engine.event_queue.next_event_time()
@@ -2,6 +2,10 @@
 Tests for management module.
 """
 
+import math
+
+import numpy as np
+
 import mable.event_management as em
 
 
@@ -24,3 +28,100 @@ class TestEventQueue:
         return_event_3 = events.get()
         assert return_event_3.time == 5
         assert return_event_3.info == "Unload"
+
+    def test_hold(self):
+        events = em.EventQueue()
+        events.hold(4)
+        events.put(em.Event(3, "Held later"))
+        events.put(em.Event(5, "Queued"))
+        events.put(em.Event(1, "Held first"))
+        assert len(events.queue) == 1
+        assert events.pop_held_event().info == "Held first"
+        events.release_held_events()
+        assert events.pop_held_event() is None
+        events.put(em.Event(2, "Not held"))
+        assert [events.get().info for _ in range(3)] == ["Not held", "Held later", "Queued"]
+
+    def test_pop_held_events_of_large_fleet(self):
+        events = em.EventQueue()
+        events.hold(math.inf)
+        random = np.random.RandomState(0)
+        times = random.randint(0, 1000, size=5000)
+        for i, one_time in enumerate(times):
+            events.put(em.Event(int(one_time), i))
+        held_events = []
+        next_event = events.pop_held_event()
+        while next_event is not None:
+            held_events.append(next_event)
+            next_event = events.pop_held_event()
+        assert [e.info for e in held_events] == list(np.argsort(times, kind="stable"))
+
+    def test_remove_event_with_same_time(self, mocker):
+        vessel_1, vessel_2 = mocker.Mock(), mocker.Mock()
+        event_1 = em.IdleEvent(5, vessel_1, None)
+        event_2 = em.IdleEvent(5, vessel_2, None)
+        events = em.EventQueue()
+        events.set_engine(mocker.Mock(world=mocker.Mock(current_time=0)))
+        events.put(event_1)
+        events.put(event_2)
+        events.remove(event_2)
+        assert event_1 in events
+        assert event_2 not in events
+        assert events.get() is event_1
+
+    def test_next_non_vessel_event_time(self, mocker):
+        events = em.EventQueue()
+        events.set_engine(mocker.Mock(world=mocker.Mock(current_time=0)))
+        random = np.random.RandomState(0)
+        non_vessel_events = [em.Event(int(t), "Cargo") for t in random.randint(0, 1000, size=500)]
+        vessel_events = [em.IdleEvent(int(t), mocker.Mock(), None) for t in random.randint(0, 1000, size=500)]
+        for one_event in non_vessel_events + vessel_events:
+            events.put(one_event)
+        for one_event in non_vessel_events[:100]:
+            events.remove(one_event)
+        for _ in range(300):
+            events.get()
+        remaining_times = [one_event_item.time for one_event_item in events.queue
+                           if not isinstance(one_event_item.event, em.VesselEvent)]
+        assert events.next_non_vessel_event_time() == min(remaining_times)
+        events.restore_event_items([one_event_item for one_event_item in events.queue
+                                    if isinstance(one_event_item.event, em.VesselEvent)])
+        assert events.next_non_vessel_event_time() == math.inf
+
+
+class TestEventInfo:
+
+    def test_events_have_no_dict(self):
+        event = em.IdleEvent(1, object(), "Aberdeen")
+        assert not hasattr(event, "__dict__")
+
+    def test_info_is_built_on_first_access(self, mocker):
+        vessel = mocker.Mock()
+        vessel.name = "Vessel A"
+        company = mocker.Mock()
+        company.name = "Company A"
+        vessel._engine.find_company_for_vessel.return_value = company
+        location = mocker.Mock()
+        location.name = "Aberdeen"
+        event = em.VesselLocationInformationEvent(2, vessel, location)
+        vessel._engine.find_company_for_vessel.assert_not_called()
+        assert event.info == "Company A's Vessel A in Aberdeen"
+        assert event.info == "Company A's Vessel A in Aberdeen"
+        vessel._engine.find_company_for_vessel.assert_called_once_with(vessel)
+
+    def test_info_format(self, mocker):
+        vessel = mocker.Mock()
+        vessel.name = "Vessel A"
+        trade = mocker.Mock(origin_port="Aberdeen", destination_port="Bergen", cargo_type="Oil", amount=10)
+        assert (em.TravelEvent(1, vessel, "Aberdeen", "Bergen").info
+                == "Bergen travel (Vessel [name: Vessel A]: Aberdeen->Bergen)")
+        assert em.IdleEvent(1, vessel, "Aberdeen").info == "Aberdeen idling (Vessel [name: Vessel A])"
+        assert (em.CargoTransferEvent(1, vessel, trade, True).info
+                == "Aberdeen pick up (Vessel [name: Vessel A], Trade [Oil, 10]: Aberdeen->Bergen)")
+        assert (em.CargoTransferEvent(1, vessel, trade, False).info
+                == "Bergen drop off (Vessel [name: Vessel A], Trade [Oil, 10]: Aberdeen->Bergen)")
+
+    def test_set_info(self):
+        event = em.IdleEvent(1, object(), "Aberdeen")
+        event.info = "Waiting"
+        assert event.info == "Waiting"
@@ -0,0 +1,68 @@
+"""
+Tests for the instrumentation module.
+"""
+import json
+
+import numpy as np
+
+from mable.instrumentation import Profiler
+
+
+class Timed:
+
+    def work(self, value):
+        return value * 2
+
+
+class TestProfiler:
+
+    def test_spans(self, tmp_path):
+        profiler = Profiler()
+        profiler.add_span("A", "x", 0, 2_000_000)
+        profiler.add_span("A", "x", 0, 4_000_000)
+        with profiler.span("B", "y", {"info": 1}):
+            pass
+        summary = profiler.summary()
+        assert summary["x"]["A"]["count"] == 2
+        assert summary["x"]["A"]["total"] == 0.006
+        assert summary["x"]["A"]["max"] == 0.004
+        assert summary["y"]["B"]["count"] == 1
+        counts, edges = profiler.get_histogram("x", "A", bins=[0, 0.003, 0.005])
+        assert counts.tolist() == [1, 1]
+        file_path = tmp_path / "trace.json"
+        profiler.export_chrome_trace(file_path)
+        with open(file_path) as f:
+            trace = json.load(f)
+        assert [e["name"] for e in trace["traceEvents"]] == ["A", "A", "B"]
+        assert trace["traceEvents"][1]["dur"] == 4000
+        assert trace["traceEvents"][2]["args"] == {"info": 1}
+
+    def test_counts(self):
+        profiler = Profiler()
+        profiler.add_counts("A", "cache", hits=1, misses=0)
+        profiler.add_counts("A", "cache", hits=2, misses=1)
+        profiler.add_counts("B", "other", calls=2)
+        assert profiler.get_counts("cache", "A") == {"hits": 3, "misses": 1}
+        assert profiler.get_counts("cache", "C") == {}
+        summary = profiler.counts_summary()
+        assert summary["cache"]["A"]["hit_rate"] == 0.75
+        assert summary["other"]["B"] == {"calls": 2}
+
+    def test_max_trace_events(self):
+        profiler = Profiler(max_trace_events=2)
+        for _ in range(3):
+            profiler.add_span("A", "x", 0, 1)
+        assert len(profiler.trace_events) == 2
+        assert len(profiler.get_durations("x", "A")) == 3
+
+    def test_instrument(self):
+        timed = Timed()
+        profiler = Profiler()
+        profiler.instrument(timed, "work", "x", "timed work")
+        assert timed.work(3) == 6
+        assert len(profiler.get_durations("x", "timed work")) == 1
+        profiler.restore()
+        assert "work" not in vars(timed)
+        assert timed.work(3) == 6
+        assert len(profiler.get_durations("x", "timed work")) == 1
+        assert np.array_equal(profiler.get_durations("x", "other"), [])
@@ -0,0 +1,87 @@
+"""
+Tests for the journey_log module.
+"""
+import os
+
+import numpy as np
+import pytest
+
+from mable.event_management import TravelEvent, CargoTransferEvent, IdleEvent
+from mable.journey_log import (
+    JourneyLog, JourneyLogEntry, TRAVEL_EVENT_CODE, CARGO_TRANSFER_EVENT_CODE, IDLE_EVENT_CODE, NO_ID)
+from mable.shipping_market import TimeWindowTrade
+from mable.simulation_space.universe import Port, Location
+
+
+def _get_port(name, port_id, x, y):
+    port = Port(name, x, y)
+    port.port_id = port_id
+    return port
+
+
+class TestJourneyLog:
+
+    def test_log_event(self, mocker):
+        port_a = _get_port("A", 0, 0, 0)
+        port_b = _get_port("B", 1, 3, 4)
+        trade = TimeWindowTrade(origin_port=port_a, destination_port=port_b, amount=10, cargo_type="Oil")
+        vessel = mocker.Mock()
+        engine = mocker.Mock()
+        engine.world.network.get_distance = lambda one, two: 5
+        travel = TravelEvent(5, vessel, Location(1, 1), port_a)
+        travel._time_started = 2
+        transfer = CargoTransferEvent(8, vessel, trade, True)
+        transfer._time_started = 6
+        idle = IdleEvent(9, vessel, port_a)
+        idle._time_started = 8
+        journey_log = JourneyLog()
+        journey_log.log_event(travel, engine)
+        journey_log.log_event(transfer, engine)
+        journey_log.log_event(idle)
+        assert len(journey_log) == 3
+        assert journey_log[0] == JourneyLogEntry(TRAVEL_EVENT_CODE, -1, 2, 5, NO_ID, 0, NO_ID, 5)
+        assert journey_log[1] == JourneyLogEntry(CARGO_TRANSFER_EVENT_CODE, 1, 6, 8, 0, 1, 0, 0)
+        assert journey_log[2].event_type == IDLE_EVENT_CODE
+        assert np.isnan(journey_log[2].distance)
+        assert journey_log.get_trade(0) is trade
+        assert [e.time for e in journey_log] == [5, 8, 9]
+
+    def test_kept_sorted(self):
+        journey_log = JourneyLog(capacity=2)
+        for one_time in [3, 1, 4, 1.5, 9, 2]:
+            journey_log.append(IDLE_EVENT_CODE, one_time - 0.5, one_time)
+        assert journey_log.times.tolist() == [1, 1.5, 2, 3, 4, 9]
+        assert journey_log.times_started.tolist() == [0.5, 1, 1.5, 2.5, 3.5, 8.5]
+
+    def test_idle_periods(self):
+        journey_log = JourneyLog()
+        journey_log.append(TRAVEL_EVENT_CODE, 2, 5)
+        journey_log.append(TRAVEL_EVENT_CODE, 5, 7)
+        journey_log.append(TRAVEL_EVENT_CODE, 10, 12)
+        idle_starts, idle_ends = journey_log.idle_periods(20)
+        assert idle_starts.tolist() == [0, 7, 12]
+        assert idle_ends.tolist() == [2, 10, 20]
+        idle_starts, idle_ends = JourneyLog().idle_periods(20)
+        assert idle_starts.tolist() == [0]
+        assert idle_ends.tolist() == [20]
+
+    def test_spill(self, tmp_path):
+        journey_log = JourneyLog(capacity=2, spill_threshold=4, spill_directory=str(tmp_path))
+        for one_time in range(4):
+            journey_log.append(TRAVEL_EVENT_CODE, one_time, one_time + 1)
+        assert not journey_log.is_spilled
+        journey_log.append(TRAVEL_EVENT_CODE, 4, 5)
+        assert journey_log.is_spilled
+        first_spill_file = journey_log.spill_file_path
+        assert os.path.dirname(first_spill_file) == str(tmp_path)
+        for one_time in range(5, 9):
+            journey_log.append(TRAVEL_EVENT_CODE, one_time, one_time + 1)
+        assert not os.path.exists(first_spill_file)
+        assert journey_log.times.tolist() == list(range(1, 10))
+        spill_file = journey_log.spill_file_path
+        del journey_log
+        assert not os.path.exists(spill_file)
+
+    def test_invalid_spill_threshold(self):
+        with pytest.raises(ValueError):
+            JourneyLog(spill_threshold=0)
@@ -0,0 +1,58 @@
+"""
+Tests for the metrics module.
+"""
+import json
+
+import pytest
+
+from mable.metrics import GlobalMetricsCollector, FUEL_CONSUMPTION_KEY, FUEL_COST_KEY
+from mable.util import JsonAbleEncoder
+
+
+class DummyCompany:
+
+    def __init__(self, name, fleet):
+        self.name = name
+        self.fleet = fleet
+
+
+class DummyEngine:
+
+    def __init__(self, shipping_companies):
+        self.shipping_companies = shipping_companies
+
+
+class TestMetricsCollector:
+
+    def test_numeric_metrics(self):
+        company_one = DummyCompany("One", ["v1", "v2"])
+        company_two = DummyCompany("Two", ["v3"])
+        metrics = GlobalMetricsCollector()
+        metrics.set_engine(DummyEngine([company_one, company_two]))
+        metrics.add_fuel_consumption("v1", 2)
+        metrics.add_dual_numeric_metric("v2", FUEL_CONSUMPTION_KEY, 3)
+        metrics.add_dual_numeric_metrics("v3", [FUEL_CONSUMPTION_KEY, FUEL_COST_KEY], [4, 5])
+        metrics.add_company_numeric_metric(company_two, "other", 1.5)
+        metrics.add_route_point("A", "v1")
+        result = json.loads(json.dumps(metrics.to_json(), cls=JsonAbleEncoder))
+        assert result["company_names"] == {"0": "One", "1": "Two"}
+        assert result["company_metrics"] == {
+            "0": {FUEL_CONSUMPTION_KEY: 5},
+            "1": {FUEL_CONSUMPTION_KEY: 4, FUEL_COST_KEY: 5, "other": 1.5}}
+        assert result["vessel_metrics"] == {
+            "(0, 0)": {FUEL_CONSUMPTION_KEY: 2, "route": ["A"]},
+            "(0, 1)": {FUEL_CONSUMPTION_KEY: 3},
+            "(1, 0)": {FUEL_CONSUMPTION_KEY: 4, FUEL_COST_KEY: 5}}
+
+    def test_growth(self):
+        companies = [DummyCompany(f"C{i}", [f"v{i}-{j}" for j in range(5)]) for i in range(20)]
+        metrics = GlobalMetricsCollector()
+        metrics.set_engine(DummyEngine(companies))
+        for one_company in companies:
+            for one_vessel in one_company.fleet:
+                for k in range(10):
+                    metrics.add_dual_numeric_metric(one_vessel, f"key_{k}", 1)
+        result = metrics.to_json()
+        assert result["company_metrics"][19]["key_9"] == pytest.approx(5)
+        assert result["vessel_metrics"]["(19, 4)"]["key_0"] == pytest.approx(1)
+        assert metrics.get_vessel_id("v7-3").key_tuple == (7, 3)
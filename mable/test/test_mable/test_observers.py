@@ -0,0 +1,93 @@
+"""
+Tests for the observers module.
+"""
+import json
+
+import numpy as np
+import pytest
+
+from mable.cli import load_metrics
+from mable.event_management import IdleEvent
+from mable.observers import JsonLinesExportObserver, MetricsObserver
+from mable.simulation_space.universe import Location
+from mable.util import JsonAbleEncoder
+
+
+class TestJsonLinesExportObserver:
+
+    @staticmethod
+    def _get_idle_event(mocker, time):
+        vessel = mocker.Mock(
+            get_idle_consumption=mocker.Mock(return_value=2.0),
+            get_co2_emissions=mocker.Mock(return_value=6.0),
+            get_cost=mocker.Mock(return_value=1000.0))
+        vessel.name = "V1"
+        event = IdleEvent(time, vessel, Location(0, 0))
+        event.added_to_queue(mocker.Mock(world=mocker.Mock(current_time=0)))
+        return event
+
+    def test_streaming(self, tmp_path, mocker):
+        file_path = tmp_path / "metrics.jsonl"
+        observer = JsonLinesExportObserver(file_path, flush_interval=2)
+        observer.notify(None, self._get_idle_event(mocker, 10), None)
+        assert not file_path.exists()
+        observer.notify(None, self._get_idle_event(mocker, 20), None)
+        with open(file_path) as f:
+            records = [json.loads(line) for line in f]
+        assert [r["time"] for r in records] == [10, 20]
+        assert records[0]["record"] == "event"
+        assert records[0]["fuel_consumption"] == 2.0
+        observer.notify(None, self._get_idle_event(mocker, 30), None)
+        observer.write_summary({
+            "company_names": {"0": "C"},
+            "company_metrics": {"0": {"fuel_cost": 3000.0}},
+            "global_metrics": {"penalty": {"0": 0}}})
+        with open(file_path) as f:
+            records = [json.loads(line) for line in f]
+        assert len(records) == 4
+        metrics = load_metrics(str(file_path))
+        assert metrics["company_metrics"]["0"]["fuel_cost"] == 3000.0
+        assert metrics["global_metrics"]["auction_outcomes"] == []
+
+
+class TestMetricsObserver:
+
+    def test_idle_times(self, mocker):
+        vessel = mocker.Mock(
+            get_idle_consumption=lambda time: 2 * time,
+            get_co2_emissions=lambda consumption: 3 * consumption,
+            get_cost=lambda consumption: 10 * consumption)
+        company = mocker.Mock(fleet=[vessel])
+        company.name = "C"
+        engine = mocker.Mock(shipping_companies=[company])
+        engine.world.current_time = 0
+        observer = MetricsObserver()
+        observer.metrics.set_engine(engine)
+        for one_time_started, one_time in [(5, 10), (15, 20)]:
+            event = IdleEvent(one_time, vessel, Location(0, 0))
+            engine.world.current_time = one_time_started
+            event.added_to_queue(engine)
+            engine.world.current_time = one_time
+            observer.notify(engine, event, None)
+        engine.world.current_time = 30
+        observer.add_final_idle_times(engine)
+        observer.add_final_idle_times(engine)
+        vessel_metrics = json.loads(json.dumps(observer.metrics.to_json(), cls=JsonAbleEncoder))["vessel_metrics"]
+        assert vessel_metrics["(0, 0)"]["vessel_status_idle"] == 30
+        assert vessel_metrics["(0, 0)"]["fuel_consumption"] == 60
+        assert vessel_metrics["(0, 0)"]["fuel_cost"] == 600
+
+    def test_idle_times_match_journey_log(self, mocker, build_simulation):
+        engine = build_simulation()
+        add_idle_time_spy = mocker.spy(MetricsObserver, "_add_idle_time")
+        engine.run()
+        metrics_observer = next(o for o in engine.get_event_observers() if isinstance(o, MetricsObserver))
+        metrics_observer.add_final_idle_times(engine)
+        idle_times = {}
+        for one_call in add_idle_time_spy.call_args_list:
+            _, vessel, idle_time = one_call.args
+            idle_times[vessel] = idle_times.get(vessel, 0) + idle_time
+        for one_company in engine.shipping_companies:
+            for one_vessel in one_company.fleet:
+                idle_starts, idle_ends = one_vessel.journey_log.idle_periods(engine.world.current_time)
+                assert idle_times.get(one_vessel, 0) == pytest.approx(float(np.sum(idle_ends - idle_starts)))
@@ -0,0 +1,75 @@
+"""
+Tests for the parallel module.
+"""
+import numpy as np
+import pytest
+
+from mable.cargo_bidding import TradingCompany
+import mable.parallel as mable_parallel
+from mable.parallel import partition_vessels
+
+
+class HomePortCompany(TradingCompany):
+    """
+    Only bids for the trades from the port that is the company's name.
+    """
+
+    def inform(self, trades, *args, **kwargs):
+        return super().inform([t for t in trades if t.origin_port.name == self.name], *args, **kwargs)
+
+
+@pytest.fixture
+def build_home_port_simulation(build_simulation):
+    """
+    Creates an auction simulation of three companies with one vessel each that all transport trades.
+    """
+
+    def build_home_port_simulation():
+        return build_simulation(
+            HomePortCompany,
+            fleets=[(name, [(f"V{name}", name)]) for name in ["A", "B", "C"]],
+            routes=[("A", "B"), ("B", "C"), ("C", "A"), ("A", "C")])
+
+    return build_home_port_simulation
+
+
+class TestParallelFastForward:
+
+    def test_same_outcome(self, mocker, build_home_port_simulation, get_outcome):
+        engine = build_home_port_simulation()
+        engine.run()
+        parallel_engine = build_home_port_simulation()
+        parallel_engine.enable_fast_forward(number_of_processes=3)
+        partition_spy = mocker.spy(mable_parallel, "partition_vessels")
+        process_spy = mocker.spy(mable_parallel.VesselWorkerPool, "process_vessel_events")
+        parallel_engine.run()
+        outcome = get_outcome(engine)
+        assert all(len(outcome[2][name]) > 0 for name in ["A", "B", "C"])
+        assert get_outcome(parallel_engine) == outcome
+        # The workers are forked once and process the vessels' events of all barriers.
+        assert partition_spy.call_count == 1
+        assert len(partition_spy.spy_return) == 3
+        assert process_spy.call_count > 1
+        assert parallel_engine._vessel_worker_pool is None
+        for one_company, one_parallel_company in zip(engine.shipping_companies, parallel_engine.shipping_companies):
+            for one_vessel, one_parallel_vessel in zip(one_company.fleet, one_parallel_company.fleet):
+                assert np.array_equal(one_parallel_vessel.journey_log.times, one_vessel.journey_log.times)
+                assert one_parallel_vessel.location == one_vessel.location
+
+
+    def test_daemonic_process_processes_sequentially(self, mocker, build_home_port_simulation, get_outcome):
+        engine = build_home_port_simulation()
+        engine.run()
+        parallel_engine = build_home_port_simulation()
+        parallel_engine.enable_fast_forward(number_of_processes=3)
+        mocker.patch("mable.engine.multiprocessing.current_process", return_value=mocker.Mock(daemon=True))
+        partition_spy = mocker.spy(mable_parallel, "partition_vessels")
+        parallel_engine.run()
+        assert get_outcome(parallel_engine) == get_outcome(engine)
+        assert partition_spy.call_count == 0
+
+
+def test_partition_vessels(mocker):
+    vessels = [mocker.Mock() for _ in range(3)]
+    assert partition_vessels(vessels, 2) == [[vessels[0], vessels[2]], [vessels[1]]]
+    assert partition_vessels(vessels, 5) == [[vessels[0]], [vessels[1]], [vessels[2]]]
@@ -0,0 +1,56 @@
+"""
+Tests for the random_streams module.
+"""
+import numpy as np
+import pytest
+
+from mable import random_streams
+from mable.random_streams import RandomStreams, get_stream_seed_sequence, draw_integers
+from mable.simulation_environment import World
+
+
+class TestRandomStreams:
+
+    def test_stream_seed_sequence_matches_spawn(self):
+        seed_sequence = np.random.SeedSequence(42)
+        spawned = seed_sequence.spawn(len(random_streams.STREAMS))
+        trade_generation_index = random_streams.STREAMS.index(random_streams.TRADE_GENERATION)
+        stream_seed_sequence = get_stream_seed_sequence(seed_sequence, random_streams.TRADE_GENERATION)
+        assert np.array_equal(stream_seed_sequence.generate_state(4),
+                              spawned[trade_generation_index].generate_state(4))
+
+    def test_unknown_stream(self):
+        with pytest.raises(ValueError):
+            get_stream_seed_sequence(np.random.SeedSequence(0), "weather")
+
+    def test_streams_are_independent(self):
+        streams = RandomStreams(np.random.SeedSequence(1))
+        placement = streams.get_generator(random_streams.VESSEL_PLACEMENT).random(3)
+        other_streams = RandomStreams(np.random.SeedSequence(1))
+        other_streams.get_generator(random_streams.TRADE_REALISATION).random(100)
+        assert np.array_equal(other_streams.get_generator(random_streams.VESSEL_PLACEMENT).random(3), placement)
+
+    def test_state(self):
+        streams = RandomStreams(np.random.SeedSequence(2))
+        streams.get_generator(random_streams.VESSEL_PLACEMENT).random(5)
+        state = streams.get_state()
+        expected = streams.get_generator(random_streams.VESSEL_PLACEMENT).random(3)
+        restored_streams = RandomStreams(np.random.SeedSequence(2))
+        restored_streams.set_state(state)
+        assert np.array_equal(restored_streams.get_generator(random_streams.VESSEL_PLACEMENT).random(3), expected)
+
+    def test_world_seed_sequence_from_random(self):
+        world = World(None, None, np.random.RandomState(3))
+        same_world = World(None, None, np.random.RandomState(3))
+        other_world = World(None, None, np.random.RandomState(4))
+        seeds = [w.random_streams.get_generator(random_streams.VESSEL_PLACEMENT).integers(2 ** 31)
+                 for w in [world, same_world, other_world]]
+        assert seeds[0] == seeds[1] != seeds[2]
+
+
+@pytest.mark.parametrize("random", [np.random.RandomState(0), np.random.default_rng(0)])
+def test_draw_integers(random):
+    integers = draw_integers(random, 2, np.array([3, 5, 10]))
+    assert integers.shape == (3,)
+    assert integers[0] == 2
+    assert all(2 <= i < h for i, h in zip(integers, [3, 5, 10]))
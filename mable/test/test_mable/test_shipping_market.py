@@ -1,4 +1,12 @@
-from mable.shipping_market import AuctionMarket, TimeWindowTrade
+import copy
+import weakref
+
+import numpy as np
+
+from mable.shipping_market import AuctionMarket, TimeWindowTrade, StaticShipping, TradeStatus, Trade, TradeTable
+from mable.simulation_environment import World
+from mable.simulation_space.structure import UnitShippingNetwork
+from mable.simulation_space.universe import Port
 from mable.transport_operation import Bid
 
 
@@ -13,6 +21,103 @@ class DummyShippingCompany:
         return bids
 
 
+class DummyClassFactory:
+
+    @staticmethod
+    def generate_trade(*args, **kwargs):
+        return Trade(*args, **kwargs)
+
+
+class TestShipping:
+
+    def test_get_trades(self, mocker):
+        world = World(UnitShippingNetwork([Port("A", 0, 0), Port("B", 1, 1)]), None, np.random.RandomState(0))
+        fixed_trades = [
+            {"origin_port": "A", "destination_port": "B", "amount": 1, "time": 0, "probability": p}
+            for p in [1, 0, 0.5, 0.5, 0.5, 0.5, 1]]
+        shipping = StaticShipping(fixed_trades=fixed_trades, world=world, class_factory=DummyClassFactory())
+        shipping.set_engine(mocker.Mock(world=world))
+        trades = shipping.get_trades(0)
+        all_trades = shipping._all_trades[0]
+        assert all_trades[0] in trades
+        assert all_trades[1] not in trades
+        assert all_trades[1].status == TradeStatus.NOT_REALISED
+        assert all(t.status == TradeStatus.NOT_REALISED for t in all_trades if t not in trades)
+        assert all(t.status == TradeStatus.UNKNOWN for t in trades)
+        assert shipping.get_trades(0) is trades
+        assert shipping.get_trades(1) == []
+
+
+class TestTrade:
+
+    def test_key(self):
+        trade = TimeWindowTrade(origin_port=Port("A", 0, 0), destination_port="B", amount=1, time=3,
+                                time_window=[None, 5, None, None])
+        assert trade.key == ("A", "B", 1, None, 3, (None, 5, None, None))
+        assert copy.deepcopy(trade).key == trade.key
+        assert {trade.key, copy.deepcopy(trade).key} == {trade.key}
+        assert Trade(origin_port="A", destination_port="B", amount=1, time=3).key == \
+               TimeWindowTrade(origin_port="A", destination_port="B", amount=1, time=3).key
+        assert TimeWindowTrade(origin_port="A", destination_port="B", amount=1, time=3).key != trade.key
+
+    def test_key_is_cached(self):
+        trade = TimeWindowTrade(origin_port="A", destination_port="B", amount=1, time=3,
+                                time_window=[None, 5, None, None])
+        key = trade.key
+        assert trade.key is key
+        trade.status = TradeStatus.ACCEPTED
+        assert trade.key is key
+        trade.time = 4
+        assert trade.key == ("A", "B", 1, None, 4, (None, 5, None, None))
+        trade.time_window = [None, 6, None, None]
+        assert trade.key == ("A", "B", 1, None, 4, (None, 6, None, None))
+        assert trade == TimeWindowTrade(origin_port="A", destination_port="B", amount=1, time=4,
+                                        time_window=[None, 6, None, None], status=TradeStatus.ACCEPTED)
+        assert "_key" not in trade.to_json()
+
+
+class TestTradeTable:
+
+    def test_add_columns(self):
+        ports = UnitShippingNetwork([Port("A", 0, 0), Port("B", 1, 1)]).ports
+        table = TradeTable(ports, capacity=1)
+        indices = table.add_columns(
+            np.array([0, 1]), np.array([1, 0]), np.array([10.5, 20]), 720,
+            np.array([[1, 2, 3, 4], [5, 6, np.nan, 8]]), cargo_type="Oil")
+        assert list(indices) == [0, 1]
+        assert len(table) == 2
+        trade = table.get_trade(1)
+        assert trade == TimeWindowTrade(
+            origin_port=ports[1], destination_port=ports[0], amount=20, cargo_type="Oil", time=720,
+            time_window=[5, 6, None, 8])
+        assert table.get_trade(1) is trade
+        assert list(table.amounts) == [10.5, 20]
+
+    def test_statuses(self):
+        ports = UnitShippingNetwork([Port("A", 0, 0), Port("B", 1, 1)]).ports
+        table = TradeTable(ports)
+        table.add_trades([
+            TimeWindowTrade(origin_port=ports[0], destination_port=ports[1], amount=1, time=0, time_window=[0, 1, 2, 3]),
+            TimeWindowTrade(origin_port="B", destination_port="A", amount=2, time=0)])
+        table.add_columns(np.array([0]), np.array([1]), np.array([3]), 0)
+        trade = table.get_trade(1)
+        table.set_status(np.array([0]), TradeStatus.ACCEPTED)
+        table.set_status(np.array([False, True, True]), TradeStatus.NOT_REALISED)
+        assert list(table.statuses) == [
+            TradeStatus.ACCEPTED.value, TradeStatus.NOT_REALISED.value, TradeStatus.NOT_REALISED.value]
+        assert trade.status == TradeStatus.NOT_REALISED
+        assert table.get_trade(0).status == TradeStatus.ACCEPTED
+        assert table.get_trade(2).status == TradeStatus.NOT_REALISED
+        assert table.get_trade(1).time_window == [None, None, None, None]
+
+    def test_keeps_no_trades(self):
+        ports = UnitShippingNetwork([Port("A", 0, 0), Port("B", 1, 1)]).ports
+        table = TradeTable(ports)
+        table.add_columns(np.array([0]), np.array([1]), np.array([3]), 0)
+        trade_reference = weakref.ref(table.get_trade(0))
+        assert trade_reference() is None
+        assert table.get_trade(0).amount == 3
+
 
 class TestAuctionMarket:
 
@@ -3,6 +3,7 @@ Tests for STN module.
 """
 
 import copy
+import uuid
 import pytest
 
 import numpy as np
@@ -10,10 +11,12 @@ import numpy as np
 from mable.engine import SimulationEngine
 from mable.event_management import ArrivalEvent, CargoTransferEvent, IdleEvent, TravelEvent, EventQueue, \
     EventObserver
+from mable.instrumentation import Profiler
 from mable.simulation_environment import World
 from mable.extensions.cargo_distributions import TimeWindowTrade
 from mable.extensions.fuel_emissions import VesselWithEngine, VesselEngine, Fuel, ConsumptionRate
-from mable.transportation_scheduling import (Schedule, TransportationStartFinishIndicator,
+from mable.transportation_scheduling import (Schedule, ScheduleVerificationCache,
+                                             TransportationStartFinishIndicator,
                                              TransportationSourceDestinationIndicator)
 from mable.transport_operation import CargoCapacity, ShippingCompany
 
@@ -238,6 +241,78 @@ class TestSchedule:
         schedule_invalid_5._add_task(2, trade_8, TransportationSourceDestinationIndicator.PICK_UP, 0)
         assert schedule_invalid_5.verify_schedule() is False
 
+    def test_verify_schedule_reuses_result(self, mocker):
+        distances = {("A", "B"): 10}
+        trade = TimeWindowTrade(origin_port="A", destination_port="B", amount=10, cargo_type="Oil")
+        schedule = Schedule(VESSEL)
+        schedule.set_engine(DummyEngine(DummyWorld(distances)))
+        schedule.add_transportation(trade, 1)
+        verify_time_spy = mocker.spy(Schedule, "_verify_schedule_time")
+        assert schedule.verify_schedule() is True
+        assert schedule.verify_schedule() is True
+        assert schedule.copy().verify_schedule() is True
+        assert verify_time_spy.call_count == 1
+        schedule.add_transportation(trade)
+        assert schedule.verify_schedule() is True
+        assert verify_time_spy.call_count == 2
+
+    def test_get_signature(self):
+        distances = {("A", "B"): 10, ("B", "C"): 10}
+        engine = DummyEngine(DummyWorld(distances))
+        trade_1 = TimeWindowTrade(origin_port="A", destination_port="B", amount=10, cargo_type="Oil")
+        trade_2 = TimeWindowTrade(origin_port="B", destination_port="C", amount=10, cargo_type="Oil")
+        schedule = Schedule(VESSEL)
+        schedule.set_engine(engine)
+        schedule.add_transportation(trade_1, 1)
+        same_schedule = Schedule(VESSEL)
+        same_schedule.set_engine(engine)
+        same_schedule.add_transportation(copy.deepcopy(trade_1), 1)
+        assert schedule.get_signature() == same_schedule.get_signature()
+        assert schedule.copy().get_signature() == schedule.get_signature()
+        signature_one_trade = schedule.get_signature()
+        schedule.add_transportation(trade_2)
+        assert schedule.get_signature() != signature_one_trade
+        other_order_schedule = Schedule(VESSEL)
+        other_order_schedule.set_engine(engine)
+        other_order_schedule.add_transportation(trade_2, 1)
+        other_order_schedule.add_transportation(trade_1)
+        assert other_order_schedule.get_signature() != schedule.get_signature()
+
+    def test_get_signature_of_vessels_with_same_name(self):
+        engine = DummyEngine(DummyWorld({("A", "B"): 10}))
+        other_vessel = copy.deepcopy(VESSEL)
+        other_vessel._identifier = uuid.uuid4()
+        signatures = []
+        for one_vessel in [VESSEL, copy.deepcopy(VESSEL), other_vessel]:
+            schedule = Schedule(one_vessel)
+            schedule.set_engine(engine)
+            schedule.add_transportation(DUMMY_TRADE, 1)
+            signatures.append(schedule.get_signature())
+        assert signatures[0] == signatures[1]
+        assert signatures[0] != signatures[2]
+
+    def test_verification_cache(self, mocker):
+        distances = {("A", "B"): 10}
+        engine = DummyEngine(DummyWorld(distances))
+        profiler = Profiler()
+        mocker.patch.object(DummyEngine, "profiler", new_callable=mocker.PropertyMock, return_value=profiler)
+        schedule = Schedule(VESSEL)
+        schedule.set_engine(engine)
+        schedule.add_transportation(DUMMY_TRADE, 1)
+        verify_time_spy = mocker.spy(Schedule, "_verify_schedule_time")
+        completion_time_spy = mocker.spy(Schedule, "_calculate_completion_time")
+        completion_time = schedule.completion_time()
+        assert schedule.verify_schedule_time() is True
+        assert schedule.copy().verify_schedule_time() is True
+        assert schedule.copy().completion_time() == completion_time
+        assert verify_time_spy.call_count == 1
+        assert completion_time_spy.call_count == 1
+        assert profiler.get_counts("cache", "verify_schedule_time") == {"hits": 1, "misses": 1}
+        assert profiler.counts_summary()["cache"]["completion_time"]["hit_rate"] == 0.5
+        engine.world.set_current_time(1)
+        assert schedule.verify_schedule_time() is True
+        assert verify_time_spy.call_count == 2
+
     @staticmethod
     def get_pop_setup(setting):
         distances = {
@@ -650,3 +725,22 @@ class TestSchedule:
                     trade_1,
                     trade_1,
                     trade_2])
+
+
+class TestScheduleVerificationCache:
+
+    def test_least_recently_used(self):
+        cache = ScheduleVerificationCache(max_size=2)
+        assert cache.get("x", 1, 0, lambda: "one") == "one"
+        assert cache.get("x", 2, 0, lambda: "two") == "two"
+        assert cache.get("x", 1, 0, lambda: "other") == "one"
+        assert cache.get("x", 3, 0, lambda: "three") == "three"
+        assert len(cache) == 2
+        assert cache.get("x", 2, 0, lambda: "new two") == "new two"
+        assert cache.get("x", 3, 0, lambda: "other") == "three"
+
+    def test_time_advance(self):
+        cache = ScheduleVerificationCache()
+        cache.get("x", 1, 0, lambda: "one")
+        assert cache.get("x", 1, 1, lambda: "new one") == "new one"
+        assert len(cache) == 1